@@ -0,0 +1,260 @@
+""" benchmarks.scaling_benchmark
+
+How long the sweep and its hot pieces take as the number of sites grows,
+from 10^2 sites up to BENCH_MAX_N, for uniform, clustered, sorted and
+collinear sites. The growth exponent k of time ~ n^k is fitted for every
+case and the results are written as JSON. Against a baseline, a case
+fails if it got slower than the threshold allows.
+
+Run with: python -m pytest benchmarks/scaling_benchmark.py -s
+
+Settings come from the environment:
+    BENCH_MAX_N        largest n, 10^2 to 10^6 (default 10^4)
+    BENCH_OUT          where the results go (default benchmark_results.json)
+    BENCH_BASELINE     earlier results to compare against
+    BENCH_THRESHOLD    allowed slowdown against the baseline (default 0.25)
+    BENCH_MIN_SECONDS  shorter timings are too noisy to compare (default 0.01)
+
+Keep the results of one run as the baseline, and set BENCH_BASELINE to
+it on the next run.
+"""
+
+import gc
+import json
+import math
+import os
+import platform
+import time
+from collections.abc import Callable
+
+import numpy as np
+import pytest
+
+from mapgenerator import sites as site_generators
+from mapgenerator.algorithms.fortunes.base_structs import Arc, Point, Ray
+from mapgenerator.algorithms.fortunes.binarytree import BinaryTree, BinaryTreeLeaf, Side
+from mapgenerator.algorithms.fortunes.event import Event, EventQueue, EventType
+from mapgenerator.algorithms.fortunes.fortunes import FortunesAlgorithm
+from mapgenerator.algorithms.fortunes.mode import SETTINGS, Mode
+
+MAX_N = int(float(os.environ.get("BENCH_MAX_N", "1e4")))
+OUT = os.environ.get("BENCH_OUT", "benchmark_results.json")
+BASELINE = os.environ.get("BENCH_BASELINE")
+THRESHOLD = float(os.environ.get("BENCH_THRESHOLD", "0.25"))
+MIN_SECONDS = float(os.environ.get("BENCH_MIN_SECONDS", "0.01"))
+
+# the exponent may grow this much before it counts as a regression
+EXPONENT_SLACK = 0.15
+
+SIZES = [10 ** k for k in range(2, 7) if 10 ** k <= MAX_N]
+
+
+def uniform(n: int) -> np.ndarray:
+    return site_generators.uniform(n, _canvas(n), seed=n)
+
+
+def clustered(n: int) -> np.ndarray:
+    """ Tight gaussian blobs of about a thousand sites each. A blob is
+        wide enough to hold its sites on distinct pixels, and more are
+        drawn until n distinct ones are found """
+    rng = np.random.default_rng(n)
+    side = _canvas(n)[0]
+
+    centers = rng.integers(0, side, size=(max(1, n // 1000), 2))
+    sigma = max(side / 100, math.sqrt(n / len(centers)))
+
+    sites = np.empty((0, 2), dtype=np.int64)
+    while len(sites) < n:
+        drawn = centers[rng.integers(0, len(centers), size=n)] + rng.normal(0, sigma, (n, 2))
+        drawn = np.clip(np.rint(drawn), 0, side - 1).astype(np.int64)
+        sites = site_generators.unique_rows(np.concatenate((sites, drawn)))
+
+    return sites[:n]
+
+
+def sorted_by_x(n: int) -> np.ndarray:
+    """ Uniform sites in the order the sweep meets them """
+    sites = uniform(n)
+
+    return sites[np.lexsort((sites[:, 1], sites[:, 0]))]
+
+
+def collinear(n: int) -> np.ndarray:
+    """ Every site on the same diagonal, so no circle events ever happen """
+    return np.repeat(np.arange(n, dtype=np.int64)[:, np.newaxis] * 3, 2, axis=1)
+
+
+DISTRIBUTIONS = {
+    "uniform": uniform,
+    "clustered": clustered,
+    "sorted": sorted_by_x,
+    "collinear": collinear,
+}
+
+
+def sweep(sites: np.ndarray) -> Callable[[], None]:
+    size = tuple(int(n) + 1 for n in sites.max(axis=0))
+
+    return lambda: FortunesAlgorithm.from_array(sites, size).get_edges_array()
+
+
+def find_arc(sites: np.ndarray) -> Callable[[], None]:
+    """ A query for every site on a beachline of an arc per site, with
+        the diretrix moved before each one like a sweep would """
+    ys = np.unique(sites[:, 1]).tolist()
+    tree = BinaryTree(None)
+    leaf = tree.root = BinaryTreeLeaf(Arc(Point(0, ys[0])))
+
+    for below, above in zip(ys, ys[1:]):
+        ray = Ray(Point(0, (below + above) // 2), Point(1, 0))
+        leaf = tree.insert_arc(leaf, Side.RIGHT, ray, Arc(Point(0, above)))
+
+    queries = sites[:, 1].tolist()
+
+    def run():
+        for diretrix, y in enumerate(queries, 1):
+            tree.find_arc(y, diretrix)
+
+    return run
+
+
+def circle_point(sites: np.ndarray) -> Callable[[], None]:
+    """ The circle of every three sites in a row """
+    arcs = [Arc(Point(x, y)) for x, y in sites.tolist()]
+    triples = list(zip(arcs, arcs[1:], arcs[2:]))
+
+    def run():
+        for one, two, three in triples:
+            one.circle_point(two, three)
+
+    return run
+
+
+def event_queue(sites: np.ndarray) -> Callable[[], None]:
+    """ Push an event for every site one by one and pop them all """
+    events = [
+        Event(x=x, event_type=EventType.SITE_EVENT, point=Point(x, y), site=site)
+        for site, (x, y) in enumerate(sites.tolist())
+    ]
+
+    def run():
+        queue = EventQueue()
+        for event in events:
+            queue.push(event)
+        while not queue.empty():
+            queue.pop()
+
+    return run
+
+
+TARGETS = {
+    "sweep": sweep,
+    "find_arc": find_arc,
+    "circle_point": circle_point,
+    "event_queue": event_queue,
+}
+
+
+def measure(run: Callable[[], None], repeats: int) -> float:
+    """ The best of repeats runs, without the garbage collector """
+    gc.disable()
+    try:
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+
+    return best
+
+
+def growth_exponent(sizes: list[int], seconds: list[float]) -> float | None:
+    """ The least squares slope of log time against log n """
+    if len(sizes) < 2:
+        return None
+
+    slope, _ = np.polyfit(np.log(sizes), np.log(np.maximum(seconds, 1e-9)), 1)
+
+    return float(slope)
+
+
+def regressions(name: str, result: dict, baseline: dict) -> list[str]:
+    """ What got slower than allowed compared to the baseline case """
+    found = []
+    old = dict(zip(baseline["n"], baseline["seconds"]))
+
+    for n, seconds in zip(result["n"], result["seconds"]):
+        if n in old and old[n] >= MIN_SECONDS and seconds > old[n] * (1 + THRESHOLD):
+            found.append(f"{name} n={n}: {seconds:.4f} s, was {old[n]:.4f} s")
+
+    if result["exponent"] is not None and baseline.get("exponent") is not None \
+            and result["exponent"] > baseline["exponent"] + EXPONENT_SLACK:
+        found.append(
+            f"{name}: grows as n^{result['exponent']:.2f}, was n^{baseline['exponent']:.2f}"
+        )
+
+    return found
+
+
+@pytest.fixture(scope="module")
+def results():
+    results: dict[str, dict] = {}
+    SETTINGS.set_mode(Mode.RELEASE)
+
+    yield results
+
+    SETTINGS.set_mode(Mode.DEBUG)
+    with open(OUT, "w", encoding="utf-8") as file:
+        json.dump({
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "max_n": MAX_N,
+            "results": results
+        }, file, indent=2)
+
+    print()
+    print(f"{'case':<28}{'exponent':>10}{'largest n':>12}{'seconds':>10}")
+    for name, result in results.items():
+        exponent = "-" if result["exponent"] is None else f"{result['exponent']:.2f}"
+        print(f"{name:<28}{exponent:>10}{result['n'][-1]:>12}{result['seconds'][-1]:>10.3f}")
+
+
+@pytest.fixture(scope="module")
+def baseline() -> dict[str, dict]:
+    if BASELINE is None:
+        return {}
+
+    with open(BASELINE, encoding="utf-8") as file:
+        return json.load(file)["results"]
+
+
+@pytest.mark.parametrize("distribution", DISTRIBUTIONS)
+@pytest.mark.parametrize("target", TARGETS)
+def test_scaling(target: str, distribution: str, results: dict, baseline: dict):
+    name = f"{target}/{distribution}"
+    sizes = []
+    seconds = []
+
+    for n in SIZES:
+        sites = DISTRIBUTIONS[distribution](n)
+        assert len(sites) == n, f"{distribution} made {len(sites)} sites, not {n}"
+        run = TARGETS[target](sites)
+
+        sizes.append(len(sites))
+        seconds.append(measure(run, repeats=3 if n <= 10_000 else 1))
+
+    result = {"n": sizes, "seconds": seconds, "exponent": growth_exponent(sizes, seconds)}
+    results[name] = result
+
+    found = regressions(name, result, baseline[name]) if name in baseline else []
+    assert not found, "slower than the baseline:\n" + "\n".join(found)
+
+
+def _canvas(n: int) -> tuple[int, int]:
+    """ About a hundred pixels per site """
+    side = math.ceil(10 * math.sqrt(n))
+
+    return (side, side)
@@ -0,0 +1,102 @@
+""" benchmarks.structs_benchmark
+
+Bytes per site and sites per second for the structs that the sweep
+creates on every event. The baseline keeps a __dict__ on every object,
+like the structs did before they got __slots__.
+
+Run with: python -m benchmarks.structs_benchmark [SITES]
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+
+from mapgenerator.algorithms.fortunes.base_structs import Point, Edge, Ray, Arc
+from mapgenerator.algorithms.fortunes.binarytree import BinaryTreeLeaf, BinaryTreeBark
+from mapgenerator.algorithms.fortunes.event import Event, EventType
+from mapgenerator.algorithms.fortunes.mode import SETTINGS, Mode
+
+SLOTTED = (Point, Edge, Ray, Arc, Event, BinaryTreeLeaf, BinaryTreeBark)
+
+# a subclass without __slots__ gets a __dict__ again
+WITH_DICT = tuple(type(cls.__name__, (cls,), {}) for cls in SLOTTED)
+
+
+def site_objects(
+        types: tuple[type, ...],
+        x: int,
+        y: int
+    ) -> tuple[Event, BinaryTreeBark, Event, tuple[Edge, Edge, Ray]]:
+    """ Roughly what a single site makes the sweep allocate: the
+        site event with its split arc, and one circle event with
+        the two edges it finishes """
+    point, edge, ray, arc, event, leaf, bark = types
+
+    site = point(x, y)
+    site_event = event(x, EventType.SITE_EVENT, site)
+
+    intersect = point(x, y)
+    new_leaf = leaf(arc(site))
+    right_leaf = leaf(arc(site))
+    right_bark = bark(ray(intersect, point(1, 1)), new_leaf, right_leaf)
+    left_bark = bark(ray(intersect, point(-1, -1)), leaf(arc(site)), right_bark)
+
+    center = point(x + 1, y)
+    circle_event = event(x + 2, EventType.CIRCLE_EVENT, center, new_leaf)
+    edges = (edge(intersect, center), edge(intersect, center), ray(center, center))
+
+    return (site_event, left_bark, circle_event, edges)
+
+
+def measure(types: tuple[type, ...], mode: Mode, sites: int) -> tuple[float, float]:
+    """ Returns (bytes per site, sites per second) """
+    SETTINGS.set_mode(mode)
+    gc.disable()
+    try:
+        elapsed = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            kept = [site_objects(types, i, i) for i in range(sites)]
+            elapsed = min(elapsed, time.perf_counter() - start)
+            del kept
+
+        tracemalloc.start()
+        kept = [site_objects(types, i, i) for i in range(sites)]
+        used, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del kept
+    finally:
+        gc.enable()
+        SETTINGS.set_mode(Mode.DEBUG)
+
+    return used / sites, sites / elapsed
+
+
+def main():
+    sites = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    variants = [
+        ("__dict__, debug", WITH_DICT, Mode.DEBUG),
+        ("__slots__, debug", SLOTTED, Mode.DEBUG),
+        ("__slots__, release", SLOTTED, Mode.RELEASE),
+    ]
+
+    print(f"{sites} sites")
+    print(f"{'variant':<20}{'bytes/site':>12}{'sites/s':>14}")
+
+    baseline = None
+    for name, types, mode in variants:
+        bytes_per_site, sites_per_second = measure(types, mode, sites)
+        if baseline is None:
+            baseline = (bytes_per_site, sites_per_second)
+
+        print(
+            f"{name:<20}{bytes_per_site:>12.0f}{sites_per_second:>14.0f}"
+            f"   ({baseline[0] / bytes_per_site:.2f}x smaller,"
+            f" {sites_per_second / baseline[1]:.2f}x faster)"
+        )
+
+
+if __name__ == "__main__":
+    main()
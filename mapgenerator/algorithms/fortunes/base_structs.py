@@ -3,16 +3,23 @@
 # kato BinaryTreeLeaf.__init__
 from __future__ import annotations
 
-from math import sqrt
+from .geometry import circumcircle
+from .mode import SETTINGS
 
 class Point:
+    __slots__ = ("_x", "_y")
+
     def __init__(self, x: int, y: int):
         # lets try keeping this in ints?
         # floats suck (and might not really work
         # with this alg)
         # https://jacquesheunis.com/post/fortunes-algorithm-implementation/#edge-case-3-precision-issues-with-determining-intersections-of-curves-unsolved
-        self._x = self.__validate(x)
-        self._y = self.__validate(y)
+        if SETTINGS.validate:
+            self.__validate(x)
+            self.__validate(y)
+
+        self._x = x
+        self._y = y
 
     def __validate(self, n: int) -> int:
         if not isinstance(n, int):
@@ -33,10 +40,16 @@ class Point:
 
 
 class Edge:
+    __slots__ = ("_start", "_end")
+
     def __init__(self, start: Point, end: Point):
         """ Edges are defined by their start- and endpoint, and are set in stone """
-        self._start = self.__validate(start)
-        self._end = self.__validate(end)
+        if SETTINGS.validate:
+            self.__validate(start)
+            self.__validate(end)
+
+        self._start = start
+        self._end = end
 
     def __validate(self, point: Point) -> Point:
         if not isinstance(point, Point):
@@ -54,10 +67,19 @@ class Edge:
 
 
 class Ray:
-    def __init__(self, start: Point, direction: Point):
-        """ Rays are defined by their startpoint and direction """
-        self._start = self.__validate(start)
-        self._direction = self.__validate(direction)
+    __slots__ = ("_start", "_direction", "_half_edge")
+
+    def __init__(self, start: Point, direction: Point, half_edge: int = -1):
+        """ Rays are defined by their startpoint and direction. Half-edge is
+            the one in the mesh whose origin is where the ray ends """
+        if SETTINGS.validate:
+            self.__validate(start)
+            self.__validate(direction)
+            self.__validate_half_edge(half_edge)
+
+        self._start = start
+        self._direction = direction
+        self._half_edge = half_edge
 
     def __validate(self, point: Point) -> Point:
         if not isinstance(point, Point):
@@ -65,6 +87,12 @@ class Ray:
 
         return point
 
+    def __validate_half_edge(self, half_edge: int) -> int:
+        if not isinstance(half_edge, int):
+            raise TypeError("Ray half-edge must be of type int, was", type(half_edge))
+
+        return half_edge
+
     @property
     def start(self) -> Point:
         return self._start
@@ -73,11 +101,23 @@ class Ray:
     def direction(self) -> Point:
         return self._direction
 
+    @property
+    def half_edge(self) -> int:
+        return self._half_edge
+
 
 class Arc:
-    def __init__(self, focal: Point):
-        """ Arcs are defined by their focal point and their (grand)parents on the binary tree """
-        self._focal = self.__validate(focal)
+    __slots__ = ("_focal", "_site")
+
+    def __init__(self, focal: Point, site: int | None = None):
+        """ Arcs are defined by their focal point and their (grand)parents on the binary tree.
+            Site is the index of the focal point in the input, if known """
+        if SETTINGS.validate:
+            self.__validate(focal)
+            self.__validate_site(site)
+
+        self._focal = focal
+        self._site = site
 
     def x(self, y: int, diretrix: int) -> int:
         """ Magic math for the arc """
@@ -100,99 +140,25 @@ class Arc:
 
         return Point(dx, 1)
 
-    def circle_point( # pylint: disable=too-many-locals
+    def circle_point(
             self,
             arc_one: Arc,
             arc_two: Arc
-        ) -> tuple[Point, int]:
-        """ Returns radius and center of circle """
+        ) -> tuple[Point, int] | None:
+        """ Returns center and radius of the circle through the three focals,
+            or None if they are collinear and no circle exists """
 
         p1 = self.focal
         p2 = arc_one.focal
         p3 = arc_two.focal
 
-        a, b, c, *_ = self.__circle_from_points(p1, p2, p3)
-
-        x = -round(a)
-        y = -round(b)
-        r = round(sqrt(a**2 + b**2 - c))
-
-        return Point(x, y), r
-
-    def __circle_from_points(self, p1: Point, p2: Point, p3: Point) -> tuple[float, float, float]:
-        """ This method takes the equation x² + y² + 2ax + 2by + c = 0,
-            and with 3 points return (a, b, c) """
-
-        matrix = [
-            [2*p1.x, 2*p1.y, 1, -(p1.x**2 + p1.y**2)],
-            [2*p2.x, 2*p2.y, 1, -(p2.x**2 + p2.y**2)],
-            [2*p3.x, 2*p3.y, 1, -(p3.x**2 + p3.y**2)],
-        ]
-
-        values = self.__gauss_elimination(matrix)
-
-        return tuple(values)
+        circle = circumcircle(p1.x, p1.y, p2.x, p2.y, p3.x, p3.y)
+        if circle is None:
+            return None
 
-    @staticmethod
-    def __gauss_elimination(matrix: list[list[int]]) -> list[int]:
-        """ Solve a equation group by gaussian elimination.
-            Please don't input groups with less or more than 1 solution
-        
-            for example...
-            matrix w with 3 unknowns:  
-                [[00, 01, 02, 03],
-                [10, 11, 12, 13],
-                [20, 21, 22, 23]]
-                
-            where X0 is a's scalar, X1 b's, X2 c's and X3 is constant
-        """
+        x, y, r = circle
 
-        for i, _ in enumerate(matrix):
-
-            # first divide by ik / ii
-            if matrix[i][i] == 0:
-                raise ZeroDivisionError("Stupid sexy division by zero")
-
-            for k, _ in enumerate(matrix[i]):
-                if i == k:
-                    continue
-
-                matrix[i][k] /= matrix[i][i]
-
-            matrix[i][i] /= matrix[i][i]
-
-            # then divide jk / ji and subtract jk - ik
-            for j, _ in enumerate(matrix):
-                if j == i:
-                    continue
-
-                if matrix[j][i] == 0:
-                    continue
-
-                for k, _ in enumerate(matrix[j]):
-                    if i == k:
-                        continue
-
-                    matrix[j][k] /= matrix[j][i]
-                    matrix[j][k] -= matrix[i][k]
-
-                matrix[j][i] -= matrix[j][i]
-
-        values = []
-
-        # finally, divide jk / jj
-        for j, _ in enumerate(matrix):
-            if matrix[j][j] == 0:
-                raise RuntimeError("No solutions or something idk")
-
-            # actually only needs jj / jj and j(-1) / jj
-            matrix[j][-1] /= matrix[j][j]
-            matrix[j][j] /= matrix[j][j]
-
-            # also store the j(-1), cause we need to return them
-            values.append(matrix[j][-1])
-
-        return values
+        return Point(round(x), round(y)), round(r)
 
     def __validate(self, point: Point) -> Point:
         if not isinstance(point, Point):
@@ -200,6 +166,16 @@ class Arc:
 
         return point
 
+    def __validate_site(self, site: int | None) -> int | None:
+        if not isinstance(site, int) and site is not None:
+            raise TypeError("Arc site must be of type int or None, was", type(site))
+
+        return site
+
     @property
     def focal(self) -> Point:
         return self._focal
+
+    @property
+    def site(self) -> int | None:
+        return self._site
@@ -0,0 +1,78 @@
+""" mapgenerator.algorithms.fortunes.batch """
+
+import numpy as np
+
+# Batched clipping of the finished diagram against the canvas.
+# Every row of the arrays is its own problem.
+
+
+def clip_segments(
+        segments: np.ndarray,
+        box: tuple[float, float, float, float]
+    ) -> tuple[np.ndarray, np.ndarray]:
+    """ Liang-Barsky for an (E, 4) array of (x1, y1, x2, y2) segments and a
+        box of (min x, min y, max x, max y). Returns the clipped segments and
+        a mask of the ones that are at least partly inside the box """
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    x = segments[:, 0]
+    y = segments[:, 1]
+    dx = segments[:, 2] - x
+    dy = segments[:, 3] - y
+
+    t0, t1 = _liang_barsky(x, y, dx, dy, box, np.ones(len(segments)))
+
+    # rows that miss the box come out as nan
+    with np.errstate(invalid="ignore"):
+        clipped = np.column_stack((x + t0 * dx, y + t0 * dy, x + t1 * dx, y + t1 * dy))
+
+    return clipped, t0 <= t1
+
+
+def ray_exits(
+        starts: np.ndarray,
+        directions: np.ndarray,
+        box: tuple[float, float, float, float]
+    ) -> np.ndarray:
+    """ Where each ray leaves the box, as an (E, 2) array. The rays
+        must start inside the box """
+    starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+    directions = np.asarray(directions, dtype=np.float64).reshape(-1, 2)
+
+    _, t1 = _liang_barsky(
+        starts[:, 0],
+        starts[:, 1],
+        directions[:, 0],
+        directions[:, 1],
+        box,
+        np.full(len(starts), np.inf)
+    )
+
+    return starts + t1[:, np.newaxis] * directions
+
+
+def _liang_barsky( # pylint: disable=too-many-arguments,too-many-positional-arguments
+        x: np.ndarray,
+        y: np.ndarray,
+        dx: np.ndarray,
+        dy: np.ndarray,
+        box: tuple[float, float, float, float],
+        t_max: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+    """ The parameters where each line x + t dx enters and leaves the box,
+        limited to [0, t_max]. Lines that miss the box get t0 > t1 """
+    min_x, min_y, max_x, max_y = box
+
+    # one row for each side of the box: left, right, bottom, top
+    p = np.stack((-dx, dx, -dy, dy))
+    q = np.stack((x - min_x, max_x - x, y - min_y, max_y - y))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = q / p
+
+    t0 = np.maximum(0.0, np.max(np.where(p < 0, r, -np.inf), axis=0))
+    t1 = np.minimum(t_max, np.min(np.where(p > 0, r, np.inf), axis=0))
+
+    # parallel to a side and outside of it
+    t0[np.any((p == 0) & (q < 0), axis=0)] = np.inf
+
+    return t0, t1
@@ -3,14 +3,25 @@
 # kato BinaryTreeLeaf.__init__
 from __future__ import annotations
 
+from collections.abc import Iterator
 from enum import Enum
-from typing import Self
+from typing import TYPE_CHECKING, Self
 
 from .base_structs import Arc, Ray
+from .geometry import breakpoint_y
+from .mode import SETTINGS
+
+if TYPE_CHECKING:
+    from .event import Event
 
 class BinaryTreeLeaf:
+    __slots__ = ("_arc", "_parent", "_prev", "_next", "_event")
+
     def __init__(self, arc: Arc):
-        self._arc = self.__validate_arc(arc)
+        if SETTINGS.validate:
+            self.__validate_arc(arc)
+
+        self._arc = arc
 
         # kuulemma miten pitää tehä jos viel undefined t. pep-0484
         # self._parent: 'BinaryTreeBark | None' = None
@@ -19,12 +30,32 @@ class BinaryTreeLeaf:
         # mä vihaan python tyypitystä
         self._parent: BinaryTreeBark | None = None
 
+        # leaves are also threaded into a doubly linked list,
+        # so the neighbouring arcs are one pointer away
+        self._prev: BinaryTreeLeaf | None = None
+        self._next: BinaryTreeLeaf | None = None
+
+        # the circle event that would squish this arc, so it can be
+        # cancelled when a neighbour changes
+        self._event: Event | None = None
+
     def __validate_arc(self, arc: Arc) -> Arc:
         if not isinstance(arc, Arc):
             raise TypeError("BinaryTreeLeaf arc must be of type Arc, was", type(arc))
 
         return arc
 
+    def reset(self, arc: Arc):
+        """ Make a removed leaf new again for arc, see BinaryTree.new_leaf """
+        if SETTINGS.validate:
+            self.__validate_arc(arc)
+
+        self._arc = arc
+        self._parent = None
+        self._prev = None
+        self._next = None
+        self._event = None
+
     @property
     def arc(self) -> Arc:
         return self._arc
@@ -34,8 +65,37 @@ class BinaryTreeLeaf:
         """" will be set by binary tree bark """
         return self._parent
 
+    @property
+    def prev(self) -> BinaryTreeLeaf | None:
+        """ The arc on the left side, will be set by binary tree """
+        return self._prev
+
+    @prev.setter
+    def prev(self, new_prev: BinaryTreeLeaf | None):
+        self._prev = new_prev
+
+    @property
+    def next(self) -> BinaryTreeLeaf | None:
+        """ The arc on the right side, will be set by binary tree """
+        return self._next
+
+    @next.setter
+    def next(self, new_next: BinaryTreeLeaf | None):
+        self._next = new_next
+
+    @property
+    def event(self) -> Event | None:
+        """ The pending circle event of the arc, will be set by the sweep """
+        return self._event
+
+    @event.setter
+    def event(self, new_event: Event | None):
+        self._event = new_event
+
+
+class BinaryTreeBark: # pylint: disable=too-many-instance-attributes
+    __slots__ = ("_ray", "_left", "_right", "_parent", "_red", "_above", "_y", "_stamp", "_below")
 
-class BinaryTreeBark:
     def __init__(
             self,
             ray: Ray,
@@ -43,19 +103,49 @@ class BinaryTreeBark:
             right: Self | BinaryTreeLeaf
         ):
         """ The idea is that normal nodes are rays, the leaves are arcs """
-        self._ray = self.__validate_ray(ray)
+        if SETTINGS.validate:
+            self.__validate_ray(ray)
+
+        self._ray = ray
         self._left = None
         self._right = None
-        self.left = self.__validate_child(left)
-        self.right = self.__validate_child(right)
+        self.left = left
+        self.right = right
         self._parent: Self | None = None
 
+        # red-black colour, leaves count as black
+        self._red = True
+
+        # the leaf right above the breakpoint, the one below is its prev.
+        # The y of the breakpoint is kept with the diretrix and the arc
+        # below it was worked out for. Leaves get reused, arcs don't
+        self._above = _leftmost(right)
+        self._y = 0.0
+        self._stamp: int | None = None
+        self._below: Arc | None = None
+
     def __validate_ray(self, ray: Ray) -> Ray:
         if not isinstance(ray, Ray):
             raise TypeError("BinaryTreeLeaf ray must be of type Ray, was", type(ray))
 
         return ray
 
+    def reset(
+            self,
+            ray: Ray,
+            left: Self | BinaryTreeLeaf,
+            right: Self | BinaryTreeLeaf
+        ):
+        """ Make a removed bark new again, see BinaryTree.new_leaf """
+        self.ray = ray
+        self.left = left
+        self.right = right
+        self._parent = None
+        self._red = True
+        self._above = _leftmost(right)
+        self._stamp = None
+        self._below = None
+
     def __validate_child(self, child: Self | BinaryTreeLeaf) -> Self | BinaryTreeLeaf:
         if not isinstance(child, (BinaryTreeBark, BinaryTreeLeaf)):
             raise TypeError(
@@ -69,13 +159,48 @@ class BinaryTreeBark:
     def ray(self) -> Ray:
         return self._ray
 
+    @ray.setter
+    def ray(self, new_ray: Ray):
+        if SETTINGS.validate:
+            self.__validate_ray(new_ray)
+
+        self._ray = new_ray
+
+    def y(self, diretrix: int) -> float:
+        """ The y of the breakpoint between the arcs on either side with
+            the diretrix at diretrix. Worked out from the two focals at
+            most once per diretrix, however many searches go through """
+        above = self._above
+        below = above.prev.arc
+        if self._stamp != diretrix or self._below is not below:
+            p = below.focal
+            q = above.arc.focal
+            self._y = breakpoint_y(p.x, p.y, q.x, q.y, diretrix)
+            self._stamp = diretrix
+            self._below = below
+
+        return self._y
+
+    @property
+    def above(self) -> BinaryTreeLeaf:
+        """ The leaf right above the breakpoint, will be set by binary tree """
+        return self._above
+
+    @above.setter
+    def above(self, new_above: BinaryTreeLeaf):
+        self._above = new_above
+        self._stamp = None
+
     @property
     def left(self) -> Self | BinaryTreeLeaf:
         return self._left
 
     @left.setter
     def left(self, new_left: Self | BinaryTreeLeaf):
-        self._left = self.__validate_child(new_left)
+        if SETTINGS.validate:
+            self.__validate_child(new_left)
+
+        self._left = new_left
         new_left._parent = self # pylint: disable=protected-access
 
     @property
@@ -84,29 +209,81 @@ class BinaryTreeBark:
 
     @right.setter
     def right(self, new_right: Self | BinaryTreeLeaf):
-        self._right = self.__validate_child(new_right)
+        if SETTINGS.validate:
+            self.__validate_child(new_right)
+
+        self._right = new_right
         new_right._parent = self # pylint: disable=protected-access
 
     @property
     def parent(self) -> Self | None:
         return self._parent
 
+    @property
+    def red(self) -> bool:
+        return self._red
+
+    @red.setter
+    def red(self, new_red: bool):
+        self._red = new_red
+
 
 class Side(Enum):
     LEFT = 0
     RIGHT = 1
 
 
+def _is_red(node: BinaryTreeBark | BinaryTreeLeaf | None) -> bool:
+    return isinstance(node, BinaryTreeBark) and node.red
+
+
+def _leftmost(node: BinaryTreeBark | BinaryTreeLeaf) -> BinaryTreeLeaf:
+    while isinstance(node, BinaryTreeBark):
+        node = node.left
+
+    return node
+
+
+def _count_leaves(root: BinaryTreeBark | BinaryTreeLeaf | None) -> int:
+    count = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, BinaryTreeBark):
+            stack += (node.left, node.right)
+        elif node is not None:
+            count += 1
+
+    return count
+
+
 class BinaryTree:
     def __init__(self, root: BinaryTreeBark | BinaryTreeLeaf | None):
+        """ The beachline. A red-black tree where barks are the
+            breakpoints between arcs and leaves are the arcs """
         self._root = self.__validate_initial(root)
-
-    def find_arc(self, y: int) -> tuple[BinaryTreeLeaf | None, BinaryTreeBark | None, Side | None]:
+        self._leaves = _count_leaves(root)
+
+        # removed nodes wait here to be used again, so a sweep only
+        # allocates as many nodes as its widest beachline has, and
+        # a sweep after reset none at all
+        self._free_leaves: list[BinaryTreeLeaf] = []
+        self._free_barks: list[BinaryTreeBark] = []
+
+    def __len__(self) -> int:
+        """ The number of arcs on the beachline """
+        return self._leaves
+
+    def find_arc(self, y: int, diretrix: int) -> tuple[BinaryTreeLeaf | None, Side | None]:
+        """ The arc on the beachline at y with the diretrix at diretrix,
+            and which side of its parent it is on """
+        # pylint: disable=no-member
+        # the loop only goes through barks, pylint can't tell
         child: BinaryTreeBark | BinaryTreeLeaf | None = self.root
         side: Side | None = None
 
         while isinstance(child, BinaryTreeBark):
-            if child.ray.start.y > y:
+            if child.y(diretrix) > y:
                 child = child.left
                 side = Side.LEFT
             else:
@@ -115,70 +292,311 @@ class BinaryTree:
 
         return (child, side)
 
-    def find_next_arc(self, side: Side, leaf: BinaryTreeLeaf) -> BinaryTreeLeaf | None:
+    @staticmethod
+    def depth(leaf: BinaryTreeLeaf) -> int:
+        """ How many barks there are above leaf """
+        depth = 0
+        node = leaf.parent
+        while node is not None:
+            depth += 1
+            node = node.parent
 
-        # öhh mä en iha tykkää täst implementaatiost,
-        # täs tulee joko paljon toistoo tai sit
-        # paljon if-lauseit
-        if side == Side.LEFT:
-            return self.__find_next_arc_left(leaf)
+        return depth
 
-        return self.__find_next_arc_right(leaf)
+    def new_leaf(self, arc: Arc) -> BinaryTreeLeaf:
+        """ A leaf for arc that is not on the beachline yet, one that was
+            removed earlier if there is one """
+        if not self._free_leaves:
+            return BinaryTreeLeaf(arc)
 
-    def __find_next_arc_left(self, leaf: BinaryTreeLeaf) -> BinaryTreeLeaf | None:
-        if leaf.parent is None:
-            return None
+        leaf = self._free_leaves.pop()
+        leaf.reset(arc)
 
-        parent = leaf.parent
-        while parent.parent is not None:
-            parent = parent.parent
-            child = parent.left
+        return leaf
 
-            if child is None:
-                continue
+    def __new_bark(
+            self,
+            ray: Ray,
+            left: BinaryTreeBark | BinaryTreeLeaf,
+            right: BinaryTreeBark | BinaryTreeLeaf
+        ) -> BinaryTreeBark:
+        if not self._free_barks:
+            return BinaryTreeBark(ray, left, right)
 
-            if isinstance(child, (BinaryTreeLeaf, BinaryTreeBark)):
-                break
+        bark = self._free_barks.pop()
+        bark.reset(ray, left, right)
 
-        if parent.parent is None:
-            return None
+        return bark
 
-        child = parent.parent
-        while not isinstance(child, BinaryTreeLeaf):
-            if child.right is not None:
-                child = child.right
-            else:
-                child = child.left
-
-        return child
+    def find_next_arc(self, side: Side, leaf: BinaryTreeLeaf) -> BinaryTreeLeaf | None:
+        """ The neighbouring arc on the given side, in O(1) """
+        if side == Side.LEFT:
+            return leaf.prev
 
-    def __find_next_arc_right(self, leaf: BinaryTreeLeaf) -> BinaryTreeLeaf | None:
-        if leaf.parent is None:
-            return None
+        return leaf.next
 
-        parent = leaf.parent
-        while parent.parent is not None:
-            parent = parent.parent
-            child = parent.right
+    def barks(self) -> Iterator[tuple[BinaryTreeBark, BinaryTreeLeaf, BinaryTreeLeaf]]:
+        """ Every bark from the bottom of the beachline up, with the
+            leaves right below and above it """
+        # pylint: disable=no-member
+        stack: list[BinaryTreeBark] = []
+        child = self.root
 
-            if child is None:
-                continue
+        while True:
+            while isinstance(child, BinaryTreeBark):
+                stack.append(child)
+                child = child.left
 
-            if isinstance(child, (BinaryTreeLeaf, BinaryTreeBark)):
-                break
+            if not stack:
+                return
 
-        if parent.parent is None:
-            return None
+            # child is the last leaf before the bark
+            bark = stack.pop()
+            yield bark, child, child.next
+            child = bark.right
 
-        child = parent.parent
-        while not isinstance(child, BinaryTreeLeaf):
-            if child.left is not None:
-                child = child.left
-            else:
-                child = child.right
+    def insert_arc(
+            self,
+            leaf: BinaryTreeLeaf,
+            side: Side,
+            ray: Ray,
+            arc: Arc
+        ) -> BinaryTreeLeaf:
+        """ Place a new arc next to leaf, split from it by ray.
+            Returns the leaf of the new arc """
+        new_leaf = self.new_leaf(arc)
+        parent = leaf.parent
 
-        return child
+        if side == Side.LEFT:
+            # the breakpoint below leaf is now below the new leaf
+            below = self.__bark_below(leaf)
+            if below is not None:
+                below.above = new_leaf
+
+            bark = self.__new_bark(ray, new_leaf, leaf)
+
+            new_leaf.prev = leaf.prev
+            new_leaf.next = leaf
+            if leaf.prev is not None:
+                leaf.prev.next = new_leaf
+            leaf.prev = new_leaf
+        else:
+            bark = self.__new_bark(ray, leaf, new_leaf)
+
+            new_leaf.prev = leaf
+            new_leaf.next = leaf.next
+            if leaf.next is not None:
+                leaf.next.prev = new_leaf
+            leaf.next = new_leaf
+
+        self.__replace(parent, leaf, bark)
+        self.__insert_fixup(bark)
+        self._leaves += 1
+
+        return new_leaf
+
+    def split_arc(
+            self,
+            leaf: BinaryTreeLeaf,
+            arc: Arc,
+            left_ray: Ray,
+            right_ray: Ray
+        ) -> BinaryTreeLeaf:
+        """ Split the arc of leaf in two with a new arc in the middle.
+            The old leaf keeps the left half. Both halves share the arc,
+            it is the same parabola. Returns the leaf of the new arc """
+        self.insert_arc(leaf, Side.RIGHT, right_ray, leaf.arc)
+
+        return self.insert_arc(leaf, Side.RIGHT, left_ray, arc)
+
+    def remove_arc(self, leaf: BinaryTreeLeaf, ray: Ray) -> tuple[Ray, Ray]:
+        """ Remove an arc squished between its neighbours. The neighbours
+            are then split by ray. Returns the rays that were on the
+            left and right side of the removed arc """
+        parent = leaf.parent
 
+        # the other bark next to leaf is the lowest ancestor
+        # that has leaf on the opposite side
+        node = parent
+        if parent.left is leaf:
+            while node.parent.left is node:
+                node = node.parent
+        else:
+            while node.parent.right is node:
+                node = node.parent
+        other = node.parent
+
+        if parent.left is leaf:
+            rays = (other.ray, parent.ray)
+            sibling = parent.right
+        else:
+            rays = (parent.ray, other.ray)
+            sibling = parent.left
+
+        other.ray = ray
+        other.above = leaf.next
+
+        leaf.prev.next = leaf.next
+        leaf.next.prev = leaf.prev
+        leaf.prev = None
+        leaf.next = None
+
+        self.__replace(parent.parent, parent, sibling)
+        leaf._parent = None # pylint: disable=protected-access
+        self._leaves -= 1
+
+        if not parent.red:
+            self.__delete_fixup(sibling)
+
+        # the caller may still read the arc of leaf, but
+        # nothing is taken from the free lists before the next insert
+        self._free_leaves.append(leaf)
+        self._free_barks.append(parent)
+
+        return rays
+
+    @staticmethod
+    def __bark_below(leaf: BinaryTreeLeaf) -> BinaryTreeBark | None:
+        """ The lowest bark with leaf in its right subtree """
+        node = leaf
+        while node.parent is not None and node.parent.left is node:
+            node = node.parent
+
+        return node.parent
+
+    def __replace(
+            self,
+            parent: BinaryTreeBark | None,
+            old: BinaryTreeBark | BinaryTreeLeaf,
+            new: BinaryTreeBark | BinaryTreeLeaf
+        ):
+        """ Put new in the place old had under parent """
+        if parent is None:
+            # the same leaves, so not the counting root setter
+            self._root = self.__validate_new(new)
+            new._parent = None # pylint: disable=protected-access
+        elif parent.left is old:
+            parent.left = new
+        else:
+            parent.right = new
+
+    def __rotate_left(self, bark: BinaryTreeBark):
+        pivot = bark.right
+        parent = bark.parent
+
+        bark.right = pivot.left
+        self.__replace(parent, bark, pivot)
+        pivot.left = bark
+
+    def __rotate_right(self, bark: BinaryTreeBark):
+        pivot = bark.left
+        parent = bark.parent
+
+        bark.left = pivot.right
+        self.__replace(parent, bark, pivot)
+        pivot.right = bark
+
+    def __insert_fixup(self, bark: BinaryTreeBark):
+        """ Restore the red-black properties after a red bark was added """
+        while _is_red(bark.parent):
+            parent = bark.parent
+            grandparent = parent.parent
+
+            if parent is grandparent.left:
+                uncle = grandparent.right
+                if _is_red(uncle):
+                    parent.red = False
+                    uncle.red = False
+                    grandparent.red = True
+                    bark = grandparent
+                    continue
+
+                if bark is parent.right:
+                    bark = parent
+                    self.__rotate_left(bark)
+                    parent = bark.parent
+
+                parent.red = False
+                grandparent.red = True
+                self.__rotate_right(grandparent)
+            else:
+                uncle = grandparent.left
+                if _is_red(uncle):
+                    parent.red = False
+                    uncle.red = False
+                    grandparent.red = True
+                    bark = grandparent
+                    continue
+
+                if bark is parent.left:
+                    bark = parent
+                    self.__rotate_right(bark)
+                    parent = bark.parent
+
+                parent.red = False
+                grandparent.red = True
+                self.__rotate_left(grandparent)
+
+        self._root.red = False
+
+    def __delete_fixup(self, node: BinaryTreeBark | BinaryTreeLeaf):
+        """ Restore the red-black properties after a black bark was
+            removed from above node. Only barks are ever coloured red,
+            so the sibling of a doubly black node is always a bark """
+        while node is not self._root and not _is_red(node):
+            parent = node.parent
+
+            if node is parent.left:
+                sibling = parent.right
+                if sibling.red:
+                    sibling.red = False
+                    parent.red = True
+                    self.__rotate_left(parent)
+                    sibling = parent.right
+
+                if not _is_red(sibling.left) and not _is_red(sibling.right):
+                    sibling.red = True
+                    node = parent
+                    continue
+
+                if not _is_red(sibling.right):
+                    sibling.left.red = False
+                    sibling.red = True
+                    self.__rotate_right(sibling)
+                    sibling = parent.right
+
+                sibling.red = parent.red
+                parent.red = False
+                sibling.right.red = False
+                self.__rotate_left(parent)
+            else:
+                sibling = parent.left
+                if sibling.red:
+                    sibling.red = False
+                    parent.red = True
+                    self.__rotate_right(parent)
+                    sibling = parent.left
+
+                if not _is_red(sibling.left) and not _is_red(sibling.right):
+                    sibling.red = True
+                    node = parent
+                    continue
+
+                if not _is_red(sibling.left):
+                    sibling.right.red = False
+                    sibling.red = True
+                    self.__rotate_left(sibling)
+                    sibling = parent.left
+
+                sibling.red = parent.red
+                parent.red = False
+                sibling.left.red = False
+                self.__rotate_right(parent)
+
+            node = self._root
+
+        if isinstance(node, BinaryTreeBark):
+            node.red = False
 
     def __validate_initial(
             self,
@@ -207,6 +625,28 @@ class BinaryTree:
 
         return root
 
+    def reset(self):
+        """ Empty the beachline for a new sweep, its nodes go to the
+            free lists to be used again """
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, BinaryTreeBark):
+                stack += (node.left, node.right)
+                self._free_barks.append(node)
+            elif node is not None:
+                self._free_leaves.append(node)
+
+        self._root = None
+        self._leaves = 0
+
+    def clear(self):
+        """ Empty the beachline and let go of its nodes """
+        self._root = None
+        self._leaves = 0
+        self._free_leaves.clear()
+        self._free_barks.clear()
+
     @property
     def root(self) -> BinaryTreeBark | BinaryTreeLeaf | None:
         return self._root
@@ -214,3 +654,4 @@ class BinaryTree:
     @root.setter
     def root(self, new_root: BinaryTreeBark | BinaryTreeLeaf):
         self._root = self.__validate_new(new_root)
+        self._leaves = _count_leaves(new_root)
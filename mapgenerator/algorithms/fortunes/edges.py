@@ -0,0 +1,40 @@
+""" mapgenerator.algorithms.fortunes.edges """
+
+import numpy as np
+
+
+def merge_pieces(edges: np.ndarray, edge_sites: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """ A site event starts two pieces of the same edge from one point, growing
+        in opposite directions. Join each such pair into the edge between their
+        ends, so it doesn't depend on where the sweep first saw it. Edges are
+        returned with their ends and sites in a fixed order """
+    pairs = np.sort(edge_sites, axis=1)
+    order = np.lexsort((pairs[:, 1], pairs[:, 0]))
+    edges = edges[order]
+    pairs = pairs[order]
+
+    same = np.all(pairs[1:] == pairs[:-1], axis=1)
+    same &= np.all(edges[1:, :2] == edges[:-1, :2], axis=1)
+
+    # only ever join two pieces, even if a third one looks the same
+    same[1:] &= ~same[:-1]
+    first = np.flatnonzero(same)
+    second = first + 1
+
+    merged = edges.copy()
+    merged[first, :2] = edges[second, 2:]
+
+    keep = np.ones(len(edges), dtype=bool)
+    keep[second] = False
+
+    return canonical(merged[keep]), pairs[keep]
+
+
+def canonical(edges: np.ndarray) -> np.ndarray:
+    """ Put the smaller end of each edge first """
+    swap = (edges[:, 0] > edges[:, 2]) \
+        | ((edges[:, 0] == edges[:, 2]) & (edges[:, 1] > edges[:, 3]))
+    edges = edges.copy()
+    edges[swap] = edges[swap][:, [2, 3, 0, 1]]
+
+    return edges
@@ -3,10 +3,14 @@
 # kato BinaryTreeLeaf.__init__
 from __future__ import annotations
 
+from collections.abc import Iterable
 from enum import Enum
+from heapq import heapify, heappop, heappush
 from typing import Self
 
 from .base_structs import Point
+from .binarytree import BinaryTreeLeaf
+from .mode import SETTINGS
 
 class EventType(Enum):
     SITE_EVENT = 0
@@ -14,13 +18,34 @@ class EventType(Enum):
 
 
 class Event:
-    def __init__(self, x: int, event_type: EventType, point: Point):
+    __slots__ = ("_x", "_type", "_point", "_leaf", "_site", "_active", "_queued")
+
+    def __init__(
+            self,
+            x: int,
+            event_type: EventType,
+            point: Point,
+            leaf: BinaryTreeLeaf | None = None,
+            site: int | None = None
+        ):
         """ The x axis of the event, the events type and a point that
-            goes with the event depending on type """
-        self._x = self.__validate_int(x)
-        self._type = self.__validate_type(event_type)
-        self._point = self.__validate_point(point)
+            goes with the event depending on type. Circle events also
+            carry the leaf of the arc that disappears, site events
+            the index of their site """
+        if SETTINGS.validate:
+            self.__validate_int(x)
+            self.__validate_type(event_type)
+            self.__validate_point(point)
+            self.__validate_leaf(leaf)
+            self.__validate_site(site)
+
+        self._x = x
+        self._type = event_type
+        self._point = point
+        self._leaf = leaf
+        self._site = site
         self._active = True
+        self._queued = False
 
     def __validate_point(self, point: Point) -> Point:
         if not isinstance(point, Point):
@@ -34,6 +59,18 @@ class Event:
 
         return event_type
 
+    def __validate_leaf(self, leaf: BinaryTreeLeaf | None) -> BinaryTreeLeaf | None:
+        if not isinstance(leaf, BinaryTreeLeaf) and leaf is not None:
+            raise TypeError("Event leaf must be of type BinaryTreeLeaf or None, was", type(leaf))
+
+        return leaf
+
+    def __validate_site(self, site: int | None) -> int | None:
+        if not isinstance(site, int) and site is not None:
+            raise TypeError("Event site must be of type int or None, was", type(site))
+
+        return site
+
     def __validate_int(self, x: int) -> int:
         if not isinstance(x, int):
             raise TypeError("Event x must be of type int, was", type(x))
@@ -41,8 +78,14 @@ class Event:
         return x
 
     def __lt__(self, other: Self) -> bool:
-        # for the priority queue
-        return self.x < other.x
+        # ties are broken by type and then y, so that
+        # the sweep is the same on every run
+        return self.key < other.key
+
+    @property
+    def key(self) -> tuple[int, int, int]:
+        """ (x, type, y), the order in which events are handled """
+        return (self._x, self._type.value, self._point.y)
 
     @property
     def type(self) -> EventType:
@@ -56,6 +99,14 @@ class Event:
     def x(self) -> int:
         return self._x
 
+    @property
+    def leaf(self) -> BinaryTreeLeaf | None:
+        return self._leaf
+
+    @property
+    def site(self) -> int | None:
+        return self._site
+
     @property
     def active(self) -> bool:
         return self._active
@@ -63,3 +114,102 @@ class Event:
     @active.setter
     def active(self, new_status: bool):
         self._active = new_status
+
+    @property
+    def queued(self) -> bool:
+        """ Whether the event is in a queue, will be set by event queue """
+        return self._queued
+
+    @queued.setter
+    def queued(self, new_queued: bool):
+        self._queued = new_queued
+
+
+class EventQueue:
+    def __init__(self):
+        """ Priority queue of events on top of a plain binary heap.
+            The sweep is single threaded, so no locking is needed.
+            Cancelled events stay in the heap and are dropped
+            when they reach the top """
+
+        # entries are (x, type, y, counter, event), so heapq compares
+        # plain tuples and the counter keeps equal keys in insertion order
+        self._heap: list[tuple[int, int, int, int, Event]] = []
+        self._counter = 0
+        self._live = 0
+        self._cancelled = 0
+
+    def push(self, event: Event):
+        """ Add a single event to the queue """
+        heappush(self._heap, self.__entry(event))
+        self._live += 1
+
+    def push_many(self, events: Iterable[Event]):
+        """ Add a number of events to the queue. A big batch
+            is heapified in O(n) instead of pushed one by one """
+        entries = [self.__entry(event) for event in events]
+
+        if len(entries) >= len(self._heap):
+            self._heap.extend(entries)
+            heapify(self._heap)
+        else:
+            for entry in entries:
+                heappush(self._heap, entry)
+
+        self._live += len(entries)
+
+    def pop(self) -> Event:
+        """ Remove and return the next active event """
+        self.__drop_cancelled()
+
+        if not self._heap:
+            raise IndexError("pop from an empty EventQueue")
+
+        self._live -= 1
+        event = heappop(self._heap)[-1]
+        event.queued = False
+
+        return event
+
+    def cancel(self, event: Event):
+        """ Cancel an event that is still in the queue, mostly
+            circle events that turned out to be false alarms. Events
+            that were popped or cancelled already are left alone """
+        if not event.active or not event.queued:
+            return
+
+        event.active = False
+        self._live -= 1
+        self._cancelled += 1
+
+    def empty(self) -> bool:
+        self.__drop_cancelled()
+        return not self._heap
+
+    def clear(self):
+        """ Drop every event, keeping the heap list for the next run """
+        for entry in self._heap:
+            entry[-1].queued = False
+        self._heap.clear()
+        self._live = 0
+
+    def __len__(self) -> int:
+        return self._live
+
+    @property
+    def cancelled(self) -> int:
+        """ How many events have been cancelled, over every run """
+        return self._cancelled
+
+    def __drop_cancelled(self):
+        heap = self._heap
+        while heap and not heap[0][-1].active:
+            heappop(heap)[-1].queued = False
+
+    def __entry(self, event: Event) -> tuple[int, int, int, int, Event]:
+        if not isinstance(event, Event):
+            raise TypeError("EventQueue items must be of type Event, was", type(event))
+
+        self._counter += 1
+        event.queued = True
+        return (*event.key, self._counter, event)
@@ -3,248 +3,639 @@
 # kato BinaryTreeLeaf.__init__
 from __future__ import annotations
 
-from queue import PriorityQueue
+import time
+from array import array
+from collections.abc import Iterator
 
+import numpy as np
+
+from . import batch
 from .base_structs import Point, Arc, Ray, Edge
-from .binarytree import BinaryTree, BinaryTreeBark, BinaryTreeLeaf, Side
+from .binarytree import BinaryTree, BinaryTreeLeaf, Side
+
+from .event import Event, EventQueue, EventType
+from .geometry import orientation
+from .locate import SiteIndex
+from .mesh import HalfEdgeMesh
+from .relax import RelaxStep, lloyd_sites
+from .stats import SweepStats, TraceHook
 
-from .event import Event, EventType
+# goes up whenever the sweep gives different edges for the same
+# sites, so that cached diagrams of older versions are not used
+ALGORITHM_VERSION = 4
 
 
-class FortunesAlgorithm:
+class FortunesAlgorithm: # pylint: disable=too-many-instance-attributes
     def __init__(self, size: tuple[int, int], points: list[Point]):
         """ Size is the canvas size, and points are a list of points
             with to run the algorithm """
         self._size = self.__validate_size(size)
-        self._event_queue = PriorityQueue()
+        self._event_queue = EventQueue()
+
+        # every site gets a cell, the mesh is filled in by the sweep
+        self._mesh = HalfEdgeMesh()
         self.add_points(points)
 
-        self._complete = set()
+        # finished edges as flat rows of (start x, start y, end x, end y)
+        # and (site, site). Edge objects are only made when asked for
+        self._edge_points = array("q")
+        self._edge_sites = array("q")
         self._diretrix = 0
         self._beachline = BinaryTree(None)
 
+        # the mesh grows with the whole diagram, so iter_edges turns it
+        # off. Half-edges then only get ids and the vertices only widen
+        # their bounding box
+        self._record_mesh = True
+        self._half_edges = 0
+        self._vertex_box: list[int] = []
+
+        # an edge that starts on a flat arc comes in from x = -inf, so
+        # its ray start is not an end. The open ones are remembered, and
+        # a finished one runs back from its vertex until the sweep closes
+        self._flat_half_edges: set[int] = set()
+        self._flat_rays: list[tuple[Ray, Arc, Arc]] = []
+
+        # built on the first get_index once the sweep is done
+        self._index: SiteIndex | None = None
+
+        # off unless instrument is called
+        self._stats: SweepStats | None = None
+        self._trace: TraceHook | None = None
+
+    @classmethod
+    def from_array(
+            cls,
+            sites: np.ndarray,
+            size: tuple[int, int] | None = None
+        ) -> FortunesAlgorithm:
+        """ Build the algorithm from an (N, 2) integer array of sites.
+            The row of a site is its index in get_edges_array. Size
+            defaults to the smallest canvas that fits all the sites """
+        sites = cls.__validate_array(sites)
+
+        if size is None:
+            size = tuple(int(n) + 1 for n in sites.max(axis=0)) if len(sites) else (1, 1)
+
+        algorithm = cls(size=size, points=[])
+        algorithm.add_points([Point(x, y) for x, y in sites.tolist()])
+
+        return algorithm
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self._size
+
+    @property
+    def stats(self) -> SweepStats | None:
+        """ What the sweeps so far did, if instrumented """
+        return self._stats
+
+    def instrument(self, trace: TraceHook | None = None) -> SweepStats:
+        """ Count and time the events from now on, and call trace with
+            every event before it is handled. The counts go on over the
+            sweeps of relax. Without this the sweep runs its plain event
+            loop, which has no checks for any of it """
+        if trace is not None and not callable(trace):
+            raise TypeError("Trace must be callable, was", type(trace))
+
+        if self._stats is None:
+            self._stats = SweepStats()
+        self._trace = trace
+
+        return self._stats
+
     def add_points(self, points: list[Point]):
         """ Add a number of sites/points to the canvas """
 
-        for point in points:
-            self.add_point(point)
+        self._event_queue.push_many(
+            self.__site_event_for(self.__validate_point(point))
+            for point in points
+        )
 
     def add_point(self, point: Point):
         """ Add a new site/point to the canvas """
 
         point = self.__validate_point(point)
 
-        self._event_queue.put(
-            Event(
-                x=point.x,
-                event_type=EventType.SITE_EVENT,
-                point=point
-            ),
-            block=False
+        self._event_queue.push(self.__site_event_for(point))
+
+    def __site_event_for(self, point: Point) -> Event:
+        return Event(
+            x=point.x,
+            event_type=EventType.SITE_EVENT,
+            point=point,
+            site=self._mesh.add_face(point.x, point.y)
         )
 
-    def get_areas(self) -> list[Edge]:
+    def get_areas(self) -> set[Edge]:
         """ Return the edges that split up the area """
-        while not self._event_queue.empty():
-            self.__next_event()
+        edges, _ = self.get_edges_array()
+
+        return {
+            Edge(start=Point(x1, y1), end=Point(x2, y2))
+            for x1, y1, x2, y2 in edges.tolist()
+        }
+
+    def get_edges_array(self) -> tuple[np.ndarray, np.ndarray]:
+        """ Return the edges as an (E, 4) array of (start x, start y, end x, end y)
+            and an (E, 2) array with the indices of the two sites each edge splits.
+            Edges are clipped to the canvas, and the ones outside of it left out """
+        self.__run()
+        self.__close()
+
+        edges, inside = self.__clip(self._edge_points)
+        sites = np.frombuffer(self._edge_sites, dtype=np.int64).reshape(-1, 2)
+
+        return edges[inside], sites[inside]
+
+    def get_mesh(self) -> HalfEdgeMesh:
+        """ Return the diagram as a half-edge mesh with the cell polygons,
+            the neighbours of every cell and the delaunay triangulation.
+            Not available after iter_edges, which doesn't record it """
+        self.__validate_mesh()
+        self.__run()
+        self.__close()
+
+        return self._mesh
+
+    def get_index(self) -> SiteIndex:
+        """ Return an index for finding which cell points are in. It is
+            built once, after the sweep, and saved with its arrays() """
+        self.__run()
+        self.__close()
+
+        if self._index is None:
+            self._index = SiteIndex(self._mesh.sites(), self._size)
+
+        return self._index
+
+    def relax(self, iterations: int, tolerance: float = 0.5) -> list[RelaxStep]:
+        """ Lloyd relaxation. Every round moves each site to the centroid
+            of its cell and sweeps again with the same queue, tree and
+            buffers. Stops early once no site moves more than tolerance.
+            Returns the timing and largest move of every round """
+        if not isinstance(iterations, int) or iterations < 0:
+            raise ValueError("Iterations must be a non-negative int, was", iterations)
+
+        self.__validate_mesh()
+        self.__run()
+        self.__close()
+
+        steps = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+
+            sites = self._mesh.sites()
+            moved = lloyd_sites(self._mesh, self._size)
+            displacement = float(np.hypot(*(moved - sites).T).max()) if len(sites) else 0.0
+
+            if displacement > tolerance:
+                self.__reset(moved)
+                self.__run()
+                self.__close()
+
+            steps.append(RelaxStep(time.perf_counter() - start, displacement))
+
+            if displacement <= tolerance:
+                break
+
+        return steps
+
+    def __reset(self, sites: np.ndarray):
+        """ Start over with new sites, keeping what was allocated """
+        self._event_queue.clear()
+        self._mesh.clear()
+        self._beachline.reset()
+        del self._edge_points[:]
+        del self._edge_sites[:]
+        self._diretrix = 0
+        self._index = None
+        self._record_mesh = True
+        self._half_edges = 0
+        del self._vertex_box[:]
+        self._flat_half_edges.clear()
+        self._flat_rays.clear()
+
+        self.add_points([Point(x, y) for x, y in sites.tolist()])
+
+    def iter_edges(self) -> Iterator[Edge]:
+        """ Run the sweep and yield every edge as soon as its circle event
+            finishes it. Yielded edges are not kept, so they won't show up
+            in get_areas or get_edges_array afterwards. A sweep that starts
+            here doesn't record the mesh either, so memory stays bounded
+            by the beachline and not by the diagram """
+        if len(self._beachline) == 0:
+            self._record_mesh = False
+
+        next_event = self.__next_event if self._stats is None else self.__instrumented_event
+        while True:
+            yield from self.__take_edges()
+
+            if self._event_queue.empty():
+                break
+
+            next_event()
+
+        # the edges that never finished come last
+        self.__close()
+        yield from self.__take_edges()
+
+    def __take_edges(self) -> Iterator[Edge]:
+        """ Yield the finished edges and drop the yielded ones """
+        edges, inside = self.__clip(self._edge_points)
+        taken = 0
+
+        try:
+            for (x1, y1, x2, y2), keep in zip(edges.tolist(), inside.tolist()):
+                taken += 1
+
+                if keep:
+                    yield Edge(start=Point(x1, y1), end=Point(x2, y2))
+        finally:
+            del self._edge_points[:taken * 4]
+            del self._edge_sites[:taken * 2]
+
+    def __clip(self, points: array) -> tuple[np.ndarray, np.ndarray]:
+        """ Clip edges to the canvas. Returns them rounded back to
+            integers, and a mask of the ones that are on the canvas """
+        width, height = self._size
+        edges, inside = batch.clip_segments(
+            np.frombuffer(points, dtype=np.int64),
+            (0, 0, width, height)
+        )
+
+        # the ones off the canvas have no clipped ends
+        edges[~inside] = 0
 
-        return self._complete
+        return np.rint(edges).astype(np.int64), inside
+
+    def __run(self):
+        """ Handle every event left in the queue """
+        next_event = self.__next_event if self._stats is None else self.__instrumented_event
+        while not self._event_queue.empty():
+            next_event()
 
     def __next_event(self):
         """ Get next event from event queue """
-        event = self._event_queue.get()
+        # cancelled events never come out of the queue
+        event = self._event_queue.pop()
 
         self._diretrix = event.x
 
-        if not event.active:
-            return
+        if event.type == EventType.SITE_EVENT:
+            self.__site_event(event.point, event.site)
+        else:
+            self.__circle_event(event.point, event.leaf)
+
+    def __instrumented_event(self):
+        """ __next_event, counted, timed and traced """
+        stats = self._stats
+        stats.max_queue = max(stats.max_queue, len(self._event_queue))
+        cancelled = self._event_queue.cancelled
+
+        event = self._event_queue.pop()
+        if self._trace is not None:
+            self._trace(event)
+
+        start = time.perf_counter()
+        self._diretrix = event.x
 
         if event.type == EventType.SITE_EVENT:
-            self.__site_event(event.point)
+            leaf = self.__site_event(event.point, event.site)
+
+            stats.site_events += 1
+            stats.site_seconds += time.perf_counter() - start
+            stats.max_insert_depth = max(stats.max_insert_depth, self._beachline.depth(leaf))
         else:
-            self.__circle_event(event.point)
+            self.__circle_event(event.point, event.leaf)
+
+            stats.circle_events += 1
+            stats.circle_seconds += time.perf_counter() - start
+
+        stats.false_alarms += self._event_queue.cancelled - cancelled
+        stats.max_beachline = max(stats.max_beachline, len(self._beachline))
 
-    def __site_event(self, point: Point):
+    def __site_event(self, point: Point, site: int) -> BinaryTreeLeaf:
         """ Site events are one of the two types of events,
             that happen everytime a new site (point on the map)
-            is discovered """
+            is discovered. Returns the leaf of the new arc """
 
-        new_branch = self.__place_new_site(point)
+        new_leaf = self.__place_new_site(Arc(focal=point, site=site))
 
-        if isinstance(new_branch, BinaryTreeLeaf):
-            return
+        self.__create_circle_events(new_leaf.prev, new_leaf.next)
 
-        self.__create_circle_events(new_branch)
+        return new_leaf
 
-    def __place_new_site(self, point: Point) -> BinaryTreeBark | BinaryTreeLeaf:
-        intersect_leaf, side = self._beachline.find_arc(point.y)
+    def __place_new_site(self, arc: Arc) -> BinaryTreeLeaf:
+        point = arc.focal
+        intersect_leaf, _ = self._beachline.find_arc(point.y, self._diretrix)
 
-        if intersect_leaf is not None:
-            intersect_arc = intersect_leaf.arc
-            intersect_point = Point(point.x, intersect_arc.x(point.y, self._diretrix))
+        if intersect_leaf is None:
+            new_leaf = self._beachline.new_leaf(arc)
+            self._beachline.root = new_leaf
 
-            new_branch = self.__site_event_binary_tree_branch(point, intersect_point, intersect_arc)
-        else:
-            new_branch = BinaryTreeLeaf(
-                arc=Arc(
-                    focal=point
-                )
-            )
+            return new_leaf
 
-        if intersect_leaf is not None and intersect_leaf.parent is not None:
-            if side == Side.LEFT:
-                intersect_leaf.parent.left = new_branch
-            elif side == Side.RIGHT:
-                intersect_leaf.parent.right = new_branch
+        intersect_arc = intersect_leaf.arc
 
-        else:
-            self._beachline.root = new_branch
+        # the arc gets split or a new neighbour, either way it won't
+        # be squished the way its circle event says
+        self.__cancel_circle_event(intersect_leaf)
 
-        return new_branch
+        if intersect_arc.focal.x == self._diretrix:
+            # the arc above is still a flat line, so there is nothing
+            # to split. The new arc goes right next to it, between
+            # it and the neighbour on that side
+            if point.y > intersect_arc.focal.y:
+                side = Side.RIGHT
+                below, above = intersect_arc, arc
+                self.__cancel_circle_event(intersect_leaf.next)
+            else:
+                side = Side.LEFT
+                below, above = arc, intersect_arc
+                self.__cancel_circle_event(intersect_leaf.prev)
 
-    def __site_event_binary_tree_branch(
-            self,
-            point: Point,
-            intersect_point: Point,
-            intersect_arc: Arc
-        ) -> BinaryTreeBark:
-        """ Return a tree branch for a site event """
-
-        arc_new = BinaryTreeLeaf(
-            arc=Arc(
-                focal=point
-            )
-        )
+            half_edge = self.__add_edge(below.site, above.site)
+            self._flat_half_edges.add(half_edge)
 
-        # Koska teemme uudet arc:it vanhan tilalle, vanha
-        # arc vaan jää leijuilemaan. Vaikka Pythonissa
-        # Garbage collector hoitaa, jää kuitenkin salee
-        # riski muistivuodosta
-        arc_left = BinaryTreeLeaf(
-            arc=Arc(
-                focal=intersect_arc.focal
+            return self._beachline.insert_arc(
+                intersect_leaf,
+                side,
+                Ray(
+                    start=Point(point.x, (point.y + intersect_arc.focal.y) // 2),
+                    direction=_bisector(below.focal, above.focal),
+                    half_edge=half_edge
+                ),
+                arc
             )
-        )
 
-        arc_right = BinaryTreeLeaf(
-            arc=Arc(
-                focal=intersect_arc.focal
-            )
-        )
+        intersect_point = Point(intersect_arc.x(point.y, self._diretrix), point.y)
+        direction = _bisector(intersect_arc.focal, point)
 
-        ray_right = BinaryTreeBark(
-            ray=Ray(
-                start=intersect_point,
-                direction=intersect_arc.tangent(intersect_point.y, self._diretrix)
-            ),
-            left=arc_new,
-            right=arc_right
-        )
+        # both rays trace the same edge, the left one ends where
+        # the old cell's half-edge starts and the right one where
+        # the new cell's does
+        half_edge = self.__add_edge(intersect_arc.site, arc.site)
 
-        ray_left = BinaryTreeBark(
-            ray=Ray(
+        return self._beachline.split_arc(
+            intersect_leaf,
+            arc,
+            left_ray=Ray(
                 start=intersect_point,
-                direction=-intersect_arc.tangent(intersect_point.y, self._diretrix)
+                direction=direction,
+                half_edge=half_edge
             ),
-            left=arc_left,
-            right=ray_right
+            right_ray=Ray(
+                start=intersect_point,
+                direction=-direction,
+                half_edge=half_edge ^ 1
+            )
         )
 
-        return ray_left
-
-    def __create_circle_events(self, new_branch: BinaryTreeBark):
-        new_arc_leaf = new_branch.right.left
-
-        for side, side_arc_leaf in zip(
-            [Side.LEFT, Side.RIGHT],
-            [new_branch.left, new_branch.right.right]
-            ):
-
-            new_arc = new_arc_leaf.arc
-            side_arc = side_arc_leaf.arc
-            other_arc = self._beachline.find_next_arc(side, side_arc_leaf)
-
-            if other_arc is None:
-                return
+    def __create_circle_events(self, *leaves: BinaryTreeLeaf | None):
+        """ Check if the given arcs get squished between their neighbours """
+        for leaf in leaves:
+            if leaf is None or leaf.prev is None or leaf.next is None:
+                continue
+
+            left = leaf.prev.arc.focal
+            middle = leaf.arc.focal
+            right = leaf.next.arc.focal
+
+            # the breakpoints only meet if the focals turn clockwise,
+            # collinear focals (like both sides of a split arc) never do
+            if orientation(left.x, left.y, middle.x, middle.y, right.x, right.y) >= 0:
+                continue
+
+            circle_point, r = leaf.arc.circle_point(leaf.prev.arc, leaf.next.arc)
+
+            self.__cancel_circle_event(leaf)
+            leaf.event = Event(
+                x=circle_point.x + r,
+                event_type=EventType.CIRCLE_EVENT,
+                point=circle_point,
+                leaf=leaf
+            )
+            self._event_queue.push(leaf.event)
 
-            circle_point, r = side_arc.circle_point(new_arc, other_arc)
+    def __cancel_circle_event(self, leaf: BinaryTreeLeaf | None):
+        """ Drop the pending circle event of the arc, in O(1). The queue
+            skips it when it gets to the top """
+        if leaf is None or leaf.event is None:
+            return
 
-            self._event_queue.put(
-                Event(
-                    x=circle_point.x + r,
-                    event_type=EventType.CIRCLE_EVENT,
-                    point=circle_point
-                ),
-                block=False
-            )
+        self._event_queue.cancel(leaf.event)
+        leaf.event = None
 
-    def __circle_event(self, point: Point):
+    def __circle_event(self, point: Point, leaf_to_delete: BinaryTreeLeaf):
         """ Circle events are the other type of event.
             They happen, when an arc is squished between
             two other arcs """
 
-        leaf_to_delete, leaf_side = self._beachline.find_arc(point.y)
+        left_leaf = leaf_to_delete.prev
+        right_leaf = leaf_to_delete.next
 
-        new_branch = self.__remove_arcs(point, leaf_to_delete, leaf_side)
+        # the events of the neighbours were for triples
+        # with the squished arc in them
+        leaf_to_delete.event = None
+        self.__cancel_circle_event(left_leaf)
+        self.__cancel_circle_event(right_leaf)
 
-        self.__create_circle_events(new_branch)
+        half_edge = self.__add_edge(left_leaf.arc.site, right_leaf.arc.site)
 
-        # Add new completed edges
-        self._complete.add(
-            Edge(
-                start=leaf_to_delete.parent.ray.start,
-                end=point
-            )
-        )
-        self._complete.add(
-            Edge(
-                start=leaf_to_delete.parent.parent.ray.start,
-                end=point
+        left_ray, right_ray = self._beachline.remove_arc(
+            leaf_to_delete,
+            Ray(
+                start=point,
+                direction=_bisector(left_leaf.arc.focal, right_leaf.arc.focal),
+                half_edge=half_edge
             )
         )
 
-    def __remove_arcs(
-            self,
-            circle_point: Point,
-            leaf_to_delete: BinaryTreeLeaf,
-            leaf_side: Side
-        ) -> BinaryTreeBark:
+        self.__create_circle_events(left_leaf, right_leaf)
 
-        if leaf_side == Side.LEFT:
-            first_child = leaf_to_delete.parent.right
-        else:
-            first_child = leaf_to_delete.parent.left
+        # Add new completed edges
+        self.__finish_edge(left_ray, point, left_leaf.arc, leaf_to_delete.arc)
+        self.__finish_edge(right_ray, point, leaf_to_delete.arc, right_leaf.arc)
+        self.__add_vertex(point, left_ray, right_ray, half_edge)
+
+    def __finish_edge(self, ray: Ray, end: Point, arc_one: Arc, arc_two: Arc):
+        if ray.half_edge in self._flat_half_edges:
+            # the edge is the part behind the vertex, which has no
+            # other end before the sweep closes
+            self._flat_half_edges.discard(ray.half_edge)
+            self._flat_rays.append((
+                Ray(start=end, direction=-ray.direction, half_edge=ray.half_edge ^ 1),
+                arc_two,
+                arc_one
+            ))
+            return
 
-        grandparent = leaf_to_delete.parent.parent
-        if grandparent.left == leaf_to_delete.parent:
-            grandparent_side = Side.RIGHT
-            second_child = grandparent.right
-        else:
-            grandparent_side = Side.LEFT
-            second_child = grandparent.left
+        self.__record_edge(ray.start, end, arc_one, arc_two)
 
-        new_branch = BinaryTreeBark(
-            ray=Ray(
-                start=circle_point,
-                direction=circle_point # idkk if this is even needed
-            ),
-            left=first_child if grandparent_side == Side.RIGHT else second_child,
-            right=second_child if grandparent_side == Side.RIGHT else first_child
+    def __add_edge(self, face: int, twin_face: int) -> int:
+        """ A new pair of half-edges, only counted if the mesh is off """
+        if self._record_mesh:
+            return self._mesh.add_edge(face, twin_face)
+
+        half_edge = self._half_edges
+        self._half_edges += 2
+
+        return half_edge
+
+    def __record_edge(self, start: Point, end: Point, arc_one: Arc, arc_two: Arc):
+        self._edge_points.extend((start.x, start.y, end.x, end.y))
+        self._edge_sites.extend((arc_one.site, arc_two.site))
+
+    def __add_vertex(self, point: Point, left_ray: Ray, right_ray: Ray, half_edge: int):
+        """ Tie the two finished edges and the new one together at point.
+            The squished cell is behind the point, the left cell below
+            and the right cell above it """
+        if not self._record_mesh:
+            self.__widen_vertex_box(point)
+            return
+
+        mesh = self._mesh
+        left = left_ray.half_edge
+        right = right_ray.half_edge
+
+        vertex = mesh.add_vertex(
+            point.x,
+            point.y,
+            (mesh.face(left), mesh.face(half_edge ^ 1), mesh.face(right))
         )
 
-        megaparent = leaf_to_delete.parent.parent.parent
-        if megaparent.left == leaf_to_delete.parent.parent:
-            megaparent.left = new_branch
+        mesh.set_origin(left, vertex)
+        mesh.set_origin(right, vertex)
+        mesh.set_origin(half_edge ^ 1, vertex)
+
+        mesh.link(left ^ 1, right)
+        mesh.link(half_edge, left)
+        mesh.link(right ^ 1, half_edge ^ 1)
+
+    def __close(self):
+        """ The edges still on the beachline never end. Cut them where they
+            leave a box well around everything, so the cells of the mesh
+            can be closed and clipped to the canvas """
+        if self._mesh.closed:
+            return
+
+        mesh = self._mesh
+        rays = self.__open_rays()
+
+        width, height = self._size
+        box = (0, 0, width, height)
+        bound = self.__bound(box, [ray.start for ray, *_ in rays])
 
+        ends = np.rint(batch.ray_exits(
+            [(ray.start.x, ray.start.y) for ray, *_ in rays],
+            [(ray.direction.x, ray.direction.y) for ray, *_ in rays],
+            bound
+        )).astype(np.int64)
+
+        for (ray, below, above), (x, y) in zip(rays, ends.tolist()):
+            if self._record_mesh:
+                mesh.set_origin(ray.half_edge, mesh.add_vertex(x, y))
+            self.__record_edge(ray.start, Point(x, y), below, above)
+
+        mesh.close(box, bound)
+
+    def __open_rays(self) -> list[tuple[Ray, Arc, Arc]]:
+        """ The rays that never finished as (ray, arc below, arc above),
+            the half-edge of a ray gets its origin where the ray is cut """
+        rays = []
+        for bark, below, above in self._beachline.barks():
+            direction = bark.ray.direction
+
+            # two arcs of the same site have no edge between them
+            if direction.x == 0 and direction.y == 0:
+                continue
+
+            rays.append((bark.ray, below.arc, above.arc))
+
+            # an edge that starts on a flat arc runs both ways, while
+            # a split arc has a bark for both halves of its edge
+            if bark.ray.half_edge in self._flat_half_edges:
+                half_edge = bark.ray.half_edge ^ 1
+                twin = Ray(start=bark.ray.start, direction=-direction, half_edge=half_edge)
+                rays.append((twin, above.arc, below.arc))
+
+        return rays + self._flat_rays
+
+    def __bound(
+            self,
+            box: tuple[int, int, int, int],
+            starts: list[Point]
+        ) -> tuple[int, int, int, int]:
+        """ A box around the canvas, every vertex and every ray start,
+            with a margin so the cut ends stay well off the canvas """
+        if self._record_mesh:
+            points = self._mesh.vertices()
         else:
-            megaparent.right = new_branch
+            points = np.array(self._vertex_box, dtype=np.int64).reshape(-1, 2)
+
+        points = np.vstack((
+            points,
+            np.array([(p.x, p.y) for p in starts], dtype=np.int64).reshape(-1, 2),
+            np.array(box, dtype=np.int64).reshape(2, 2)
+        ))
+
+        low = points.min(axis=0)
+        high = points.max(axis=0)
+        margin = int((high - low).max()) + 1
+
+        return (
+            int(low[0]) - margin,
+            int(low[1]) - margin,
+            int(high[0]) + margin,
+            int(high[1]) + margin
+        )
+
+    def __widen_vertex_box(self, point: Point):
+        box = self._vertex_box
+        if not box:
+            box.extend((point.x, point.y, point.x, point.y))
+            return
+
+        box[0] = min(box[0], point.x)
+        box[1] = min(box[1], point.y)
+        box[2] = max(box[2], point.x)
+        box[3] = max(box[3], point.y)
 
-        return new_branch
+    def __validate_mesh(self):
+        if not self._record_mesh:
+            raise ValueError("The mesh is not recorded for a sweep streamed with iter_edges")
 
     def __validate_size(self, size: tuple[int, int]) -> tuple[int, int]:
-        # TODO:
+        if not isinstance(size, tuple) or len(size) != 2 \
+                or not all(isinstance(n, int) for n in size):
+            raise TypeError("Size must be a tuple of two ints, was", size)
+
+        if size[0] <= 0 or size[1] <= 0:
+            raise ValueError("Size must be positive, was", size)
+
         return size
 
+    @staticmethod
+    def __validate_array(sites: np.ndarray) -> np.ndarray:
+        if not isinstance(sites, np.ndarray):
+            raise TypeError("Sites must be of type ndarray, was", type(sites))
+
+        if sites.ndim != 2 or sites.shape[1] != 2:
+            raise ValueError("Sites must be an array of shape (N, 2), was", sites.shape)
+
+        if not np.issubdtype(sites.dtype, np.integer):
+            raise TypeError("Sites must be integers, was", sites.dtype)
+
+        return sites
+
     def __validate_point(self, point: Point) -> Point:
         # TODO:
         return point
+
+
+def _bisector(below: Point, above: Point) -> Point:
+    """ The direction along the edge between the focals of two neighbouring
+        arcs that their breakpoint moves in, with below on its right """
+    return Point(above.y - below.y, below.x - above.x)
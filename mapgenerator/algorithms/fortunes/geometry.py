@@ -0,0 +1,132 @@
+""" mapgenerator.algorithms.fortunes.geometry """
+
+# all of these take the three points as plain coordinates,
+# since they are called for every candidate circle event
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+
+from fractions import Fraction
+from math import sqrt
+
+# Shewchuk's error bound for the orientation determinant in doubles,
+# if the float result is bigger than this it has the right sign
+EPSILON = 2.0 ** -53
+ORIENTATION_ERROR_BOUND = (3.0 + 16.0 * EPSILON) * EPSILON
+
+
+def orientation(ax: int, ay: int, bx: int, by: int, cx: int, cy: int) -> int:
+    """ Which way a -> b -> c turns: 1 counter clockwise,
+        -1 clockwise and 0 if the points are collinear """
+    det, filtered = _orientation_float(ax, ay, bx, by, cx, cy)
+
+    if not filtered:
+        det = _orientation_exact(ax, ay, bx, by, cx, cy)
+
+    return (det > 0) - (det < 0)
+
+
+def circumcircle( # pylint: disable=too-many-locals
+        ax: int, ay: int,
+        bx: int, by: int,
+        cx: int, cy: int
+    ) -> tuple[float, float, float] | None:
+    """ Center x, center y and radius of the circle through a, b and c.
+        None if the points are collinear and there is no such circle """
+    det, filtered = _orientation_float(ax, ay, bx, by, cx, cy)
+
+    if filtered:
+        # b and c relative to a keeps the numbers small
+        bx_, by_ = float(bx - ax), float(by - ay)
+        cx_, cy_ = float(cx - ax), float(cy - ay)
+        b_squared = bx_ * bx_ + by_ * by_
+        c_squared = cx_ * cx_ + cy_ * cy_
+        d = 2.0 * det
+
+        ux = (cy_ * b_squared - by_ * c_squared) / d
+        uy = (bx_ * c_squared - cx_ * b_squared) / d
+
+        return ax + ux, ay + uy, sqrt(ux * ux + uy * uy)
+
+    return _circumcircle_exact(ax, ay, bx, by, cx, cy)
+
+
+def breakpoint_y(px: int, py: int, qx: int, qy: int, diretrix: int) -> float:
+    """ The y where the arc of focal p meets the arc of focal q on the
+        beachline, with the arc of p below the breakpoint """
+    if px == diretrix:
+        # an arc whose focal is on the diretrix is still a flat line
+        return 0.5 * (py + qy) if qx == diretrix else float(py)
+
+    if qx == diretrix:
+        return float(qy)
+
+    a, b, c = breakpoint_coefficients(px, py, qx, qy, diretrix)
+
+    if a == 0.0:
+        return py - c / b if b != 0.0 else 0.5 * (py + qy)
+
+    root = sqrt(max(b * b - 4.0 * a * c, 0.0))
+
+    # the same root in the form that doesn't cancel out
+    if b > 0.0:
+        return py + 2.0 * c / (-b - root)
+
+    return py + (-b + root) / (2.0 * a)
+
+
+def breakpoint_coefficients(
+        px: int, py: int,
+        qx: int, qy: int,
+        diretrix: int
+    ) -> tuple[float, float, float]:
+    """ x_q(y) - x_p(y) = a u² + b u + c with u = y - py, as (a, b, c).
+        Going upwards the beachline moves from the arc of p to the arc
+        of q, so the breakpoint is the root where it grows """
+    a_p = 0.5 / (px - diretrix)
+    a_q = 0.5 / (qx - diretrix)
+    dy = qy - py
+
+    return a_q - a_p, -2.0 * a_q * dy, a_q * dy * dy + 0.5 * (qx - px)
+
+
+def _orientation_float(
+        ax: int, ay: int,
+        bx: int, by: int,
+        cx: int, cy: int
+    ) -> tuple[float, bool]:
+    """ The orientation determinant in floats, and whether
+        it passed the error filter """
+    left = (float(bx) - ax) * (float(cy) - ay)
+    right = (float(by) - ay) * (float(cx) - ax)
+    det = left - right
+
+    return det, abs(det) > ORIENTATION_ERROR_BOUND * (abs(left) + abs(right))
+
+
+def _orientation_exact(ax: int, ay: int, bx: int, by: int, cx: int, cy: int) -> Fraction:
+    ax, ay = Fraction(ax), Fraction(ay)
+
+    return (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+
+
+def _circumcircle_exact(
+        ax: int, ay: int,
+        bx: int, by: int,
+        cx: int, cy: int
+    ) -> tuple[float, float, float] | None:
+    """ Same as circumcircle but with exact arithmetic, for the
+        nearly collinear points where floats can't be trusted """
+    det = _orientation_exact(ax, ay, bx, by, cx, cy)
+
+    if det == 0:
+        return None
+
+    ax, ay = Fraction(ax), Fraction(ay)
+    bx_, by_ = bx - ax, by - ay
+    cx_, cy_ = cx - ax, cy - ay
+    b_squared = bx_ * bx_ + by_ * by_
+    c_squared = cx_ * cx_ + cy_ * cy_
+
+    ux = (cy_ * b_squared - by_ * c_squared) / (2 * det)
+    uy = (bx_ * c_squared - cx_ * b_squared) / (2 * det)
+
+    return float(ax + ux), float(ay + uy), sqrt(ux * ux + uy * uy)
@@ -0,0 +1,266 @@
+""" mapgenerator.algorithms.fortunes.locate """
+
+from __future__ import annotations
+
+import math
+from collections.abc import Mapping
+
+import numpy as np
+
+# grid cells per site, smaller cells have fewer candidates
+# each but take more memory
+CELLS_PER_SITE = 2.0
+
+# how many grid cells get their candidates at once while building
+BUILD_CHUNK = 1 << 15
+
+
+class SiteIndex:
+    __slots__ = ("_sites", "_points", "_size", "_cell", "_shape", "_offsets", "_candidates")
+
+    def __init__(self, sites: np.ndarray, size: tuple[int, int]):
+        """ Which cell of the diagram a point is in, for a lot of points at
+            once. The cell of a point is the cell of its nearest site, so
+            the index only needs the sites and the canvas.
+
+            The canvas is split into a grid, and every grid cell keeps the
+            few sites whose cells could reach into it. Finding a point is
+            then a look up in its grid cell and a handful of distances.
+            Sites off the canvas, which the sweep takes too, go in the
+            grid cells on its edge """
+        self._sites = _validate_sites(sites, size)
+        self._size = size
+        self._points = self._sites.astype(np.float64)
+
+        width, height = size
+        self._cell = math.sqrt(width * height / (CELLS_PER_SITE * max(1, len(self._sites))))
+        self._shape = (
+            max(1, math.ceil(width / self._cell)),
+            max(1, math.ceil(height / self._cell))
+        )
+
+        self._offsets, self._candidates = self.__build()
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray]) -> SiteIndex:
+        """ Load an index saved with arrays(), for example from the npz
+            file it was saved in next to the diagram """
+        index = cls.__new__(cls)
+        width, height, columns, rows = (int(n) for n in arrays["index_shape"])
+
+        index._sites = _validate_sites(arrays["sites"], (width, height))
+        index._size = (width, height)
+        index._points = index._sites.astype(np.float64)
+        index._cell = float(arrays["index_cell"])
+        index._shape = (columns, rows)
+        index._offsets = np.asarray(arrays["index_offsets"], dtype=np.int64)
+        index._candidates = np.asarray(arrays["index_candidates"], dtype=np.int64)
+
+        if len(index._offsets) != columns * rows + 1:
+            raise ValueError("Index offsets don't match the grid, was", len(index._offsets))
+
+        return index
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """ Everything the index needs as named arrays, for np.savez. The
+            sites are under the same name as in the saved maps """
+        return {
+            "sites": self._sites,
+            "index_shape": np.array((*self._size, *self._shape), dtype=np.int64),
+            "index_cell": np.array(self._cell),
+            "index_offsets": self._offsets,
+            "index_candidates": self._candidates
+        }
+
+    def __len__(self) -> int:
+        return len(self._sites)
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self._size
+
+    def locate(self, points: np.ndarray) -> np.ndarray:
+        """ The site whose cell each of the (Q, 2) points is in, as a (Q,)
+            array. A point on an edge goes to the lower site, and points
+            off the canvas get -1 """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        result = np.full(len(points), -1, dtype=np.int64)
+
+        width, height = self._size
+        x, y = points[:, 0], points[:, 1]
+        on_canvas = (x >= 0) & (x <= width) & (y >= 0) & (y <= height)
+        if self._sites.size == 0:
+            return result
+
+        queries = np.flatnonzero(on_canvas)
+        result[queries] = self.__nearest(x[queries], y[queries])
+
+        return result
+
+    def __nearest(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """ The nearest site to each point, from the candidates of
+            its grid cell """
+        cells = self.__cells(x, y)
+        starts = self._offsets[cells]
+        counts = self._offsets[cells + 1] - starts
+
+        # every grid cell has at least one candidate
+        best = self._candidates[starts]
+        best_distance = self.__distances(x, y, best)
+
+        # the rest one candidate at a time, dropping the queries whose
+        # grid cell has run out of them
+        active = np.arange(len(x))
+        slot = 1
+        while True:
+            active = active[counts[active] > slot]
+            if active.size == 0:
+                break
+
+            sites = self._candidates[starts[active] + slot]
+            distances = self.__distances(x[active], y[active], sites)
+            closer = (distances < best_distance[active]) | (
+                (distances == best_distance[active]) & (sites < best[active])
+            )
+
+            best[active[closer]] = sites[closer]
+            best_distance[active[closer]] = distances[closer]
+            slot += 1
+
+        return best
+
+    def __distances(self, x: np.ndarray, y: np.ndarray, sites: np.ndarray) -> np.ndarray:
+        dx = self._points[sites, 0] - x
+        dy = self._points[sites, 1] - y
+
+        return dx * dx + dy * dy
+
+    def __cells(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """ The grid cell of each point, the nearest one on the edge
+            for points off the canvas. A site off the canvas is then
+            never further in the grid than it really is, so the reach
+            of __candidates still finds it """
+        columns, rows = self._shape
+        column = np.clip(np.floor(x / self._cell), 0, columns - 1).astype(np.int64)
+        row = np.clip(np.floor(y / self._cell), 0, rows - 1).astype(np.int64)
+
+        return column * rows + row
+
+    def __build(self) -> tuple[np.ndarray, np.ndarray]:
+        """ The candidates of every grid cell as (offsets, sites), the
+            candidates of cell are sites[offsets[cell]:offsets[cell + 1]] """
+        cell_count = self._shape[0] * self._shape[1]
+
+        if self._sites.size == 0:
+            return np.zeros(cell_count + 1, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        # the sites of each grid cell
+        buckets = _grouped(
+            self.__cells(self._points[:, 0], self._points[:, 1]),
+            cell_count
+        )
+
+        owners = []
+        candidates = []
+        pending = np.arange(cell_count)
+        reach = 2
+        while pending.size:
+            missed = []
+            for chunk in np.array_split(pending, math.ceil(len(pending) / BUILD_CHUNK)):
+                owner, site, done = self.__candidates(chunk, reach, *buckets)
+                owners.append(chunk[owner])
+                candidates.append(site)
+                missed.append(chunk[~done])
+
+            # grid cells far from every site look further out
+            pending = np.concatenate(missed)
+            reach *= 2
+
+        order, offsets = _grouped(np.concatenate(owners), cell_count)
+
+        return offsets, np.concatenate(candidates)[order]
+
+    def __candidates( # pylint: disable=too-many-locals
+            self,
+            cells: np.ndarray,
+            reach: int,
+            order: np.ndarray,
+            bucket_offsets: np.ndarray
+        ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ The sites that can be nearest to some point of each grid cell,
+            looking at the grid cells at most reach away. Returns them as
+            (position in cells, site) pairs, and a mask of the cells whose
+            candidates all were in reach """
+        columns, rows = self._shape
+        size = self._cell
+
+        # every site in reach, as (position in cells, site) pairs
+        steps = np.arange(-reach, reach + 1)
+        column = cells[:, np.newaxis] // rows + np.repeat(steps, len(steps))
+        row = cells[:, np.newaxis] % rows + np.tile(steps, len(steps))
+        inside = (column >= 0) & (column < columns) & (row >= 0) & (row < rows)
+
+        buckets = (column * rows + row)[inside]
+        counts = bucket_offsets[buckets + 1] - bucket_offsets[buckets]
+        owner = np.repeat(np.nonzero(inside)[0], counts)
+        firsts = np.repeat(bucket_offsets[buckets] - np.cumsum(counts) + counts, counts)
+        site = order[firsts + np.arange(len(owner))]
+
+        # the nearest site to the middle of each grid cell
+        low_x = cells // rows * size
+        low_y = cells % rows * size
+        sites_x = self._points[site, 0]
+        sites_y = self._points[site, 1]
+        distances = (sites_x - low_x[owner] - size / 2) ** 2 \
+            + (sites_y - low_y[owner] - size / 2) ** 2
+
+        groups = np.searchsorted(owner, np.arange(len(cells) + 1))
+        found = groups[:-1] < groups[1:]
+        nearest = np.full(len(cells), np.inf)
+        nearest[found] = np.minimum.reduceat(distances, groups[:-1][found])
+        hits = np.flatnonzero(distances == nearest[owner])
+        _, first_hit = np.unique(owner[hits], return_index=True)
+        closest = np.full(len(cells), -1, dtype=np.int64)
+        closest[owner[hits[first_hit]]] = site[hits[first_hit]]
+
+        # a site can only win somewhere in the grid cell if it beats the
+        # closest one at a corner, and all of those are within this far
+        # of the middle. Past the reach the cell has to look further
+        radius = np.sqrt(nearest) + math.sqrt(2) * size
+        done = radius <= (reach + 0.5) * size
+
+        # site is closer than the closest one where (q - site)² <= (q - closest)²,
+        # which is linear in q, so it is enough to try the far corner
+        closest_x = self._points[closest[owner], 0]
+        closest_y = self._points[closest[owner], 1]
+        dx = sites_x - closest_x
+        dy = sites_y - closest_y
+        far = np.maximum(low_x[owner] * dx, (low_x[owner] + size) * dx) \
+            + np.maximum(low_y[owner] * dy, (low_y[owner] + size) * dy)
+        squares = sites_x ** 2 + sites_y ** 2
+        closest_squares = closest_x ** 2 + closest_y ** 2
+        wins = squares - closest_squares - 2 * far <= 1e-9 * (squares + closest_squares + 1)
+
+        keep = wins & done[owner]
+
+        return owner[keep], site[keep], done
+
+
+def _grouped(groups: np.ndarray, count: int) -> tuple[np.ndarray, np.ndarray]:
+    """ The order that sorts groups, keeping the order inside each group,
+        and the offsets where each of the count groups starts in it """
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(groups, minlength=count), out=offsets[1:])
+
+    return np.argsort(groups, kind="stable"), offsets
+
+
+def _validate_sites(sites: np.ndarray, size: tuple[int, int]) -> np.ndarray:
+    if not isinstance(size, tuple) or len(size) != 2 or size[0] <= 0 or size[1] <= 0:
+        raise ValueError("Size must be a tuple of two positive ints, was", size)
+
+    sites = np.asarray(sites)
+    if sites.ndim != 2 or sites.shape[1] != 2:
+        raise ValueError("Sites must be an array of shape (N, 2), was", sites.shape)
+
+    return sites.astype(np.int64)
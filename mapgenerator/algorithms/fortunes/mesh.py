@@ -0,0 +1,332 @@
+""" mapgenerator.algorithms.fortunes.mesh """
+
+from array import array
+
+import numpy as np
+
+# (min x, min y, max x, max y)
+Box = tuple[int, int, int, int]
+
+
+class HalfEdgeMesh: # pylint: disable=too-many-instance-attributes,too-many-public-methods
+    __slots__ = (
+        "_sites", "_vertices", "_triangles", "_origin", "_face", "_next", "_prev",
+        "_face_edge", "_bounds"
+    )
+
+    def __init__(self):
+        """ A doubly connected edge list of the diagram, filled in by the
+            sweep. Every edge is two half-edges, h and its twin h ^ 1, one
+            for the cell on each side. The half-edges of a cell go around
+            it counterclockwise, and vertex -1 is a missing end """
+        # site x, y of every cell
+        self._sites = array("q")
+
+        # vertex x, y and the three sites of its delaunay triangle
+        self._vertices = array("q")
+        self._triangles = array("q")
+
+        # per half-edge
+        self._origin = array("q")
+        self._face = array("q")
+        self._next = array("q")
+        self._prev = array("q")
+
+        # per site, one of the half-edges of its cell
+        self._face_edge = array("q")
+
+        # the canvas and the square the open edges were cut at, once closed
+        self._bounds: tuple[Box, Box] | None = None
+
+    def add_face(self, x: int, y: int) -> int:
+        """ Add a cell for a new site and return its index """
+        self._sites.extend((x, y))
+        self._face_edge.append(-1)
+
+        return len(self._face_edge) - 1
+
+    def add_vertex(self, x: int, y: int, sites: tuple[int, int, int] | None = None) -> int:
+        """ Add a vertex, sites are the three cells around it in
+            counterclockwise order. The far ends of open edges have no
+            sites, and come after all the others """
+        self._vertices.extend((x, y))
+        if sites is not None:
+            self._triangles.extend(sites)
+
+        return len(self._vertices) // 2 - 1
+
+    def add_edge(self, face: int, twin_face: int) -> int:
+        """ Add an edge between two cells. Returns the half-edge of face,
+            the half-edge of twin_face is its twin """
+        half_edge = len(self._origin)
+
+        self._origin.extend((-1, -1))
+        self._face.extend((face, twin_face))
+        self._next.extend((-1, -1))
+        self._prev.extend((-1, -1))
+
+        for h, site in ((half_edge, face), (half_edge + 1, twin_face)):
+            if self._face_edge[site] == -1:
+                self._face_edge[site] = h
+
+        return half_edge
+
+    def set_origin(self, half_edge: int, vertex: int):
+        self._origin[half_edge] = vertex
+
+    def link(self, half_edge: int, following: int):
+        """ Make following come right after half_edge around their cell """
+        self._next[half_edge] = following
+        self._prev[following] = half_edge
+
+    def clear(self):
+        """ Empty the mesh for a new sweep. The arrays are kept """
+        for buffer in (
+                self._sites, self._vertices, self._triangles, self._origin,
+                self._face, self._next, self._prev, self._face_edge
+            ):
+            del buffer[:]
+
+        self._bounds = None
+
+    def close(self, box: Box, bound: Box):
+        """ Mark the mesh done. Box is the canvas as (min x, min y, max x,
+            max y), and bound a larger box with the far ends of the open
+            edges on its sides. Cells are closed and clipped to the canvas
+            from now on """
+        self._bounds = (box, bound)
+
+    @property
+    def closed(self) -> bool:
+        return self._bounds is not None
+
+    def __len__(self) -> int:
+        """ The number of cells """
+        return len(self._face_edge)
+
+    def origin(self, half_edge: int) -> int:
+        return self._origin[half_edge]
+
+    def face(self, half_edge: int) -> int:
+        return self._face[half_edge]
+
+    def next(self, half_edge: int) -> int:
+        return self._next[half_edge]
+
+    def prev(self, half_edge: int) -> int:
+        return self._prev[half_edge]
+
+    def half_edges(self, site: int) -> list[int]:
+        """ The half-edges of a cell in counterclockwise order. A cell the
+            sweep left open starts from the half-edge with no prev """
+        start = self._face_edge[site]
+        if start == -1:
+            return []
+
+        # go back to where an open cell starts
+        h = start
+        while self._prev[h] != -1 and self._prev[h] != start:
+            h = self._prev[h]
+        first = h
+
+        half_edges = []
+        while h != -1:
+            half_edges.append(h)
+            h = self._next[h]
+            if h == first:
+                break
+
+        return half_edges
+
+    def cell_polygon(self, site: int) -> np.ndarray:
+        """ The corners of a cell as an (K, 2) array, counterclockwise.
+            Once the mesh is closed the cell is clipped to the canvas, and
+            the border cells go around the canvas corners """
+        vertices = np.frombuffer(self._vertices, dtype=np.int64).reshape(-1, 2)
+        half_edges = self.half_edges(site)
+
+        ends = []
+        for h in half_edges:
+            for vertex in (self._origin[h], self._origin[h ^ 1]):
+                if vertex != -1 and (not ends or ends[-1] != vertex):
+                    ends.append(vertex)
+
+        if len(ends) > 1 and ends[0] == ends[-1]:
+            ends.pop()
+
+        if self._bounds is None:
+            return vertices[ends].copy()
+
+        box, bound = self._bounds
+        corners = [tuple(point) for point in vertices[ends].tolist()]
+
+        if not half_edges:
+            # a lone site owns everything
+            corners = _corners_between(None, None, bound)
+        elif self._prev[half_edges[0]] == -1:
+            # an open cell goes around the bound from where
+            # its last edge leaves to where its first one comes in
+            corners += _corners_between(corners[-1], corners[0], bound)
+
+        return np.array(_clip_polygon(corners, box), dtype=np.int64).reshape(-1, 2)
+
+    def cell_polygons(self) -> list[np.ndarray]:
+        """ The corners of every cell, indexed by site """
+        return [self.cell_polygon(site) for site in range(len(self))]
+
+    def cell_polygons_array(self) -> tuple[np.ndarray, np.ndarray]:
+        """ The corners of every cell in one (K, 2) array and the offsets
+            where each cell starts, the corners of site are
+            corners[offsets[site]:offsets[site + 1]] """
+        polygons = self.cell_polygons()
+
+        offsets = np.zeros(len(polygons) + 1, dtype=np.int64)
+        np.cumsum([len(polygon) for polygon in polygons], out=offsets[1:])
+
+        if not polygons:
+            return np.empty((0, 2), dtype=np.int64), offsets
+
+        return np.concatenate(polygons).reshape(-1, 2), offsets
+
+    def cell_sides(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ Every side of every cell, counterclockwise around its cell, as
+            (K, 2) arrays of the corners they start and end at and a (K,)
+            array of the cell of each side """
+        corners, offsets = self.cell_polygons_array()
+        counts = np.diff(offsets)
+
+        # the corner after each corner, wrapping around inside its own cell
+        following = np.arange(1, len(corners) + 1)
+        closed = counts > 0
+        following[offsets[1:][closed] - 1] = offsets[:-1][closed]
+
+        return corners, corners[following], np.repeat(np.arange(len(counts)), counts)
+
+    def neighbours(self, site: int) -> np.ndarray:
+        """ The sites whose cells share an edge with the cell of site """
+        return np.array([self._face[h ^ 1] for h in self.half_edges(site)], dtype=np.int64)
+
+    def adjacency(self) -> tuple[np.ndarray, np.ndarray]:
+        """ The neighbours of every cell as (offsets, neighbours) arrays, the
+            neighbours of site are neighbours[offsets[site]:offsets[site + 1]] """
+        faces = np.frombuffer(self._face, dtype=np.int64)
+        twins = faces.reshape(-1, 2)[:, ::-1].reshape(-1)
+
+        order = np.argsort(faces, kind="stable")
+        counts = np.bincount(faces, minlength=len(self))
+        offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        return offsets, twins[order].copy()
+
+    def sites(self) -> np.ndarray:
+        """ The site of every cell as an (N, 2) array """
+        return np.frombuffer(self._sites, dtype=np.int64).reshape(-1, 2).copy()
+
+    def vertices(self) -> np.ndarray:
+        """ The vertices as an (V, 2) array """
+        return np.frombuffer(self._vertices, dtype=np.int64).reshape(-1, 2).copy()
+
+    def delaunay_triangles(self) -> np.ndarray:
+        """ The dual delaunay triangulation as an (V, 3) array of sites,
+            one counterclockwise triangle for every vertex """
+        return np.frombuffer(self._triangles, dtype=np.int64).reshape(-1, 3).copy()
+
+
+def _corners_between(
+        start: tuple[float, float] | None,
+        end: tuple[float, float] | None,
+        box: Box
+    ) -> list[tuple[float, float]]:
+    """ The corners of box passed going counterclockwise along its sides
+        from start to end, all four if there are no points """
+    min_x, min_y, max_x, max_y = box
+    corners = [(max_x, min_y), (max_x, max_y), (min_x, max_y), (min_x, min_y)]
+
+    if start is None or end is None:
+        return corners
+
+    first = _perimeter(start, box)
+    last = _perimeter(end, box)
+    if last <= first:
+        last += 4
+
+    # corner k sits at perimeter k + 1
+    passed = []
+    k = int(first)
+    while k + 1 < last:
+        passed.append(corners[k % 4])
+        k += 1
+
+    return passed
+
+
+def _perimeter(point: tuple[float, float], box: Box) -> float:
+    """ How far along the sides of box a point on them is, going
+        counterclockwise from the bottom left corner, one per side """
+    x, y = point
+    min_x, min_y, max_x, max_y = box
+
+    if y == min_y and x < max_x:
+        return (x - min_x) / (max_x - min_x)
+    if x == max_x and y < max_y:
+        return 1 + (y - min_y) / (max_y - min_y)
+    if y == max_y and x > min_x:
+        return 2 + (max_x - x) / (max_x - min_x)
+
+    return 3 + (max_y - y) / (max_y - min_y)
+
+
+def _clip_polygon(
+        corners: list[tuple[float, float]],
+        box: Box
+    ) -> list[tuple[int, int]]:
+    """ Sutherland-Hodgman, cells are convex so one pass per side is enough """
+    min_x, min_y, max_x, max_y = box
+    sides = (
+        (lambda p: p[0] >= min_x, 0, min_x),
+        (lambda p: p[0] <= max_x, 0, max_x),
+        (lambda p: p[1] >= min_y, 1, min_y),
+        (lambda p: p[1] <= max_y, 1, max_y),
+    )
+
+    for inside, axis, value in sides:
+        clipped = []
+        for i, current in enumerate(corners):
+            previous = corners[i - 1]
+            if inside(current):
+                if not inside(previous):
+                    clipped.append(_crossing(previous, current, axis, value))
+                clipped.append(current)
+            elif inside(previous):
+                clipped.append(_crossing(previous, current, axis, value))
+        corners = clipped
+
+    return _rounded(corners)
+
+
+def _rounded(corners: list[tuple[float, float]]) -> list[tuple[int, int]]:
+    """ Round the corners to integers, dropping the ones that end up
+        on top of each other """
+    rounded = []
+    for x, y in corners:
+        point = (round(x), round(y))
+        if not rounded or rounded[-1] != point:
+            rounded.append(point)
+
+    if len(rounded) > 1 and rounded[0] == rounded[-1]:
+        rounded.pop()
+
+    return rounded
+
+
+def _crossing(
+        a: tuple[float, float],
+        b: tuple[float, float],
+        axis: int,
+        value: float
+    ) -> tuple[float, float]:
+    """ Where the segment from a to b crosses the line where axis is value """
+    t = (value - a[axis]) / (b[axis] - a[axis])
+
+    return (a[0] + t * (b[0] - a[0]), a[1] + t * (b[1] - a[1]))
@@ -0,0 +1,32 @@
+""" mapgenerator.algorithms.fortunes.mode """
+
+from enum import Enum
+
+class Mode(Enum):
+    DEBUG = 0
+    RELEASE = 1
+
+
+class Settings:
+    __slots__ = ("validate",)
+
+    def __init__(self):
+        """ In debug mode every constructor checks the types of
+            its arguments. Release mode skips the checks, which
+            matters since the sweep creates these objects in its
+            innermost loop """
+        self.validate = True
+
+    def set_mode(self, mode: Mode):
+        """ Switch between debug and release mode for all the structs """
+        if not isinstance(mode, Mode):
+            raise TypeError("Mode must be of type Mode, was", type(mode))
+
+        self.validate = mode == Mode.DEBUG
+
+    def get_mode(self) -> Mode:
+        return Mode.DEBUG if self.validate else Mode.RELEASE
+
+
+# debug is the default, so the tests get their type checks
+SETTINGS = Settings()
@@ -0,0 +1,69 @@
+""" mapgenerator.algorithms.fortunes.relax """
+
+import numpy as np
+
+from .mesh import HalfEdgeMesh
+
+
+class RelaxStep:
+    __slots__ = ("_seconds", "_displacement")
+
+    def __init__(self, seconds: float, displacement: float):
+        """ One round of Lloyd relaxation, how long it took and how
+            far the site that moved the most went """
+        self._seconds = seconds
+        self._displacement = displacement
+
+    def __repr__(self) -> str:
+        return f"RelaxStep(seconds={self._seconds:.4f}, displacement={self._displacement:.2f})"
+
+    @property
+    def seconds(self) -> float:
+        return self._seconds
+
+    @property
+    def displacement(self) -> float:
+        return self._displacement
+
+
+def centroids(mesh: HalfEdgeMesh) -> tuple[np.ndarray, np.ndarray]:
+    """ The centroid (N, 2) and area (N,) of every cell of a closed mesh,
+        with the shoelace formula over the corners of all cells at once """
+    corners, following, cells = mesh.cell_sides()
+
+    x, y = corners.astype(np.float64).T
+    next_x, next_y = following.astype(np.float64).T
+    cross = x * next_y - next_x * y
+
+    areas = np.bincount(cells, cross, minlength=len(mesh)) / 2
+    sums = np.column_stack((
+        np.bincount(cells, (x + next_x) * cross, minlength=len(mesh)),
+        np.bincount(cells, (y + next_y) * cross, minlength=len(mesh))
+    ))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return sums / (6 * areas[:, np.newaxis]), areas
+
+
+def lloyd_sites(mesh: HalfEdgeMesh, size: tuple[int, int]) -> np.ndarray:
+    """ Every site moved to the centroid of its cell, rounded back on the
+        canvas. Cells with no area keep their site where it was """
+    sites = mesh.sites()
+    centers, areas = centroids(mesh)
+
+    moved = np.where(areas[:, np.newaxis] > 0, np.rint(centers), sites)
+    moved = np.clip(moved, 0, np.array(size) - 1).astype(np.int64)
+
+    # the same site twice breaks the circle math, so sites that round
+    # onto each other stay put. The old sites never clash
+    while len(moved):
+        _, inverse, counts = np.unique(
+            moved, axis=0, return_inverse=True, return_counts=True
+        )
+        clash = counts[inverse.reshape(-1)] > 1
+        if not clash.any():
+            break
+
+        moved[clash] = sites[clash]
+
+    return moved
@@ -0,0 +1,59 @@
+""" mapgenerator.algorithms.fortunes.stats """
+
+from collections.abc import Callable
+
+from .event import Event
+
+# called with every event as it comes out of the queue
+TraceHook = Callable[[Event], None]
+
+
+class SweepStats: # pylint: disable=too-many-instance-attributes
+    __slots__ = (
+        "site_events",
+        "circle_events",
+        "false_alarms",
+        "max_beachline",
+        "max_insert_depth",
+        "max_queue",
+        "site_seconds",
+        "circle_seconds"
+    )
+
+    def __init__(self):
+        """ What the sweep did, counted as it goes. False alarms are
+            circle events that were cancelled before they came up, since
+            a neighbour of their arc changed. The insert depth is how deep
+            the deepest new arc of a site event was when it was placed, in
+            barks from the root. Rotations and removals move arcs after
+            that without being measured, so it is not the height of the tree """
+        self.site_events = 0
+        self.circle_events = 0
+        self.false_alarms = 0
+        self.max_beachline = 0
+        self.max_insert_depth = 0
+        self.max_queue = 0
+        self.site_seconds = 0.0
+        self.circle_seconds = 0.0
+
+    @property
+    def prune_rate(self) -> float:
+        """ The share of the circle events that were false alarms """
+        queued = self.circle_events + self.false_alarms
+
+        return self.false_alarms / queued if queued else 0.0
+
+    def as_dict(self) -> dict[str, int | float]:
+        stats = {name: getattr(self, name) for name in self.__slots__}
+        stats["prune_rate"] = self.prune_rate
+
+        return stats
+
+    def __str__(self) -> str:
+        return (
+            f"{self.site_events} site events in {self.site_seconds:.3f} s, "
+            f"{self.circle_events} circle events in {self.circle_seconds:.3f} s, "
+            f"{self.false_alarms} false alarms pruned ({self.prune_rate:.0%}), "
+            f"at most {self.max_beachline} arcs and {self.max_queue} queued events, "
+            f"new arcs placed at most {self.max_insert_depth} deep"
+        )
@@ -0,0 +1,221 @@
+""" mapgenerator.cache
+
+Finished diagrams on disk, so a set of sites is only ever swept once.
+An entry is a diagram file named by a hash of the sorted sites, the
+canvas and the version of the sweep. Entries are written to a temporary
+file and renamed into place, so processes sharing a directory only ever
+see whole files. When the directory grows past its cap the entries used
+longest ago are deleted, the modification time of an entry is when it
+was last used.
+"""
+
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+from . import diagram
+from .diagram import DiagramFile
+from .algorithms.fortunes.base_structs import Edge, Point
+from .algorithms.fortunes.fortunes import ALGORITHM_VERSION, FortunesAlgorithm
+
+SUFFIX = ".diagram"
+
+# a gigabyte is about 20 diagrams of a million sites
+MAX_BYTES = 1 << 30
+
+
+class CacheStats:
+    __slots__ = ("hits", "misses", "evictions")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+
+        return self.hits / lookups if lookups else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.hits} hits, {self.misses} misses ({self.hit_rate:.0%} hit rate), "
+            f"{self.evictions} evicted"
+        )
+
+
+class DiagramCache:
+    __slots__ = ("_directory", "_max_bytes", "_stats")
+
+    def __init__(self, directory: str | os.PathLike | None = None, max_bytes: int = MAX_BYTES):
+        """ A cache of diagrams in directory, by default mapgenerator
+            under the user's cache directory. Several processes can
+            share the directory. Hits and misses are counted for this
+            instance only """
+        if not isinstance(max_bytes, int) or max_bytes <= 0:
+            raise ValueError("Cache size must be a positive int, was", max_bytes)
+
+        self._directory = os.fspath(directory) if directory is not None else default_directory()
+        self._max_bytes = max_bytes
+        self._stats = CacheStats()
+
+        os.makedirs(self._directory, exist_ok=True)
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._stats
+
+    def diagram(self, sites: np.ndarray, size: tuple[int, int]) -> DiagramFile:
+        """ The diagram of the (N, 2) sites on the canvas, swept only if
+            it isn't in the cache yet. The sites of the diagram are in
+            sorted order, see sorted_sites """
+        sites = sorted_sites(sites)
+        path = os.path.join(self._directory, _key(sites, size) + SUFFIX)
+
+        found = self.__load(path)
+        if found is not None:
+            self._stats.hits += 1
+            return found
+
+        self._stats.misses += 1
+        algorithm = FortunesAlgorithm.from_array(sites, size)
+        self.__store(path, size, sites, *algorithm.get_edges_array())
+        self.__evict(keep=path)
+
+        return diagram.load(path)
+
+    def edges_array(
+            self,
+            sites: np.ndarray,
+            size: tuple[int, int]
+        ) -> tuple[np.ndarray, np.ndarray]:
+        """ Like FortunesAlgorithm.get_edges_array, with the edge sites
+            as rows of the sites given here """
+        sites = np.asarray(sites, dtype=np.int64).reshape(-1, 2)
+        order = np.lexsort((sites[:, 1], sites[:, 0]))
+        found = self.diagram(sites, size)
+
+        return found.edges_array(), order[found.edge_sites]
+
+    def areas(self, sites: np.ndarray, size: tuple[int, int]) -> set[Edge]:
+        """ Like FortunesAlgorithm.get_areas """
+        return {
+            Edge(start=Point(x1, y1), end=Point(x2, y2))
+            for x1, y1, x2, y2 in self.diagram(sites, size).edges_array().tolist()
+        }
+
+    def path(self, sites: np.ndarray, size: tuple[int, int]) -> str:
+        return os.path.join(self._directory, cache_key(sites, size) + SUFFIX)
+
+    def clear(self):
+        """ Delete every entry """
+        for path, _, _ in self.__entries():
+            _remove(path)
+
+    def __load(self, path: str) -> DiagramFile | None:
+        try:
+            found = diagram.load(path)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            # written by an older version of the diagram format
+            _remove(path)
+            return None
+
+        # the entry is mapped already, so it is fine if it was evicted
+        # before it gets marked used
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+        return found
+
+    def __store(self, path: str, size: tuple[int, int], sites: np.ndarray, edges, edge_sites):
+        file, temporary = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+        os.close(file)
+
+        try:
+            diagram.write(temporary, size, sites, edges, edge_sites)
+            os.replace(temporary, path)
+        except BaseException:
+            _remove(temporary)
+            raise
+
+    def __evict(self, keep: str):
+        """ Delete the entries used longest ago until the cache fits
+            in its cap again, but never the one just written """
+        entries = sorted(self.__entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+
+        for path, _, size in entries:
+            if total <= self._max_bytes:
+                break
+
+            if path == keep:
+                continue
+
+            # another process may have evicted it already
+            if _remove(path):
+                self._stats.evictions += 1
+            total -= size
+
+    def __entries(self) -> list[tuple[str, float, int]]:
+        """ (path, last used, bytes) of every entry """
+        entries = []
+        with os.scandir(self._directory) as found:
+            for entry in found:
+                if not entry.name.endswith(SUFFIX):
+                    continue
+
+                try:
+                    status = entry.stat()
+                except FileNotFoundError:
+                    continue
+
+                entries.append((entry.path, status.st_mtime, status.st_size))
+
+        return entries
+
+
+def cache_key(sites: np.ndarray, size: tuple[int, int]) -> str:
+    """ A hash of the sites in sorted order, the canvas and the version
+        of the sweep. The same sites in any order get the same key """
+    return _key(sorted_sites(sites), size)
+
+
+def sorted_sites(sites: np.ndarray) -> np.ndarray:
+    """ The sites sorted by x and then y, the order the cache sweeps them in """
+    sites = np.asarray(sites, dtype=np.int64).reshape(-1, 2)
+
+    return sites[np.lexsort((sites[:, 1], sites[:, 0]))]
+
+
+def default_directory() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+
+    return os.path.join(base, "mapgenerator")
+
+
+def _key(sites: np.ndarray, size: tuple[int, int]) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{ALGORITHM_VERSION}:{diagram.VERSION}:{size[0]},{size[1]}:".encode())
+    digest.update(np.ascontiguousarray(sites, dtype="<i8").tobytes())
+
+    return digest.hexdigest()
+
+
+def _remove(path: str) -> bool:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+
+    return True
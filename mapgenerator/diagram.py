@@ -0,0 +1,214 @@
+""" mapgenerator.diagram
+
+A finished diagram on disk. The file is a fixed header and then the
+tables, every one a little-endian array that starts on a 64 byte
+boundary, so they can be mapped straight into memory:
+
+    sites         (N, 2) int32    x, y of every site
+    vertices      (V, 2) int32    x, y of every edge end
+    edges         (E, 2) int32    the two vertices of every edge
+    edge_sites    (E, 2) int32    the two sites every edge splits
+    cell_offsets  (N + 1,) int64  where the edges of each cell start
+    cell_edges    (2E,) int32     the edges of every cell, cell by cell
+
+The edges of cell n are cell_edges[cell_offsets[n]:cell_offsets[n + 1]].
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+
+import numpy as np
+
+from .algorithms.fortunes.edges import merge_pieces
+from .algorithms.fortunes.fortunes import FortunesAlgorithm
+
+MAGIC = b"MAPDIAG\0"
+VERSION = 1
+
+# name, dtype and columns of every table, in the order they are in the file
+TABLES = (
+    ("sites", "<i4", 2),
+    ("vertices", "<i4", 2),
+    ("edges", "<i4", 2),
+    ("edge_sites", "<i4", 2),
+    ("cell_offsets", "<i8", 1),
+    ("cell_edges", "<i4", 1),
+)
+
+# magic, version, header size, width, height and (offset, rows) per table
+HEADER = struct.Struct("<8sII2q" + "2q" * len(TABLES))
+ALIGNMENT = 64
+
+
+class DiagramFile:
+    __slots__ = ("_path", "_size", "_tables")
+
+    def __init__(self, path: str | os.PathLike):
+        """ A diagram file mapped into memory. Only the header is read, the
+            tables are views of the mapping and pages come in from disk as
+            they are used. Processes that map the same file share them,
+            and pickling passes just the path """
+        self._path = os.fspath(path)
+        self._size, layout = _read_header(self._path)
+        self._tables: dict[str, np.ndarray] = {}
+
+        # one mapping of the whole file, the tables are views of it
+        mapping = np.memmap(self._path, dtype=np.uint8, mode="r")
+
+        for (name, dtype, columns), offset, rows in zip(TABLES, layout[0::2], layout[1::2]):
+            nbytes = rows * columns * np.dtype(dtype).itemsize
+            table = mapping[offset:offset + nbytes].view(dtype)
+
+            self._tables[name] = table if columns == 1 else table.reshape(rows, columns)
+
+    def __reduce__(self):
+        return (DiagramFile, (self._path,))
+
+    def __len__(self) -> int:
+        """ The number of cells """
+        return len(self._tables["sites"])
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self._size
+
+    @property
+    def sites(self) -> np.ndarray:
+        return self._tables["sites"]
+
+    @property
+    def vertices(self) -> np.ndarray:
+        return self._tables["vertices"]
+
+    @property
+    def edges(self) -> np.ndarray:
+        """ The two vertices of every edge """
+        return self._tables["edges"]
+
+    @property
+    def edge_sites(self) -> np.ndarray:
+        return self._tables["edge_sites"]
+
+    @property
+    def cell_offsets(self) -> np.ndarray:
+        return self._tables["cell_offsets"]
+
+    @property
+    def cell_edges(self) -> np.ndarray:
+        return self._tables["cell_edges"]
+
+    def edges_array(self) -> np.ndarray:
+        """ The edges as (E, 4) rows of (x1, y1, x2, y2) like
+            FortunesAlgorithm.get_edges_array, this one is a copy """
+        return self.vertices[self.edges].reshape(-1, 4).astype(np.int64)
+
+    def cell(self, site: int) -> np.ndarray:
+        """ The edges around the cell of site """
+        return self.cell_edges[self.cell_offsets[site]:self.cell_offsets[site + 1]]
+
+
+def save(path: str | os.PathLike, algorithm: FortunesAlgorithm):
+    """ Sweep if needed and write the diagram, clipped to the canvas """
+    edges, edge_sites = merge_pieces(*algorithm.get_edges_array())
+
+    write(path, algorithm.size, algorithm.get_mesh().sites(), edges, edge_sites)
+
+
+def write(
+        path: str | os.PathLike,
+        size: tuple[int, int],
+        sites: np.ndarray,
+        edges: np.ndarray,
+        edge_sites: np.ndarray
+    ):
+    """ Write a diagram from the (E, 4) edges and (E, 2) edge sites
+        of get_edges_array. Edge ends are shared as vertices """
+    if len(size) != 2 or not 0 < size[0] < 2 ** 31 or not 0 < size[1] < 2 ** 31:
+        raise ValueError("Size must be two positive 32 bit ints, was", size)
+
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 4)
+    edge_sites = np.asarray(edge_sites, dtype=np.int64).reshape(-1, 2)
+    if len(edges) != len(edge_sites):
+        raise ValueError("Every edge needs its two sites, were", (len(edges), len(edge_sites)))
+
+    if edges.size and (edges.min() < -2 ** 31 or edges.max() >= 2 ** 31):
+        raise ValueError("Edge ends must be 32 bit ints")
+
+    sites = np.asarray(sites, dtype=np.int64).reshape(-1, 2)
+    if sites.size and (sites.min() < -2 ** 31 or sites.max() >= 2 ** 31):
+        raise ValueError("Sites must be 32 bit ints")
+
+    # one integer per end is a lot faster to sort than rows
+    points = edges.reshape(-1, 2)
+    _, first, ends = np.unique(
+        points[:, 0] * 2 ** 32 + points[:, 1] + 2 ** 31,
+        return_index=True,
+        return_inverse=True
+    )
+    vertices = points[first]
+
+    # every edge is in the cells on both of its sides
+    cells = edge_sites.reshape(-1)
+    order = np.argsort(cells, kind="stable")
+    cell_offsets = np.zeros(len(sites) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(cells, minlength=len(sites)), out=cell_offsets[1:])
+
+    tables = {
+        "sites": sites,
+        "vertices": vertices,
+        "edges": ends.reshape(-1, 2),
+        "edge_sites": edge_sites,
+        "cell_offsets": cell_offsets,
+        "cell_edges": order // 2,
+    }
+
+    _write_tables(path, size, tables)
+
+
+def load(path: str | os.PathLike) -> DiagramFile:
+    """ Map a diagram file into memory """
+    return DiagramFile(path)
+
+
+def _read_header(path: str) -> tuple[tuple[int, int], list[int]]:
+    """ The size and the (offset, rows) of every table """
+    with open(path, "rb") as file:
+        header = file.read(HEADER.size)
+
+    if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a diagram file", path)
+
+    _, version, _, width, height, *layout = HEADER.unpack(header)
+    if version != VERSION:
+        raise ValueError("Unsupported diagram file version, was", version)
+
+    return (width, height), layout
+
+
+def _write_tables(path: str | os.PathLike, size: tuple[int, int], tables: dict[str, np.ndarray]):
+    layout = []
+    offset = _aligned(HEADER.size)
+    for name, dtype, columns in TABLES:
+        rows = len(tables[name])
+        if rows >= 2 ** 31:
+            raise ValueError("Too many rows for a diagram file in " + name, rows)
+
+        layout += [offset, rows]
+        offset = _aligned(offset + rows * columns * np.dtype(dtype).itemsize)
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, HEADER.size, *size, *layout))
+
+        for (name, dtype, _), table_offset in zip(TABLES, layout[0::2]):
+            file.write(b"\0" * (table_offset - file.tell()))
+            np.ascontiguousarray(tables[name], dtype=dtype).tofile(file)
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
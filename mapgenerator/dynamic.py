@@ -0,0 +1,276 @@
+""" mapgenerator.dynamic """
+
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+
+from .algorithms.fortunes.edges import merge_pieces
+from .algorithms.fortunes.fortunes import FortunesAlgorithm
+
+
+class DynamicDiagram:
+    def __init__(self, sites: np.ndarray, size: tuple[int, int] | None = None):
+        """ A diagram that can be edited one site at a time. The sites are
+            swept once, after that insert_site and remove_site only sweep
+            the cells around the edit again and splice them back in.
+            The row of a site is its id, new sites get the next free id """
+        algorithm = FortunesAlgorithm.from_array(sites, size)
+
+        if len(np.unique(sites, axis=0)) != len(sites):
+            raise ValueError("Sites must not have the same site twice")
+
+        if size is None:
+            size = tuple(int(n) + 1 for n in sites.max(axis=0)) if len(sites) else (1, 1)
+
+        self._size = size
+        self._sites: dict[int, tuple[int, int]] = {}
+        self._next_id = len(sites)
+
+        # sites by square buckets, for finding the cell a new site lands in
+        self._bucket_size = max(1, int(np.sqrt(size[0] * size[1] / max(1, len(sites)))))
+        self._buckets: dict[tuple[int, int], set[int]] = {}
+
+        # the delaunay graph, and the edge between every two neighbours
+        self._neighbours: dict[int, set[int]] = {}
+        self._edges: dict[tuple[int, int], tuple[int, int, int, int]] = {}
+
+        for site, (x, y) in enumerate(sites.tolist()):
+            self.__add(site, (x, y))
+
+        edges, edge_sites = merge_pieces(*algorithm.get_edges_array())
+        for edge, (one, two) in zip(edges.tolist(), edge_sites.tolist()):
+            self._neighbours[one].add(two)
+            self._neighbours[two].add(one)
+            self._edges[_key(one, two)] = tuple(edge)
+
+    def __len__(self) -> int:
+        return len(self._sites)
+
+    def __contains__(self, site: int) -> bool:
+        return site in self._sites
+
+    def site(self, site: int) -> tuple[int, int]:
+        """ The coordinates of a site """
+        return self._sites[self.__validate_site(site)]
+
+    def neighbours(self, site: int) -> frozenset[int]:
+        """ The sites whose cells share an edge with the cell of site """
+        return frozenset(self._neighbours[self.__validate_site(site)])
+
+    def cell_edges(self, site: int) -> np.ndarray:
+        """ The edges around the cell of site as (x1, y1, x2, y2) rows """
+        site = self.__validate_site(site)
+        edges = [self._edges[_key(site, other)] for other in self._neighbours[site]]
+
+        return np.array(edges, dtype=np.int64).reshape(-1, 4)
+
+    def get_edges_array(self) -> tuple[np.ndarray, np.ndarray]:
+        """ All the edges as an (E, 4) array and the ids of the two sites
+            each edge splits as an (E, 2) array, like FortunesAlgorithm """
+        pairs = sorted(self._edges)
+
+        return (
+            np.array([self._edges[pair] for pair in pairs], dtype=np.int64).reshape(-1, 4),
+            np.array(pairs, dtype=np.int64).reshape(-1, 2)
+        )
+
+    def insert_site(self, x: int, y: int) -> tuple[int, set[int]]:
+        """ Add a site. Returns its id and the ids of the sites whose
+            cells changed, the new site included """
+        site = self._next_id
+        touched = self.__insert(site, self.__validate_point(x, y))
+        self._next_id += 1
+
+        return site, touched
+
+    def remove_site(self, site: int) -> set[int]:
+        """ Remove a site. Returns the ids of the sites whose cells
+            changed, the removed site included """
+        site = self.__validate_site(site)
+        touched = self._neighbours[site] | {site}
+
+        # only the old neighbours take over the cell, and they can only
+        # end up next to each other or to their own old neighbours
+        region = self.__rings(self._neighbours[site], 1) - {site}
+        self.__splice(touched - {site}, *self.__sweep(region))
+        self.__forget(site)
+
+        return touched
+
+    def move_site(self, site: int, x: int, y: int) -> set[int]:
+        """ Move a site while keeping its id. Returns the ids of the sites
+            whose cells changed on either end of the move """
+        site = self.__validate_site(site)
+        point = self.__validate_point(x, y)
+
+        touched = self.remove_site(site)
+        touched |= self.__insert(site, point)
+
+        return touched
+
+    def __insert(self, site: int, point: tuple[int, int]) -> set[int]:
+        if not self._sites:
+            self.__add(site, point)
+            return {site}
+
+        nearest = self.__nearest(point)
+        self.__add(site, point)
+
+        # the new cell always takes a piece of the cell it landed in.
+        # The other cells it takes from are found by growing the region
+        # until it has every old neighbour of every new neighbour, which
+        # is everything their cells depend on
+        region = self.__rings({nearest}, 1) | {site}
+        while True:
+            neighbours, edges = self.__sweep(region)
+            touched = neighbours[site] | {site}
+
+            needed = self.__rings(touched, 1)
+            if needed <= region:
+                break
+
+            region |= needed
+
+        self.__splice(touched, neighbours, edges)
+
+        return touched
+
+    def __sweep(
+            self,
+            region: set[int]
+        ) -> tuple[dict[int, set[int]], dict[tuple[int, int], tuple[int, int, int, int]]]:
+        """ Sweep only the sites of region. A cell comes out right as long
+            as all its neighbours are in the region """
+        ids = sorted(region)
+        neighbours: dict[int, set[int]] = {site: set() for site in ids}
+        edges: dict[tuple[int, int], tuple[int, int, int, int]] = {}
+
+        if len(ids) < 2:
+            return neighbours, edges
+
+        sites = np.array([self._sites[site] for site in ids], dtype=np.int64)
+        algorithm = FortunesAlgorithm.from_array(sites, self._size)
+        local_edges, local_sites = merge_pieces(*algorithm.get_edges_array())
+
+        for edge, (one, two) in zip(local_edges.tolist(), local_sites.tolist()):
+            one, two = ids[one], ids[two]
+            neighbours[one].add(two)
+            neighbours[two].add(one)
+            edges[_key(one, two)] = tuple(edge)
+
+        return neighbours, edges
+
+    def __splice(
+            self,
+            touched: Iterable[int],
+            neighbours: dict[int, set[int]],
+            edges: dict[tuple[int, int], tuple[int, int, int, int]]
+        ):
+        """ Replace the cells of touched with the ones from a local sweep """
+        for site in touched:
+            old = self._neighbours[site]
+            new = neighbours[site]
+
+            for other in old - new:
+                self._neighbours[other].discard(site)
+                del self._edges[_key(site, other)]
+
+            for other in new - old:
+                self._neighbours[other].add(site)
+
+            for other in new:
+                self._edges[_key(site, other)] = edges[_key(site, other)]
+
+            self._neighbours[site] = set(new)
+
+    def __rings(self, sites: Iterable[int], rings: int) -> set[int]:
+        """ The sites, and the sites at most rings steps away from them """
+        region = set(sites)
+        frontier = set(region)
+
+        for _ in range(rings):
+            frontier = {other for site in frontier for other in self._neighbours[site]}
+            frontier -= region
+            region |= frontier
+
+        return region
+
+    def __nearest(self, point: tuple[int, int]) -> int:
+        """ The site closest to point, looking through the buckets
+            one ring at a time out from the bucket of point """
+        size = self._bucket_size
+        center_x, center_y = point[0] // size, point[1] // size
+        most = max(self._size) // size + 1
+
+        best, best_distance = -1, float("inf")
+        for ring in range(most + 1):
+            for bucket in _ring_buckets(center_x, center_y, ring):
+                for site in self._buckets.get(bucket, ()):
+                    x, y = self._sites[site]
+                    distance = (x - point[0]) ** 2 + (y - point[1]) ** 2
+                    if distance < best_distance:
+                        best, best_distance = site, distance
+
+            # everything in the next ring is at least this far away
+            if best_distance <= (ring * size) ** 2:
+                break
+
+        return best
+
+    def __add(self, site: int, point: tuple[int, int]):
+        self._sites[site] = point
+        self._neighbours[site] = set()
+
+        bucket = (point[0] // self._bucket_size, point[1] // self._bucket_size)
+        self._buckets.setdefault(bucket, set()).add(site)
+
+    def __forget(self, site: int):
+        point = self._sites.pop(site)
+        del self._neighbours[site]
+
+        bucket = (point[0] // self._bucket_size, point[1] // self._bucket_size)
+        self._buckets[bucket].discard(site)
+        if not self._buckets[bucket]:
+            del self._buckets[bucket]
+
+    def __validate_site(self, site: int) -> int:
+        if not isinstance(site, int):
+            raise TypeError("Site must be of type int, was", type(site))
+
+        if site not in self._sites:
+            raise KeyError("No such site", site)
+
+        return site
+
+    def __validate_point(self, x: int, y: int) -> tuple[int, int]:
+        if not isinstance(x, int) or not isinstance(y, int):
+            raise TypeError("Site coordinates must be of type int, were", type(x), type(y))
+
+        if not (0 <= x < self._size[0] and 0 <= y < self._size[1]):
+            raise ValueError("Site must be inside the canvas, was", (x, y))
+
+        # the same site twice breaks the circle math
+        bucket = (x // self._bucket_size, y // self._bucket_size)
+        if any(self._sites[site] == (x, y) for site in self._buckets.get(bucket, ())):
+            raise ValueError("There already is a site at", (x, y))
+
+        return (x, y)
+
+
+def _key(one: int, two: int) -> tuple[int, int]:
+    return (one, two) if one < two else (two, one)
+
+
+def _ring_buckets(center_x: int, center_y: int, ring: int) -> Iterator[tuple[int, int]]:
+    """ The buckets on the square ring around the center bucket """
+    if ring == 0:
+        yield (center_x, center_y)
+        return
+
+    for dx in range(-ring, ring + 1):
+        yield (center_x + dx, center_y - ring)
+        yield (center_x + dx, center_y + ring)
+
+    for dy in range(-ring + 1, ring):
+        yield (center_x - ring, center_y + dy)
+        yield (center_x + ring, center_y + dy)
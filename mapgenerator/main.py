@@ -1,9 +1,19 @@
 """ mapgenerator.main """
 
+import argparse
+import math
+import os
 import sys
+import time
+from contextlib import AbstractContextManager, nullcontext
 
+import numpy as np
+
+from . import batch, diagram, raster, readers, sites
+from .profiling import PROFILES, Profiler
 from .algorithms.fortunes.fortunes import FortunesAlgorithm
 from .algorithms.fortunes.base_structs import Point
+from .algorithms.fortunes.mode import SETTINGS, Mode
 
 def load_points() -> list[Point]:
     """ Load points from sys arguments """
@@ -39,16 +49,143 @@ def print_help(message: str = None):
     if message is not None:
         print("mapgenerator: " + message)
     print("Usage: python -m mapgenerator [X,Y]...")
+    print("       python -m mapgenerator --sites N [--distribution NAME] [--seed N] [--size W,H]")
+    print("       python -m mapgenerator --input FILE|- [--format text|int32|float64]")
+    print("                              [--out FILE] [--raster FILE] [--stats]")
+    print("                              [--profile cpu|mem|both] [--profile-out FILE]")
+    print("       python -m mapgenerator batch --seeds START:STOP --sites N [--jobs N]")
     print()
     print("Example: python -m mapgenerator 100,155 300,54")
+    print("         python -m mapgenerator --sites 1000000 --distribution poisson --seed 7")
+    print("         cat sites.csv | python -m mapgenerator --input - --out map.diagram")
+    print("         python -m mapgenerator batch --seeds 0:100 --sites 5000 --out maps")
 
     sys.exit()
 
+def generate(argv: list[str]):
+    """ Sweep generated or read sites instead of ones given as arguments """
+    parser = argparse.ArgumentParser(
+        prog="python -m mapgenerator",
+        description="Generate or read sites and sweep them"
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--sites", type=int, help="number of sites to generate")
+    source.add_argument("--input", help="read the sites from this file, - for stdin")
+    parser.add_argument(
+        "--format",
+        choices=readers.FORMATS,
+        default="text",
+        help="x,y lines, or packed int32 or float64 pairs"
+    )
+    parser.add_argument(
+        "--distribution",
+        choices=sites.DISTRIBUTIONS,
+        default="uniform",
+        help="how the sites are spread"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="same seed, same sites")
+    parser.add_argument(
+        "--size",
+        type=batch.parse_size,
+        default=None,
+        help="WIDTH,HEIGHT, defaults to about 100 pixels per generated site"
+    )
+    parser.add_argument("--out", default=None, help="write the diagram to this file")
+    parser.add_argument("--raster", default=None, help="write the cell of each pixel to this .npy")
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="count and time the events of the sweep"
+    )
+    parser.add_argument(
+        "--profile",
+        choices=PROFILES,
+        default=None,
+        help="report where the time or the memory of the run goes, "
+        "memory peaks are per step and not per sweep phase"
+    )
+    parser.add_argument(
+        "--profile-out",
+        default=None,
+        help="also write the raw cpu profile to this file for pstats"
+    )
+
+    args = parser.parse_args(argv)
+    if args.profile_out is not None and args.profile not in ("cpu", "both"):
+        parser.error("--profile-out needs --profile cpu or both")
+
+    profiler = Profiler(args.profile) if args.profile is not None else None
+
+    start = time.perf_counter()
+    with _phase(profiler, "sites"):
+        points, size, description = load_sites(args)
+    generated = time.perf_counter()
+    with _phase(profiler, "sweep"):
+        algorithm = FortunesAlgorithm.from_array(points, size)
+        if args.stats:
+            algorithm.instrument()
+        edges, _ = algorithm.get_edges_array()
+    swept = time.perf_counter()
+
+    print(
+        f"{description} in {generated - start:.2f} s, "
+        f"{len(edges)} edges in {swept - generated:.2f} s"
+    )
+    if args.stats:
+        print(algorithm.stats)
+
+    if args.out is not None:
+        with _phase(profiler, "save"):
+            diagram.save(args.out, algorithm)
+
+    if args.raster is not None:
+        with _phase(profiler, "raster"):
+            raster.rasterise(algorithm.get_mesh(), size, args.raster, jobs=os.cpu_count() or 1)
+        print(f"{size[0]}x{size[1]} labels in {time.perf_counter() - swept:.2f} s")
+
+    if profiler is not None:
+        profiler.stop()
+        if args.profile_out is not None:
+            profiler.dump(args.profile_out)
+
+        print(profiler.report())
+
+def _phase(profiler: Profiler | None, name: str) -> AbstractContextManager:
+    return nullcontext() if profiler is None else profiler.phase(name)
+
+def load_sites(args: argparse.Namespace) -> tuple[np.ndarray, tuple[int, int], str]:
+    """ The sites to sweep, the canvas and what was done to get them """
+    if args.input is None:
+        size = args.size or (math.ceil(10 * math.sqrt(args.sites)),) * 2
+        points = sites.generate(args.distribution, args.sites, size, args.seed)
+
+        return points, size, f"{len(points)} {args.distribution} sites"
+
+    points, repeated = readers.load_sites(args.input, args.format)
+
+    # the smallest canvas that fits all the points
+    size = args.size or (
+        tuple(int(n) + 1 for n in points.max(axis=0)) if len(points) else (1, 1)
+    )
+
+    return points, size, f"{len(points)} sites read ({repeated} repeated ones dropped)"
+
 def main():
+    SETTINGS.set_mode(Mode.RELEASE)
+
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        batch.main(sys.argv[2:])
+        return
+
+    if len(sys.argv) > 1 and sys.argv[1].startswith("--") and sys.argv[1] != "--help":
+        generate(sys.argv[1:])
+        return
 
     points = load_points()
 
-    fortunes = FortunesAlgorithm(size=(10,10), points=points)
+    # the smallest canvas that fits all the points
+    size = (max(p.x for p in points) + 1, max(p.y for p in points) + 1)
+    fortunes = FortunesAlgorithm(size=size, points=points)
 
     edges = fortunes.get_areas()
 
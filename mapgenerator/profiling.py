@@ -0,0 +1,212 @@
+""" mapgenerator.profiling """
+
+import cProfile
+import io
+import os
+import pstats
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from types import FunctionType
+
+from .algorithms.fortunes.base_structs import Arc
+from .algorithms.fortunes.binarytree import BinaryTree
+from .algorithms.fortunes.fortunes import FortunesAlgorithm
+
+PROFILES = ("cpu", "mem", "both")
+
+# the functions that make up each part of the sweep, by the name
+# pstats knows them by
+SWEEP_PHASES = {
+    "site events": ("__site_event",),
+    "circle events": ("__circle_event",),
+    "tree search": ("find_arc",),
+    "circle math": ("circle_point",),
+}
+
+# how many frames of every allocation are kept, enough to get from
+# the structs back up to the functions of SWEEP_PHASES
+TRACE_FRAMES = 16
+
+
+class Profiler:
+    __slots__ = ("_cpu", "_memory", "_phases", "_sweep_lines")
+
+    def __init__(self, profile: str):
+        """ Profile the steps of a run for the time they take, where they
+            allocate memory, or both. Tracing allocations slows the run
+            down, so the times of both are only good for comparing
+            functions against each other. Memory peaks are per step, the
+            sweep phases only get what they allocated and didn't free """
+        if profile not in PROFILES:
+            raise ValueError("Profile must be one of " + ", ".join(PROFILES), profile)
+
+        self._cpu = cProfile.Profile() if profile in ("cpu", "both") else None
+        self._memory = profile in ("mem", "both")
+
+        # name, peak bytes, the biggest allocations and the bytes and
+        # blocks of every sweep phase for every step
+        self._phases: list[tuple[
+            str,
+            int,
+            list[tracemalloc.StatisticDiff],
+            dict[str, tuple[int, int]]
+        ]] = []
+        self._sweep_lines = sweep_lines() if self._memory else {}
+
+    @contextmanager
+    def phase(self, name: str, top: int = 10) -> Iterator[None]:
+        """ Profile a step of the run. For memory the step gets its
+            peak and the top lines that allocated the most during it """
+        if self._memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACE_FRAMES)
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot()
+
+        if self._cpu is not None:
+            self._cpu.enable()
+
+        try:
+            yield
+        finally:
+            if self._cpu is not None:
+                self._cpu.disable()
+
+            if self._memory:
+                _, peak = tracemalloc.get_traced_memory()
+                after = tracemalloc.take_snapshot()
+                allocated = after.compare_to(before, "lineno")
+                by_phase = self.__by_sweep_phase(after.compare_to(before, "traceback"))
+                self._phases.append((name, peak, allocated[:top], by_phase))
+
+    def stop(self):
+        if self._memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def dump(self, path: str | os.PathLike):
+        """ Write the raw pstats, for pstats.Stats or snakeviz later """
+        if self._cpu is None:
+            raise ValueError("Only a cpu profile can be dumped")
+
+        self._cpu.dump_stats(path)
+
+    def report(self, top: int = 25) -> str:
+        sections = []
+
+        if self._cpu is not None:
+            sections.append(self.cpu_report(top))
+
+        if self._memory:
+            sections.append(self.memory_report())
+
+        return "\n".join(sections)
+
+    def cpu_report(self, top: int = 25) -> str:
+        """ The time of every part of the sweep and then the top
+            functions by cumulative time """
+        out = io.StringIO()
+        stats = pstats.Stats(self._cpu, stream=out)
+        total = stats.total_tt or 1.0
+
+        out.write(f"{'sweep phase':<16}{'calls':>12}{'cumulative s':>14}{'share':>8}\n")
+        for phase, (calls, seconds) in sweep_phases(stats).items():
+            out.write(f"{phase:<16}{calls:>12}{seconds:>14.3f}{seconds / total:>8.1%}\n")
+        out.write("\n")
+
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+
+        return out.getvalue()
+
+    def memory_report(self) -> str:
+        """ The peak of every step and the lines that allocated
+            the most during it """
+        lines = []
+        for name, peak, allocated, by_phase in self._phases:
+            lines.append(f"{name}: peak {_size(peak)}")
+
+            for phase, (size, count) in by_phase.items():
+                lines.append(f"    {phase:<16}{_size(size):>12} {count:>10} blocks kept")
+
+            for statistic in allocated:
+                frame = statistic.traceback[0]
+                lines.append(
+                    f"    {_size(statistic.size_diff):>10} "
+                    f"{statistic.count_diff:>10} blocks  {frame.filename}:{frame.lineno}"
+                )
+
+        return "\n".join(lines) + "\n"
+
+    def __by_sweep_phase(
+            self,
+            allocated: list[tracemalloc.StatisticDiff]
+        ) -> dict[str, tuple[int, int]]:
+        """ The bytes and blocks each sweep phase allocated and still
+            holds. An allocation goes to the innermost phase it was made
+            in, so site events doesn't count the tree search in it """
+        phases: dict[str, tuple[int, int]] = {}
+        for statistic in allocated:
+            phase = _sweep_phase(statistic.traceback, self._sweep_lines)
+            if phase is not None and statistic.size_diff > 0:
+                size, count = phases.get(phase, (0, 0))
+                phases[phase] = (size + statistic.size_diff, count + statistic.count_diff)
+
+        return {phase: phases[phase] for phase in SWEEP_PHASES if phase in phases}
+
+
+def sweep_phases(stats: pstats.Stats) -> dict[str, tuple[int, float]]:
+    """ The calls and cumulative seconds of each part of the sweep """
+    phases = {}
+    for phase, names in SWEEP_PHASES.items():
+        calls = 0
+        seconds = 0.0
+        # keys are (file, line, function) and values (primitive calls,
+        # calls, own time, cumulative time, callers)
+        for (_, _, function), (_, count, _, cumulative, _) in stats.stats.items():
+            if function in names:
+                calls += count
+                seconds += cumulative
+
+        phases[phase] = (calls, seconds)
+
+    return phases
+
+
+def sweep_lines() -> dict[str, list[tuple[str, int, int]]]:
+    """ The (file, first line, last line) of the functions of every
+        sweep phase, for matching them to the frames of allocations """
+    lines: dict[str, list[tuple[str, int, int]]] = {phase: [] for phase in SWEEP_PHASES}
+    for cls in (FortunesAlgorithm, BinaryTree, Arc):
+        for function in vars(cls).values():
+            if not isinstance(function, FunctionType):
+                continue
+
+            code = function.__code__
+            for phase, names in SWEEP_PHASES.items():
+                if code.co_name in names:
+                    last = max(line for _, _, line in code.co_lines() if line is not None)
+                    lines[phase].append((code.co_filename, code.co_firstlineno, last))
+
+    return lines
+
+
+def _sweep_phase(
+        traceback: tracemalloc.Traceback,
+        lines: dict[str, list[tuple[str, int, int]]]
+    ) -> str | None:
+    """ The innermost sweep phase in the traceback, if it has one """
+    # the frames go from the oldest call to the newest
+    for frame in reversed(traceback):
+        for phase, functions in lines.items():
+            for filename, first, last in functions:
+                if frame.filename == filename and first <= frame.lineno <= last:
+                    return phase
+
+    return None
+
+
+def _size(size: int) -> str:
+    if abs(size) < 2 ** 20:
+        return f"{size / 2 ** 10:.1f} KiB"
+
+    return f"{size / 2 ** 20:.1f} MiB"
@@ -0,0 +1,155 @@
+""" mapgenerator.raster """
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+from .algorithms.fortunes.mesh import HalfEdgeMesh
+
+# pixels that no cell covers
+NO_CELL = -1
+
+
+def rasterise(
+        mesh: HalfEdgeMesh,
+        size: tuple[int, int],
+        out: str | os.PathLike | None = None,
+        strip_height: int = 256,
+        jobs: int = 1
+    ) -> np.ndarray:
+    """ The cell of every pixel as a (height, width) int32 label grid, a
+        pixel belongs to the cell its middle is in. The mesh must be closed.
+
+        With out the grid is written to that .npy file one strip of rows
+        at a time and returned memory-mapped, so only a strip is ever in
+        memory. Jobs above one render the strips in a process pool """
+    if len(size) != 2 or size[0] <= 0 or size[1] <= 0:
+        raise ValueError("Size must be two positive ints, was", size)
+
+    if not isinstance(strip_height, int) or strip_height <= 0:
+        raise ValueError("Strip height must be a positive int, was", strip_height)
+
+    width, height = size
+    strips = _strips(polygon_edges(mesh), height, strip_height)
+
+    if out is not None:
+        _rasterise_file(strips, (height, width), out, jobs)
+
+        return np.load(out, mmap_mode="r")
+
+    labels = np.empty((height, width), dtype=np.int32)
+    for start, stop, edges in strips:
+        labels[start:stop] = render_strip(edges, start, stop, width)
+
+    return labels
+
+
+def polygon_edges(mesh: HalfEdgeMesh) -> np.ndarray:
+    """ The sides of every cell as (E, 5) float rows of (x1, y1, x2, y2,
+        site) going upwards, sorted by y1. Flat sides never cross the
+        middle of a row, so they are left out """
+    starts, ends, cells = mesh.cell_sides()
+
+    edges = np.column_stack((starts, ends, cells)).astype(np.float64)
+    edges = edges[edges[:, 1] != edges[:, 3]]
+
+    # both cells along an edge then cross the rows at the same x
+    down = edges[:, 1] > edges[:, 3]
+    edges[down, :4] = edges[down][:, [2, 3, 0, 1]]
+
+    return edges[np.argsort(edges[:, 1], kind="stable")]
+
+
+def render_strip(edges: np.ndarray, start: int, stop: int, width: int) -> np.ndarray:
+    """ Scanline fill the rows start to stop of the label grid, from the
+        polygon_edges that reach them. Returns a (stop - start, width) grid """
+    x, rows, cells = _crossings(edges, start, stop)
+
+    # a cell crosses each row twice, from where it starts to where it ends
+    first_column = np.clip(np.ceil(x[0::2] - 0.5), 0, width).astype(np.int64)
+    spans = np.clip(np.ceil(x[1::2] - 0.5), 0, width) > first_column
+
+    # every row starts with no cell, and after that each pixel has the
+    # cell of the last span that began before it. Rounded corners leave
+    # slivers between the cells, and those go to the cell on their left
+    pixels = (stop - start) * width
+    marks = np.concatenate((
+        np.arange(0, pixels, width),
+        ((rows[0::2] - start) * width + first_column)[spans]
+    ))
+    values = np.concatenate((
+        np.full(stop - start, NO_CELL, dtype=np.int32),
+        cells[0::2][spans].astype(np.int32)
+    ))
+
+    # a span that begins a row wins over the row start
+    order = np.argsort(marks, kind="stable")
+    marks, values = marks[order], values[order]
+    last = np.append(marks[1:] != marks[:-1], True)
+    marks, values = marks[last], values[last]
+
+    return np.repeat(values, np.diff(marks, append=pixels)).reshape(stop - start, width)
+
+
+def _crossings(
+        edges: np.ndarray,
+        start: int,
+        stop: int
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """ The x, row and cell of every crossing of an edge with the middle
+        of a row from start to stop, sorted by cell, row and x """
+    x1, y1, x2, y2, sites = edges.T
+
+    # the rows whose middle each edge crosses, the top end left out
+    # so that a corner on a row is only crossed by one of its edges
+    first = np.maximum(start, np.ceil(y1 - 0.5)).astype(np.int64)
+    counts = np.maximum(0, np.minimum(stop, np.ceil(y2 - 0.5)).astype(np.int64) - first)
+    edge = np.repeat(np.arange(len(edges)), counts)
+    rows = np.repeat(first, counts) + _ranks(counts)
+
+    x = x1[edge] + (rows + 0.5 - y1[edge]) * (x2 - x1)[edge] / (y2 - y1)[edge]
+    order = np.lexsort((x, rows, sites[edge]))
+
+    return x[order], rows[order], sites[edge][order]
+
+
+def _strips(edges: np.ndarray, height: int, strip_height: int):
+    """ (start, stop, edges) for every strip of rows, with only the edges
+        that reach into the strip """
+    bottoms = edges[:, 1]
+
+    for start in range(0, height, strip_height):
+        stop = min(height, start + strip_height)
+        below = edges[:np.searchsorted(bottoms, stop)]
+
+        yield start, stop, below[below[:, 3] > start]
+
+
+def _rasterise_file(strips, shape: tuple[int, int], out: str | os.PathLike, jobs: int):
+    # the header goes in first, the strips fill the file in place
+    header = np.lib.format.open_memmap(out, mode="w+", dtype=np.int32, shape=shape)
+    del header
+
+    if jobs == 1:
+        for start, stop, edges in strips:
+            _write_strip(out, start, stop, edges)
+        return
+
+    starts, stops, edges = zip(*strips)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for _ in pool.map(_write_strip, repeat(out), starts, stops, edges):
+            pass
+
+
+def _write_strip(out: str | os.PathLike, start: int, stop: int, edges: np.ndarray):
+    """ Render a strip straight into the file, also in a worker process """
+    labels = np.load(out, mmap_mode="r+")
+    labels[start:stop] = render_strip(edges, start, stop, labels.shape[1])
+    labels.flush()
+
+
+def _ranks(counts: np.ndarray) -> np.ndarray:
+    """ 0, 1, ..., count - 1 for every count, one after another """
+    return np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
@@ -0,0 +1,139 @@
+""" mapgenerator.readers """
+
+import os
+import sys
+from collections.abc import Iterator
+from typing import BinaryIO
+
+import numpy as np
+
+from .sites import unique_rows
+
+# text is x,y or x y, one site per line, and binary is packed
+# little-endian x, y pairs
+FORMATS = ("text", "int32", "float64")
+BINARY_TYPES = {"int32": np.dtype("<i4"), "float64": np.dtype("<f8")}
+
+# how much is read and parsed at once
+CHUNK_BYTES = 1 << 24
+
+
+def read_sites(
+        source: str | os.PathLike,
+        file_format: str = "text",
+        chunk_bytes: int = CHUNK_BYTES
+    ) -> Iterator[np.ndarray]:
+    """ Stream the sites of a file, or of stdin if source is "-", as
+        (K, 2) int64 chunks. Only a chunk is parsed at a time """
+    if file_format not in FORMATS:
+        raise ValueError("Format must be one of " + ", ".join(FORMATS), file_format)
+
+    if not isinstance(chunk_bytes, int) or chunk_bytes < 16:
+        raise ValueError("Chunk size must be an int of at least 16 bytes, was", chunk_bytes)
+
+    if source == "-":
+        yield from _chunks(sys.stdin.buffer, file_format, chunk_bytes)
+        return
+
+    with open(source, "rb") as file:
+        yield from _chunks(file, file_format, chunk_bytes)
+
+
+def load_sites(
+        source: str | os.PathLike,
+        file_format: str = "text",
+        chunk_bytes: int = CHUNK_BYTES
+    ) -> tuple[np.ndarray, int]:
+    """ All the sites of a file as an (N, 2) array without the repeated
+        ones, which break the circle math, and how many were dropped """
+    chunks = list(read_sites(source, file_format, chunk_bytes))
+    total = sum(len(chunk) for chunk in chunks)
+
+    sites = unique_rows(np.concatenate(chunks)) if chunks else np.empty((0, 2), dtype=np.int64)
+
+    if sites.size and sites.min() < 0:
+        raise ValueError("Sites must not be negative, was", sites[np.any(sites < 0, axis=1)][0])
+
+    return sites, total - len(sites)
+
+
+def _chunks(file: BinaryIO, file_format: str, chunk_bytes: int) -> Iterator[np.ndarray]:
+    if file_format == "text":
+        return _text_chunks(file, chunk_bytes)
+
+    return _binary_chunks(file, BINARY_TYPES[file_format], chunk_bytes)
+
+
+def _text_chunks(file: BinaryIO, chunk_bytes: int) -> Iterator[np.ndarray]:
+    """ Parse whole lines at a time, a line cut in two by the end of a
+        chunk waits for the rest of it """
+    rest = b""
+    while True:
+        data = file.read(chunk_bytes)
+        text = rest + data
+
+        if data:
+            end = text.rfind(b"\n") + 1
+            text, rest = text[:end], text[end:]
+
+        if text:
+            yield _parse_text(text)
+
+        if not data:
+            return
+
+
+def _parse_text(text: bytes) -> np.ndarray:
+    if b"#" in text:
+        text = b"\n".join(line for line in text.split(b"\n") if not line.lstrip().startswith(b"#"))
+
+    try:
+        numbers = np.fromstring(text.replace(b",", b" "), dtype=np.int64, sep=" ")
+    except ValueError as error:
+        raise ValueError("Sites must be integer x,y or x y pairs, one per line") from error
+
+    counts = _values_per_line(text)
+    if np.any((counts != 0) & (counts != 2)):
+        line = int(np.flatnonzero((counts != 0) & (counts != 2))[0])
+        raise ValueError("Every line must have exactly two values, was", text.split(b"\n")[line])
+
+    return numbers.reshape(-1, 2)
+
+
+def _values_per_line(text: bytes) -> np.ndarray:
+    """ How many values each line of the text has, counted as the starts
+        of runs between separators so the lines don't have to be split """
+    data = np.frombuffer(text, dtype=np.uint8)
+    newline = data == ord("\n")
+    blank = newline | np.isin(data, np.frombuffer(b" \t\r,", dtype=np.uint8))
+
+    starts = ~blank
+    starts[1:] &= blank[:-1]
+
+    lines = np.cumsum(newline)
+    return np.bincount(lines[starts], minlength=lines[-1] + 1 if len(lines) else 1)
+
+
+def _binary_chunks(file: BinaryIO, dtype: np.dtype, chunk_bytes: int) -> Iterator[np.ndarray]:
+    """ Packed (x, y) pairs, floats are rounded to the nearest int """
+    pair = 2 * dtype.itemsize
+    rest = b""
+    while True:
+        data = file.read(chunk_bytes - chunk_bytes % pair)
+        if not data:
+            break
+
+        data = rest + data
+        end = len(data) - len(data) % pair
+        data, rest = data[:end], data[end:]
+
+        numbers = np.frombuffer(data, dtype=dtype).reshape(-1, 2)
+        if dtype.kind == "f":
+            if not np.all(np.isfinite(numbers)):
+                raise ValueError("Sites must be finite numbers")
+            numbers = np.rint(numbers)
+
+        yield numbers.astype(np.int64)
+
+    if rest:
+        raise ValueError("The file ends in the middle of a site, bytes left", len(rest))
@@ -0,0 +1,190 @@
+""" mapgenerator.sites """
+
+import math
+
+import numpy as np
+
+DISTRIBUTIONS = ("uniform", "jittered", "poisson")
+
+# how much of the canvas a maximal poisson-disk sampling with
+# radius r covers: sites ~= POISSON_DENSITY * area / r²
+POISSON_DENSITY = 0.6965
+
+
+def generate(distribution: str, count: int, size: tuple[int, int], seed: int) -> np.ndarray:
+    """ Sites from one of DISTRIBUTIONS as an (N, 2) integer array,
+        always the same for the same seed """
+    if distribution == "uniform":
+        return uniform(count, size, seed)
+    if distribution == "jittered":
+        return jittered_grid(count, size, seed)
+    if distribution == "poisson":
+        return poisson_disk(count, size, seed)
+
+    raise ValueError("Distribution must be one of " + ", ".join(DISTRIBUTIONS), distribution)
+
+
+def uniform(count: int, size: tuple[int, int], seed: int) -> np.ndarray:
+    """ Count different sites anywhere on the canvas """
+    count, size = _validate(count, size)
+    rng = np.random.default_rng(seed)
+
+    if count > size[0] * size[1]:
+        raise ValueError("More sites than there is room for on the canvas", count)
+
+    sites = np.empty((0, 2), dtype=np.int64)
+    while len(sites) < count:
+        more = rng.integers(0, size, size=(count - len(sites), 2))
+        sites = unique_rows(np.vstack((sites, more)))
+
+    return sites
+
+
+def jittered_grid(
+        count: int,
+        size: tuple[int, int],
+        seed: int,
+        jitter: float = 1.0
+    ) -> np.ndarray:
+    """ One site at a random spot in each of count cells of a grid over
+        the canvas. Jitter 0 puts the sites on the cell corners """
+    count, size = _validate(count, size)
+    rng = np.random.default_rng(seed)
+
+    if not 0 <= jitter <= 1:
+        raise ValueError("Jitter must be between 0 and 1, was", jitter)
+
+    # a grid of about count square cells, some of them left empty
+    width, height = size
+    columns = max(1, round(math.sqrt(count * width / height)))
+    rows = max(1, math.ceil(count / columns))
+    cell = np.array([width / columns, height / rows])
+
+    cells = rng.choice(columns * rows, size=min(count, columns * rows), replace=False)
+    corners = np.column_stack((cells % columns, cells // columns)) * cell
+
+    sites = corners + jitter * rng.random((len(cells), 2)) * cell
+    sites = np.clip(np.floor(sites), 0, np.array(size) - 1).astype(np.int64)
+
+    return unique_rows(sites)
+
+
+def poisson_disk( # pylint: disable=too-many-locals
+        count: int,
+        size: tuple[int, int],
+        seed: int,
+        radius: float | None = None,
+        attempts: int = 3
+    ) -> np.ndarray:
+    """ Sites no closer than radius to each other, about count of them.
+        Radius defaults to what fits count sites on the canvas.
+
+        Dart throwing on a background grid with cells of radius / √2, so
+        a cell holds at most one site. Cells three apart can't be closer
+        than radius, so every ninth cell gets a dart at once """
+    count, size = _validate(count, size)
+    rng = np.random.default_rng(seed)
+    width, height = size
+
+    if count == 0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    if radius is None:
+        # a little tighter than the target, the extra sites are dropped
+        radius = 0.85 * math.sqrt(POISSON_DENSITY * width * height / count)
+
+    cell = radius / math.sqrt(2)
+    columns = math.ceil(width / cell)
+    rows = math.ceil(height / cell)
+
+    # two empty cells of padding on every side, flattened so that a
+    # neighbouring cell is a fixed step away in the arrays
+    stride = rows + 4
+    grid_x = np.full((columns + 4) * stride, np.nan)
+    grid_y = np.full((columns + 4) * stride, np.nan)
+    steps = [
+        dx * stride + dy
+        for dx in range(-2, 3)
+        for dy in range(-2, 3)
+        if abs(dx) + abs(dy) < 4
+    ]
+
+    # the cells of each phase, padded indices
+    phases = []
+    for phase_x in range(3):
+        for phase_y in range(3):
+            xs, ys = np.meshgrid(
+                np.arange(phase_x, columns, 3),
+                np.arange(phase_y, rows, 3),
+                indexing="ij"
+            )
+            phases.append((xs.reshape(-1), ys.reshape(-1)))
+
+    for _ in range(attempts):
+        for i, (xs, ys) in enumerate(phases):
+            cells = (xs + 2) * stride + ys + 2
+            free = np.isnan(grid_x[cells])
+            xs, ys, cells = xs[free], ys[free], cells[free]
+            phases[i] = (xs, ys)
+
+            dart_x = (xs + rng.random(len(xs))) * cell
+            dart_y = (ys + rng.random(len(ys))) * cell
+            fits = (dart_x < width) & (dart_y < height)
+
+            for step in steps:
+                # empty cells are nan and never too close
+                fits &= ~(
+                    (grid_x[cells + step] - dart_x) ** 2
+                    + (grid_y[cells + step] - dart_y) ** 2
+                    < radius ** 2
+                )
+
+            grid_x[cells[fits]] = dart_x[fits]
+            grid_y[cells[fits]] = dart_y[fits]
+
+    taken = ~np.isnan(grid_x)
+    sites = np.column_stack((grid_x[taken], grid_y[taken]))
+
+    if len(sites) > count:
+        sites = sites[rng.choice(len(sites), size=count, replace=False)]
+    rng.shuffle(sites)
+
+    return unique_rows(np.floor(sites).astype(np.int64))
+
+
+def unique_rows(sites: np.ndarray) -> np.ndarray:
+    """ Drop repeated sites, the same site twice breaks the circle math.
+        Keeps the order of the first ones """
+    if sites.size == 0:
+        return sites
+
+    low = sites.min(axis=0)
+    high = sites.max(axis=0)
+    width = int(high[0]) - int(low[0]) + 1
+    height = int(high[1]) - int(low[1]) + 1
+
+    if width * height > np.iinfo(np.int64).max:
+        # too far apart for one integer per site, sort the rows instead
+        _, first = np.unique(sites, axis=0, return_index=True)
+        return sites[np.sort(first)]
+
+    # one integer per site is a lot faster to sort than rows
+    keys = (sites[:, 0] - low[0]) * height + sites[:, 1] - low[1]
+
+    # an unstable sort is much faster, the first of each run of the
+    # same key is then the smallest index in it
+    order = np.argsort(keys)
+    starts = np.flatnonzero(np.diff(keys[order], prepend=-1))
+    first = np.minimum.reduceat(order, starts)
+
+    return sites[np.sort(first)]
+
+
+def _validate(count: int, size: tuple[int, int]) -> tuple[int, tuple[int, int]]:
+    if not isinstance(count, int) or count < 0:
+        raise ValueError("Site count must be a non-negative int, was", count)
+
+    if len(size) != 2 or size[0] <= 0 or size[1] <= 0:
+        raise ValueError("Size must be two positive ints, was", size)
+
+    return count, size
@@ -0,0 +1,171 @@
+""" mapgenerator.tiles """
+
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .algorithms.fortunes.edges import canonical, merge_pieces
+from .algorithms.fortunes.fortunes import FortunesAlgorithm
+
+class Tile:
+    __slots__ = ("_coords", "_sites", "_edges", "_edge_sites")
+
+    def __init__(
+            self,
+            coords: tuple[int, int],
+            sites: np.ndarray,
+            edges: np.ndarray,
+            edge_sites: np.ndarray
+        ):
+        """ One square of the world. Edges are (x1, y1, x2, y2) rows, and
+            edge_sites has the coordinates of the two sites each edge
+            splits, so they can be matched with the neighbouring tiles """
+        self._coords = coords
+        self._sites = sites
+        self._edges = edges
+        self._edge_sites = edge_sites
+
+    @property
+    def coords(self) -> tuple[int, int]:
+        return self._coords
+
+    @property
+    def sites(self) -> np.ndarray:
+        return self._sites
+
+    @property
+    def edges(self) -> np.ndarray:
+        return self._edges
+
+    @property
+    def edge_sites(self) -> np.ndarray:
+        return self._edge_sites
+
+
+class TiledWorld:
+    def __init__(
+            self,
+            seed: int,
+            tile_size: int,
+            sites_per_tile: int,
+            halo: int = 1
+        ):
+        """ An endless world cut into square tiles. Every tile gets its sites
+            from its own coordinates and the world seed, and is swept together
+            with the sites of the tiles within halo, so the cells on its
+            border come out the same as in the neighbouring tiles """
+        self._seed = self.__validate_positive(seed, "seed", allow_zero=True)
+        self._tile_size = self.__validate_positive(tile_size, "tile_size")
+        self._sites_per_tile = self.__validate_positive(sites_per_tile, "sites_per_tile")
+        self._halo = self.__validate_positive(halo, "halo", allow_zero=True)
+
+        # tiles already computed for tiles_around, least recently used first
+        self._cache: OrderedDict[tuple[int, int], Tile] = OrderedDict()
+        self._cache_size = 64
+
+    def tile_sites(self, tx: int, ty: int) -> np.ndarray:
+        """ The sites of a tile, always the same for the same seed """
+        rng = np.random.default_rng([self._seed, _zigzag(tx), _zigzag(ty)])
+
+        sites = rng.integers(0, self._tile_size, size=(self._sites_per_tile, 2))
+        sites += (tx * self._tile_size, ty * self._tile_size)
+
+        # the same site twice breaks the circle math
+        return np.unique(sites, axis=0)
+
+    def tile(self, tx: int, ty: int) -> Tile:
+        """ Sweep a single tile with its halo """
+        own = self.tile_sites(tx, ty)
+        halo = [
+            self.tile_sites(tx + dx, ty + dy)
+            for dx in range(-self._halo, self._halo + 1)
+            for dy in range(-self._halo, self._halo + 1)
+            if dx or dy
+        ]
+        sites = np.concatenate([own, *halo])
+
+        # the canvas starts from zero, so sweep from the corner of the halo.
+        # The corner is kept even, since shifting by an even number doesn't
+        # change how halves round, and so the tiles agree on their borders
+        corner = np.array([tx - self._halo, ty - self._halo]) * self._tile_size
+        corner -= corner % 2
+        span = (2 * self._halo + 1) * self._tile_size + 1
+
+        algorithm = FortunesAlgorithm.from_array(sites - corner, (span, span))
+        edges, edge_sites = algorithm.get_edges_array()
+        edges, edge_sites = merge_pieces(edges + np.tile(corner, 2), edge_sites)
+
+        # own sites come first, so their cells are the ones with a low index
+        keep = np.any(edge_sites < len(own), axis=1)
+
+        return Tile(
+            coords=(tx, ty),
+            sites=own,
+            edges=edges[keep],
+            edge_sites=_site_pairs(sites, edge_sites[keep])
+        )
+
+    def tiles(
+            self,
+            coords: Iterable[tuple[int, int]],
+            jobs: int | None = None
+        ) -> Iterator[Tile]:
+        """ Compute many tiles in a process pool, in the given order.
+            Jobs defaults to the number of CPUs """
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            yield from pool.map(self._compute, coords)
+
+    def tiles_around(self, x: int, y: int, radius: int = 1) -> list[Tile]:
+        """ The tiles within radius of the tile that has the world
+            coordinate (x, y), computed on demand as a player moves """
+        center_x = x // self._tile_size
+        center_y = y // self._tile_size
+
+        tiles = []
+        for tx in range(center_x - radius, center_x + radius + 1):
+            for ty in range(center_y - radius, center_y + radius + 1):
+                tiles.append(self.__cached_tile(tx, ty))
+
+        return tiles
+
+    def _compute(self, coords: tuple[int, int]) -> Tile:
+        """ Picklable entry point for the process pool """
+        return self.tile(*coords)
+
+    def __cached_tile(self, tx: int, ty: int) -> Tile:
+        key = (tx, ty)
+
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        tile = self.tile(tx, ty)
+        self._cache[key] = tile
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+        return tile
+
+    @staticmethod
+    def __validate_positive(n: int, name: str, allow_zero: bool = False) -> int:
+        if not isinstance(n, int):
+            raise TypeError(f"TiledWorld {name} must be of type int, was", type(n))
+
+        if n < 0 or (n == 0 and not allow_zero):
+            raise ValueError(f"TiledWorld {name} must be positive, was", n)
+
+        return n
+
+
+def _zigzag(n: int) -> int:
+    """ Map negative tile coordinates to non-negative seed words """
+    return 2 * n if n >= 0 else -2 * n - 1
+
+
+def _site_pairs(sites: np.ndarray, edge_sites: np.ndarray) -> np.ndarray:
+    """ Swap site indices for their coordinates, smaller site first """
+    pairs = np.hstack((sites[edge_sites[:, 0]], sites[edge_sites[:, 1]]))
+
+    return canonical(pairs)
@@ -85,6 +85,15 @@ class TestRay(TestCase):
         with self.assertRaises(TypeError):
             r = base_structs.Ray(self.start_point, direction)
 
+    def test_oletuksena_ei_puolireunaa(self):
+        r = base_structs.Ray(self.start_point, self.direction)
+
+        self.assertEqual(r.half_edge, -1)
+
+    def test_konstruktorille_epapateva_puolireuna(self):
+        with self.assertRaises(TypeError):
+            r = base_structs.Ray(self.start_point, self.direction, half_edge=1.0)
+
 
 class TestArc(TestCase):
     def setUp(self):
@@ -118,22 +127,6 @@ class TestArc(TestCase):
 
         self.assertAlmostEqual(a.tangent(y, diretrix).x, 0)
 
-    def test_gaussian_elimination_toimiva_lauseke(self):
-        a = base_structs.Arc(self.focal_point)
-
-        matrix = [
-            [1, 1,  1, 24],
-            [4, 2,  2,  2],
-            [1, 1, -1,  6]
-        ]
-
-        ans = a._Arc__gauss_elimination(matrix)
-        real = [-23, 38, 9]
-
-        self.assertAlmostEqual(ans[0], real[0])
-        self.assertAlmostEqual(ans[1], real[1])
-        self.assertAlmostEqual(ans[2], real[2])
-
     def test_ympyra_piste_toimiva_lauseke(self):
         p1 = base_structs.Point(-6, 3)
         p2 = base_structs.Point(-3, 2)
@@ -151,3 +144,20 @@ class TestArc(TestCase):
         self.assertAlmostEqual(ans[0], real[0])
         self.assertAlmostEqual(ans[1], real[1])
         self.assertAlmostEqual(ans[2], real[2])
+
+    def test_ympyra_piste_samalla_suoralla(self):
+        a1 = base_structs.Arc(base_structs.Point(0, 0))
+        a2 = base_structs.Arc(base_structs.Point(2, 2))
+        a3 = base_structs.Arc(base_structs.Point(5, 5))
+
+        self.assertIsNone(a1.circle_point(a2, a3))
+
+    def test_ympyra_piste_nollakohdat(self):
+        # the old gaussian elimination divided by zero on these
+        a1 = base_structs.Arc(base_structs.Point(0, 0))
+        a2 = base_structs.Arc(base_structs.Point(0, 4))
+        a3 = base_structs.Arc(base_structs.Point(4, 0))
+
+        center, r = a1.circle_point(a2, a3)
+
+        self.assertEqual((center.x, center.y, r), (2, 2, 3))
@@ -0,0 +1,43 @@
+from unittest import TestCase
+
+import numpy as np
+
+from mapgenerator.algorithms.fortunes import batch
+
+class TestBatchClip(TestCase):
+    def setUp(self):
+        self.box = (0, 0, 10, 10)
+
+    def test_sisalla_oleva_sailyy(self):
+        clipped, inside = batch.clip_segments(np.array([[1, 1, 5, 5]]), self.box)
+
+        self.assertEqual(clipped.tolist(), [[1, 1, 5, 5]])
+        self.assertTrue(inside[0])
+
+    def test_leikataan_reunoihin(self):
+        clipped, inside = batch.clip_segments(np.array([[-5, 5, 15, 5]]), self.box)
+
+        self.assertEqual(clipped.tolist(), [[0, 5, 10, 5]])
+        self.assertTrue(inside[0])
+
+    def test_ulkopuolella_pois(self):
+        segments = np.array([[-5, -5, -1, 20], [11, 0, 11, 10], [20, 20, 30, 30]])
+
+        _, inside = batch.clip_segments(segments, self.box)
+
+        self.assertEqual(inside.tolist(), [False, False, False])
+
+    def test_vino_leikkaus(self):
+        clipped, _ = batch.clip_segments(np.array([[-5, -5, 15, 15]]), self.box)
+
+        self.assertEqual(clipped.tolist(), [[0, 0, 10, 10]])
+
+    def test_sateen_poistumispiste(self):
+        exits = batch.ray_exits(
+            np.array([[5, 5], [5, 5], [2, 3]]),
+            np.array([[1, 0], [-1, -1], [0, 2]]),
+            self.box
+        )
+
+        self.assertEqual(exits.tolist(), [[10, 5], [0, 0], [2, 10]])
+
@@ -1,5 +1,6 @@
+import math
 from unittest import TestCase
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 from mapgenerator.algorithms.fortunes import binarytree, base_structs
 
@@ -151,56 +152,313 @@ class TestBinaryTree(TestCase):
         root = None
         b = binarytree.BinaryTree(root=root)
 
-        self.assertAlmostEqual(b.find_arc(10), (None, None))
+        self.assertAlmostEqual(b.find_arc(10, 0), (None, None))
 
     def test_etsi_arc_root_on_leaf(self):
         root = self.leaf
         b = binarytree.BinaryTree(root=root)
 
-        self.assertAlmostEqual(b.find_arc(10), (self.leaf, None))
+        self.assertAlmostEqual(b.find_arc(10, 0), (self.leaf, None))
 
     def test_etsi_arc_root_on_bark_leaf_on_vasen(self):
         root = self.bark
         y = 10
         self.bark.left = self.leaf_vasen
         self.bark.right = self.leaf_oikea
-        self.bark.ray.start.y = 15
+        self.bark.y.return_value = 15
         b = binarytree.BinaryTree(root=root)
 
-        self.assertAlmostEqual(b.find_arc(y)[0], self.leaf_vasen)
-        self.assertAlmostEqual(b.find_arc(y)[1], binarytree.Side.LEFT)
+        self.assertAlmostEqual(b.find_arc(y, 0)[0], self.leaf_vasen)
+        self.assertAlmostEqual(b.find_arc(y, 0)[1], binarytree.Side.LEFT)
 
     def test_etsi_arc_root_on_bark_leaf_on_oikea(self):
         root = self.bark
         y = 10
         self.bark.left = self.leaf_vasen
         self.bark.right = self.leaf_oikea
-        self.bark.ray.start.y = 5
+        self.bark.y.return_value = 5
         b = binarytree.BinaryTree(root=root)
 
-        self.assertAlmostEqual(b.find_arc(y)[0], self.leaf_oikea)
-        self.assertAlmostEqual(b.find_arc(y)[1], binarytree.Side.RIGHT)
+        self.assertAlmostEqual(b.find_arc(y, 0)[0], self.leaf_oikea)
+        self.assertAlmostEqual(b.find_arc(y, 0)[1], binarytree.Side.RIGHT)
 
     def test_etsi_arc_root_on_bark_leaf_on_oikea_y_on_sama(self):
         root = self.bark
         y = 10
         self.bark.left = self.leaf_vasen
         self.bark.right = self.leaf_oikea
-        self.bark.ray.start.y = y
+        self.bark.y.return_value = y
         b = binarytree.BinaryTree(root=root)
 
-        self.assertAlmostEqual(b.find_arc(y)[0], self.leaf_oikea)
-        self.assertAlmostEqual(b.find_arc(y)[1], binarytree.Side.RIGHT)
+        self.assertAlmostEqual(b.find_arc(y, 0)[0], self.leaf_oikea)
+        self.assertAlmostEqual(b.find_arc(y, 0)[1], binarytree.Side.RIGHT)
 
     def test_etsi_arc_root_on_kaksi_tasoa_bark_sitten_leaf(self):
         root = self.bark
         y = 10
         self.bark.left = self.leaf_vasen
         self.bark.right = self.bark_oikea
-        self.bark.ray.start.y = 5
-        self.bark.right.ray.start.y = 9
+        self.bark.y.return_value = 5
+        self.bark.right.y.return_value = 9
         self.bark.right.right = self.leaf_oikea
         b = binarytree.BinaryTree(root=root)
 
-        self.assertAlmostEqual(b.find_arc(y)[0], self.leaf_oikea)
-        self.assertAlmostEqual(b.find_arc(y)[1], binarytree.Side.RIGHT)
+        self.assertAlmostEqual(b.find_arc(y, 0)[0], self.leaf_oikea)
+        self.assertAlmostEqual(b.find_arc(y, 0)[1], binarytree.Side.RIGHT)
+
+
+class TestBinaryTreeTasapaino(TestCase):
+    def setUp(self):
+        self.first = binarytree.BinaryTreeLeaf(self.arc(0))
+        self.tree = binarytree.BinaryTree(root=self.first)
+
+    def arc(self, y: int) -> base_structs.Arc:
+        return base_structs.Arc(base_structs.Point(0, y))
+
+    def ray(self, y: int) -> base_structs.Ray:
+        return base_structs.Ray(base_structs.Point(0, y), base_structs.Point(0, 1))
+
+    def leaves(self) -> list[binarytree.BinaryTreeLeaf]:
+        leaves = []
+        stack = [self.tree.root]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, binarytree.BinaryTreeLeaf):
+                leaves.append(node)
+            else:
+                stack.append(node.right)
+                stack.append(node.left)
+
+        return leaves
+
+    def black_height(self, node) -> int:
+        if isinstance(node, binarytree.BinaryTreeLeaf):
+            return 1
+
+        if node.red:
+            self.assertFalse(binarytree._is_red(node.left))
+            self.assertFalse(binarytree._is_red(node.right))
+
+        left = self.black_height(node.left)
+        right = self.black_height(node.right)
+        self.assertEqual(left, right)
+        self.assertIs(node.left.parent, node)
+        self.assertIs(node.right.parent, node)
+
+        return left + (0 if node.red else 1)
+
+    def height(self, node) -> int:
+        if isinstance(node, binarytree.BinaryTreeLeaf):
+            return 0
+
+        return 1 + max(self.height(node.left), self.height(node.right))
+
+    def assert_valid(self):
+        self.assertFalse(binarytree._is_red(self.tree.root))
+        self.assertIsNone(self.tree.root.parent)
+        self.black_height(self.tree.root)
+
+        leaves = self.leaves()
+        self.assertIsNone(leaves[0].prev)
+        self.assertIsNone(leaves[-1].next)
+        for left, right in zip(leaves, leaves[1:]):
+            self.assertIs(left.next, right)
+            self.assertIs(right.prev, left)
+
+    def append_many(self, n: int) -> list[binarytree.BinaryTreeLeaf]:
+        leaf = self.first
+        added = [leaf]
+        for y in range(1, n):
+            leaf = self.tree.insert_arc(leaf, binarytree.Side.RIGHT, self.ray(y), self.arc(y))
+            added.append(leaf)
+
+        return added
+
+    def test_lisaa_arc_oikealle(self):
+        new = self.tree.insert_arc(self.first, binarytree.Side.RIGHT, self.ray(1), self.arc(1))
+
+        self.assertIs(self.first.next, new)
+        self.assertIs(new.prev, self.first)
+        self.assertIs(self.tree.find_next_arc(binarytree.Side.RIGHT, self.first), new)
+        self.assert_valid()
+
+    def test_lisaa_arc_vasemmalle(self):
+        new = self.tree.insert_arc(self.first, binarytree.Side.LEFT, self.ray(0), self.arc(-1))
+
+        self.assertIs(self.first.prev, new)
+        self.assertIs(self.tree.find_next_arc(binarytree.Side.LEFT, self.first), new)
+        self.assert_valid()
+
+    def test_jaa_arc_kahtia(self):
+        new = self.tree.split_arc(self.first, self.arc(5), self.ray(5), self.ray(5))
+
+        leaves = self.leaves()
+        self.assertEqual(len(leaves), 3)
+        self.assertIs(leaves[0], self.first)
+        self.assertIs(leaves[1], new)
+        self.assertIs(leaves[2].arc, self.first.arc)
+        self.assert_valid()
+
+    def test_jarjestetty_syote_pysyy_tasapainossa(self):
+        n = 1000
+        self.append_many(n)
+
+        self.assert_valid()
+        # red-black trees are never deeper than 2 log2(n + 1)
+        self.assertLessEqual(self.height(self.tree.root), 20)
+
+    def test_etsi_arc_tasapainotetusta_puusta(self):
+        added = self.append_many(200)
+
+        for y in [0, 1, 57, 199]:
+            self.assertIs(self.tree.find_arc(y, 1)[0], added[y])
+
+    def test_poista_arc_palauttaa_sateet(self):
+        added = self.append_many(3)
+        new_ray = self.ray(10)
+
+        rays = self.tree.remove_arc(added[1], new_ray)
+
+        self.assertEqual(rays[0].start.y, 1)
+        self.assertEqual(rays[1].start.y, 2)
+        self.assertIs(added[0].next, added[2])
+        self.assertIs(added[2].prev, added[0])
+        self.assertIsNone(added[1].prev)
+        self.assertIsNone(added[1].next)
+        self.assertEqual(len(self.leaves()), 2)
+        self.assertIs(self.tree.root.ray, new_ray)
+        self.assert_valid()
+
+    def test_poista_monta_arcia_pysyy_tasapainossa(self):
+        added = self.append_many(500)
+
+        for leaf in added[1:-1:2] + added[2:-1:4]:
+            self.tree.remove_arc(leaf, self.ray(leaf.arc.focal.y))
+            self.assert_valid()
+
+        remaining = self.leaves()
+        self.assertEqual(len(remaining), 500 - 249 - 125)
+        self.assertLessEqual(self.height(self.tree.root), 2 * 8)
+
+    def test_barkit_jarjestyksessa(self):
+        added = self.append_many(50)
+
+        barks = list(self.tree.barks())
+
+        self.assertEqual(len(barks), 49)
+        for i, (bark, below, above) in enumerate(barks):
+            self.assertEqual(bark.ray.start.y, i + 1)
+            self.assertIs(below, added[i])
+            self.assertIs(above, added[i + 1])
+
+    def test_pituus_seuraa_lisayksia_ja_poistoja(self):
+        added = self.append_many(100)
+        self.assertEqual(len(self.tree), 100)
+
+        for leaf in added[1:50]:
+            self.tree.remove_arc(leaf, self.ray(leaf.arc.focal.y))
+
+        self.assertEqual(len(self.tree), 51)
+        self.assertEqual(len(self.tree), len(self.leaves()))
+
+        self.tree.clear()
+        self.assertEqual(len(self.tree), 0)
+
+    def test_poistetut_solmut_kaytetaan_uudelleen(self):
+        added = self.append_many(3)
+        bark = added[1].parent
+
+        self.tree.remove_arc(added[1], self.ray(1))
+        new = self.tree.insert_arc(added[0], binarytree.Side.RIGHT, self.ray(7), self.arc(7))
+
+        self.assertIs(new, added[1])
+        self.assertEqual(new.arc.focal.y, 7)
+        self.assertIsNone(new.event)
+        self.assertIn(bark, [b for b, _, _ in self.tree.barks()])
+        self.assertEqual(bark.ray.start.y, 7)
+        self.assert_valid()
+
+    def test_nollaus_kierrattaa_solmut(self):
+        added = self.append_many(50)
+        self.tree.reset()
+
+        self.assertIsNone(self.tree.root)
+        self.assertEqual(len(self.tree), 0)
+
+        leaf = self.tree.root = self.tree.new_leaf(self.arc(0))
+        self.assertIn(leaf, added)
+        self.assertIsNone(leaf.parent)
+        self.assertIsNone(leaf.next)
+        for y in range(1, 50):
+            leaf = self.tree.insert_arc(leaf, binarytree.Side.RIGHT, self.ray(y), self.arc(y))
+            self.assertIn(leaf, added)
+
+        self.assertEqual(len(self.tree), 50)
+        self.assertEqual(self.tree.find_arc(20, 1)[0].arc.focal.y, 20)
+        self.assert_valid()
+
+    def test_syvyys_on_korkeus(self):
+        self.append_many(300)
+
+        deepest = max(self.tree.depth(leaf) for leaf in self.leaves())
+
+        self.assertEqual(deepest, self.height(self.tree.root))
+        self.assertEqual(self.tree.depth(self.tree.root), 0)
+
+    def test_murtopiste_liikkuu_suoran_mukana(self):
+        # arcs of (0, 0) and (4, 10), the breakpoint moves as the diretrix does
+        above = self.tree.insert_arc(
+            self.first,
+            binarytree.Side.RIGHT,
+            self.ray(5),
+            base_structs.Arc(base_structs.Point(4, 10))
+        )
+        bark = self.tree.root
+
+        for diretrix in [5, 20, 1000]:
+            y = bark.y(diretrix)
+            x = (diretrix ** 2 - y ** 2) / (2 * diretrix)
+
+            # on both arcs, as far from both focals as from the diretrix
+            self.assertAlmostEqual(math.hypot(x, y), diretrix - x)
+            self.assertAlmostEqual(math.hypot(x - 4, y - 10), diretrix - x)
+
+        self.assertAlmostEqual(bark.y(5), (25 - math.sqrt(145)) / 2)
+        self.assertIs(self.tree.find_arc(8, 5)[0], above)
+        self.assertIs(self.tree.find_arc(6, 5)[0], self.first)
+        self.assertIs(self.tree.find_arc(6, 1000)[0], above)
+
+    def test_murtopiste_muistetaan_suoran_ajan(self):
+        self.append_many(3)
+
+        with patch.object(binarytree, "breakpoint_y", wraps=binarytree.breakpoint_y) as solve:
+            for y in range(3):
+                self.tree.find_arc(y, 1)
+            self.assertEqual(solve.call_count, 2)
+
+            self.tree.find_arc(0, 2)
+            self.assertEqual(solve.call_count, 3)
+
+    def test_uusi_naapuri_laskee_uudelleen(self):
+        added = self.append_many(3)
+        self.assertEqual(self.tree.find_arc(1, 1)[0], added[1])
+
+        self.tree.remove_arc(added[1], self.ray(1))
+
+        self.assertIs(self.tree.find_arc(0, 1)[0], added[0])
+        self.assertIs(self.tree.find_arc(1, 1)[0], added[2])
+        self.assertEqual(self.tree.root.y(1), 1.0)
+
+    def test_vasemmalle_lisatty_saa_murtopisteen(self):
+        added = self.append_many(3)
+
+        new = self.tree.insert_arc(added[2], binarytree.Side.LEFT, self.ray(1), self.arc(1))
+
+        for bark, below, above in self.tree.barks():
+            self.assertIs(bark.above, above)
+            self.assertIs(above.prev, below)
+        self.assertIs(self.tree.find_arc(2, 1)[0], added[2])
+        self.assertIs(self.tree.find_arc(1, 1)[0], new)
+
+    def test_barkit_yksi_leaf(self):
+        self.assertEqual(list(self.tree.barks()), [])
@@ -0,0 +1,32 @@
+from unittest import TestCase
+
+import numpy as np
+
+from mapgenerator.algorithms.fortunes import edges
+
+class TestMergePieces(TestCase):
+    def test_kaksi_palaa_yhdistetaan(self):
+        pieces = np.array([[5, 5, 9, 1], [5, 5, 1, 9]])
+        sites = np.array([[0, 1], [1, 0]])
+
+        merged, pairs = edges.merge_pieces(pieces, sites)
+
+        self.assertEqual(merged.tolist(), [[1, 9, 9, 1]])
+        self.assertEqual(pairs.tolist(), [[0, 1]])
+
+    def test_yksittainen_pala_sailyy(self):
+        pieces = np.array([[5, 5, 9, 1], [2, 2, 3, 3]])
+        sites = np.array([[0, 1], [1, 2]])
+
+        merged, pairs = edges.merge_pieces(pieces, sites)
+
+        self.assertEqual(sorted(merged.tolist()), [[2, 2, 3, 3], [5, 5, 9, 1]])
+        self.assertEqual(sorted(pairs.tolist()), [[0, 1], [1, 2]])
+
+    def test_eri_alkupisteet_eivat_yhdisty(self):
+        pieces = np.array([[5, 5, 9, 1], [6, 6, 1, 9]])
+        sites = np.array([[0, 1], [0, 1]])
+
+        merged, _ = edges.merge_pieces(pieces, sites)
+
+        self.assertEqual(len(merged), 2)
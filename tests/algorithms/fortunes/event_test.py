@@ -38,3 +38,116 @@ class TestEvent(TestCase):
 
         with self.assertRaises(TypeError):
             e = event.Event(10, event_type, self.point)
+
+    def test_tasapeli_ratkaistaan_tyypilla(self):
+        point = base_structs.Point(10, 5)
+        site = event.Event(10, event.EventType.SITE_EVENT, point)
+        circle = event.Event(10, event.EventType.CIRCLE_EVENT, point)
+
+        self.assertTrue(site < circle)
+        self.assertFalse(circle < site)
+
+    def test_tasapeli_ratkaistaan_y_koordinaatilla(self):
+        lower = event.Event(10, event.EventType.SITE_EVENT, base_structs.Point(10, 3))
+        upper = event.Event(10, event.EventType.SITE_EVENT, base_structs.Point(10, 7))
+
+        self.assertTrue(lower < upper)
+
+
+class TestEventQueue(TestCase):
+    def setUp(self):
+        self.queue = event.EventQueue()
+
+    def site(self, x: int, y: int) -> event.Event:
+        return event.Event(x, event.EventType.SITE_EVENT, base_structs.Point(x, y))
+
+    def circle(self, x: int, y: int) -> event.Event:
+        return event.Event(x, event.EventType.CIRCLE_EVENT, base_structs.Point(x, y))
+
+    def test_uusi_jono_on_tyhja(self):
+        self.assertTrue(self.queue.empty())
+        self.assertEqual(len(self.queue), 0)
+
+    def test_tyhjasta_jonosta_ei_voi_ottaa(self):
+        with self.assertRaises(IndexError):
+            self.queue.pop()
+
+    def test_epapateva_tapahtuma(self):
+        with self.assertRaises(TypeError):
+            self.queue.push(10)
+
+    def test_jono_palauttaa_pienimman_x(self):
+        for x in [5, 1, 3]:
+            self.queue.push(self.site(x, 0))
+
+        self.assertEqual([self.queue.pop().x for _ in range(3)], [1, 3, 5])
+
+    def test_push_many_jarjestaa_kaikki(self):
+        xs = [9, 4, 7, 1, 8, 2, 6, 3, 5, 0]
+        self.queue.push_many(self.site(x, 0) for x in xs)
+        self.queue.push_many([self.site(11, 0), self.site(10, 0)])
+
+        self.assertEqual(len(self.queue), 12)
+        self.assertEqual([self.queue.pop().x for _ in range(12)], list(range(12)))
+
+    def test_tasapeli_jarjestys_on_toistettava(self):
+        events = [
+            self.circle(4, 1),
+            self.site(4, 9),
+            self.site(4, 2),
+            self.circle(4, 0),
+        ]
+        self.queue.push_many(events)
+
+        order = [self.queue.pop() for _ in range(4)]
+
+        self.assertEqual(order, [events[2], events[1], events[3], events[0]])
+
+    def test_peruttu_tapahtuma_ohitetaan(self):
+        first = self.circle(1, 0)
+        second = self.circle(2, 0)
+        self.queue.push(first)
+        self.queue.push(second)
+
+        self.queue.cancel(first)
+
+        self.assertFalse(first.active)
+        self.assertEqual(len(self.queue), 1)
+        self.assertEqual(self.queue.pop(), second)
+        self.assertTrue(self.queue.empty())
+
+    def test_peruminen_kahdesti_ei_muuta_pituutta(self):
+        e = self.circle(1, 0)
+        self.queue.push(e)
+
+        self.queue.cancel(e)
+        self.queue.cancel(e)
+
+        self.assertEqual(len(self.queue), 0)
+        self.assertEqual(self.queue.cancelled, 1)
+        self.assertTrue(self.queue.empty())
+
+    def test_poistetun_peruminen_ei_muuta_pituutta(self):
+        first = self.circle(1, 0)
+        second = self.circle(2, 0)
+        self.queue.push(first)
+        self.queue.push(second)
+
+        self.assertEqual(self.queue.pop(), first)
+        self.queue.cancel(first)
+        self.queue.cancel(first)
+
+        self.assertFalse(first.queued)
+        self.assertEqual(len(self.queue), 1)
+        self.assertEqual(self.queue.cancelled, 0)
+        self.assertFalse(self.queue.empty())
+        self.assertEqual(self.queue.pop(), second)
+        self.assertEqual(len(self.queue), 0)
+
+    def test_tyhjennys(self):
+        self.queue.push_many([self.site(1, 1), self.circle(2, 2)])
+
+        self.queue.clear()
+
+        self.assertTrue(self.queue.empty())
+        self.assertEqual(len(self.queue), 0)
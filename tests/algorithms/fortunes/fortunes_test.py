@@ -1,8 +1,273 @@
 from unittest import TestCase
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
+
+import numpy as np
 
 from mapgenerator.algorithms import fortunes
+from mapgenerator.algorithms.fortunes import base_structs
+from mapgenerator.algorithms.fortunes.fortunes import FortunesAlgorithm
+from mapgenerator.algorithms.fortunes.geometry import orientation
 
 class TestFortunesAlgorithm(TestCase):
     def setUp(self):
         "kirjottelen myöhemmin"
+
+
+class TestFortunesAlgorithmNumpy(TestCase):
+    def setUp(self):
+        self.sites = np.array([[1, 5], [4, 2], [6, 9]])
+
+    def test_from_array_epapateva_tyyppi(self):
+        with self.assertRaises(TypeError):
+            FortunesAlgorithm.from_array([[1, 2], [3, 4]])
+
+    def test_from_array_epapateva_muoto(self):
+        with self.assertRaises(ValueError):
+            FortunesAlgorithm.from_array(np.array([1, 2, 3]))
+
+    def test_from_array_epapateva_dtype(self):
+        with self.assertRaises(TypeError):
+            FortunesAlgorithm.from_array(np.array([[1.5, 2.0]]))
+
+    def test_from_array_oletus_koko(self):
+        f = FortunesAlgorithm.from_array(self.sites)
+
+        self.assertEqual(f._size, (7, 10))
+
+    def test_from_array_annettu_koko(self):
+        f = FortunesAlgorithm.from_array(self.sites, size=(100, 50))
+
+        self.assertEqual(f._size, (100, 50))
+
+    def test_kaksi_pistetta_leikattu_reuna(self):
+        f = FortunesAlgorithm.from_array(np.array([[1, 1], [5, 5]]))
+
+        edges, sites = f.get_edges_array()
+
+        # the whole bisector x + y = 6, cut at the canvas
+        self.assertEqual(edges.dtype, np.int64)
+        self.assertEqual(sorted(map(sorted, sites.tolist())), [[0, 1]] * len(sites))
+        self.assertTrue(np.all(edges[:, 0] + edges[:, 1] == 6))
+        self.assertTrue(np.all(edges[:, 2] + edges[:, 3] == 6))
+        self.assertTrue(np.all((edges >= 0) & (edges <= 6)))
+        self.assertEqual(
+            {tuple(edge) for edge in edges[:, :2].tolist() + edges[:, 2:].tolist()} \
+                & {(0, 6), (6, 0)},
+            {(0, 6), (6, 0)}
+        )
+
+    def test_kaukaiset_reunat_jatetaan_pois(self):
+        f = FortunesAlgorithm.from_array(np.array([[1, 1], [5, 5]]), size=(2, 2))
+
+        edges, sites = f.get_edges_array()
+
+        self.assertEqual(edges.shape, (0, 4))
+        self.assertEqual(sites.shape, (0, 2))
+        self.assertEqual(f.get_areas(), set())
+
+    def test_epapateva_koko(self):
+        with self.assertRaises(ValueError):
+            FortunesAlgorithm.from_array(self.sites, size=(0, 10))
+
+        with self.assertRaises(TypeError):
+            FortunesAlgorithm.from_array(self.sites, size=(10.0, 10))
+
+    @patch.object(base_structs.Arc, "circle_point")
+    def test_reunat_taulukkona(self, circle_point: Mock):
+        circle_point.return_value = (base_structs.Point(8, 5), 1)
+        f = FortunesAlgorithm.from_array(self.sites, size=(10, 10))
+
+        edges, sites = f.get_edges_array()
+
+        self.assertGreater(len(edges), 0)
+        self.assertEqual(edges.shape, (len(sites), 4))
+        self.assertTrue(np.any(np.all(edges[:, 2:] == [8, 5], axis=1)))
+        self.assertTrue(np.all((sites >= 0) & (sites < len(self.sites))))
+        self.assertTrue(np.all(sites[:, 0] != sites[:, 1]))
+
+    @patch.object(base_structs.Arc, "circle_point")
+    def test_reunat_olioina_vastaa_taulukkoa(self, circle_point: Mock):
+        circle_point.return_value = (base_structs.Point(8, 5), 1)
+        f = FortunesAlgorithm.from_array(self.sites, size=(10, 10))
+
+        edges, _ = f.get_edges_array()
+        areas = f.get_areas()
+
+        self.assertEqual(
+            sorted((e.start.x, e.start.y, e.end.x, e.end.y) for e in areas),
+            sorted(map(tuple, edges.tolist()))
+        )
+
+
+class TestFortunesAlgorithmIterEdges(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.sites = rng.integers(0, 500, size=(100, 2))
+
+    def as_tuples(self, edges) -> list[tuple[int, int, int, int]]:
+        return sorted((e.start.x, e.start.y, e.end.x, e.end.y) for e in edges)
+
+    def test_samat_reunat_kuin_get_areas(self):
+        streamed = list(FortunesAlgorithm.from_array(self.sites).iter_edges())
+        collected = FortunesAlgorithm.from_array(self.sites).get_areas()
+
+        self.assertGreater(len(streamed), 0)
+        self.assertEqual(self.as_tuples(streamed), self.as_tuples(collected))
+
+    def test_reunat_tulevat_kesken_pyyhkaisyn(self):
+        f = FortunesAlgorithm.from_array(self.sites)
+
+        next(f.iter_edges())
+
+        self.assertFalse(f._event_queue.empty())
+
+    def test_annettuja_reunoja_ei_sailyteta(self):
+        f = FortunesAlgorithm.from_array(self.sites)
+
+        for _ in f.iter_edges():
+            if not f._mesh.closed:
+                self.assertLessEqual(len(f._edge_points), 2 * 4)
+
+        edges, sites = f.get_edges_array()
+        self.assertEqual(len(edges), 0)
+        self.assertEqual(len(sites), 0)
+
+    def test_virta_ei_rakenna_verkkoa(self):
+        f = FortunesAlgorithm.from_array(self.sites)
+
+        for _ in f.iter_edges():
+            self.assertEqual(len(f._mesh.vertices()), 0)
+
+        self.assertEqual(len(f._mesh.half_edges(0)), 0)
+        with self.assertRaises(ValueError):
+            f.get_mesh()
+        with self.assertRaises(ValueError):
+            f.relax(1)
+
+    def test_pystyrivin_reunat_virrassa(self):
+        # sites on the same x start their edges on flat arcs
+        sites = np.array([[0, y] for y in range(0, 100, 10)] + [[40, 35], [45, 70]])
+
+        streamed = FortunesAlgorithm.from_array(sites, (100, 100)).iter_edges()
+        collected = FortunesAlgorithm.from_array(sites, (100, 100)).get_areas()
+
+        self.assertEqual(self.as_tuples(streamed), self.as_tuples(collected))
+
+    def test_keskeytetty_virta_jatkuu(self):
+        f = FortunesAlgorithm.from_array(self.sites)
+        expected = self.as_tuples(FortunesAlgorithm.from_array(self.sites).get_areas())
+
+        stream = f.iter_edges()
+        first = [next(stream) for _ in range(5)]
+        stream.close()
+        rest = f.get_areas()
+
+        self.assertEqual(self.as_tuples(first + list(rest)), expected)
+
+
+class TestFortunesAlgorithmMesh(TestCase):
+    def setUp(self):
+        self.sites = np.array([[0, 0], [10, 10], [0, 20], [20, 5]])
+        self.mesh = FortunesAlgorithm.from_array(self.sites, (100, 100)).get_mesh()
+
+    def test_solu_jokaiselle_pisteelle(self):
+        self.assertEqual(len(self.mesh), len(self.sites))
+
+    def test_kolme_pistetta_yksi_karki(self):
+        mesh = FortunesAlgorithm.from_array(self.sites[:3], (100, 100)).get_mesh()
+
+        self.assertEqual(mesh.vertices()[0].tolist(), [0, 10])
+        self.assertEqual(mesh.delaunay_triangles().tolist(), [[0, 1, 2]])
+
+    def test_kolmiot_vastapaivaan(self):
+        for triangle in self.mesh.delaunay_triangles():
+            a, b, c = self.sites[triangle].tolist()
+            self.assertEqual(orientation(*a, *b, *c), 1)
+
+    def test_keskimmainen_solu_suljettu(self):
+        half_edges = self.mesh.half_edges(1)
+
+        self.assertEqual(len(half_edges), 3)
+        self.assertEqual(self.mesh.next(half_edges[-1]), half_edges[0])
+
+    def test_solut_suljettu_kankaalle(self):
+        for polygon in self.mesh.cell_polygons():
+            self.assertGreaterEqual(len(polygon), 3)
+            self.assertTrue(np.all((polygon >= 0) & (polygon <= 100)))
+
+    def test_solut_peittavat_kankaan(self):
+        area = 0
+        for polygon in self.mesh.cell_polygons():
+            x, y = polygon[:, 0], polygon[:, 1]
+            area += (np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2
+
+        self.assertAlmostEqual(area, 100 * 100, delta=100)
+
+    def test_solujen_sivut(self):
+        starts, ends, cells = self.mesh.cell_sides()
+
+        self.assertEqual(np.bincount(cells).tolist(), [len(p) for p in self.mesh.cell_polygons()])
+        self.assertTrue(np.array_equal(ends[cells == 1], np.roll(starts[cells == 1], -1, axis=0)))
+
+    def test_yksinainen_piste_omistaa_kankaan(self):
+        mesh = FortunesAlgorithm.from_array(np.array([[3, 4]]), (10, 10)).get_mesh()
+
+        self.assertEqual(
+            sorted(mesh.cell_polygon(0).tolist()),
+            [[0, 0], [0, 10], [10, 0], [10, 10]]
+        )
+
+    def test_naapuruus_symmetrinen(self):
+        for site in range(len(self.sites)):
+            for other in self.mesh.neighbours(site).tolist():
+                self.assertIn(site, self.mesh.neighbours(other).tolist())
+
+
+class TestFortunesAlgorithmOikeellisuus(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        self.sites = np.unique(rng.integers(0, 1000, size=(100, 2)), axis=0)
+        self.edges, self.edge_sites = FortunesAlgorithm.from_array(
+            self.sites, (1000, 1000)
+        ).get_edges_array()
+
+    def assert_nearest_sites(self, sites: np.ndarray, edges: np.ndarray, edge_sites: np.ndarray):
+        middles = (edges[:, :2] + edges[:, 2:]) / 2
+        distances = np.hypot(
+            middles[:, np.newaxis, 0] - sites[np.newaxis, :, 0],
+            middles[:, np.newaxis, 1] - sites[np.newaxis, :, 1]
+        )
+        own = np.take_along_axis(distances, edge_sites, axis=1)
+
+        # the ends are rounded to ints, so a pixel or two of slack
+        self.assertTrue(np.all(np.abs(own[:, 0] - own[:, 1]) < 2))
+        self.assertTrue(np.all(own.max(axis=1) <= distances.min(axis=1) + 2))
+
+    def test_reuna_jakaa_lahimmat_pisteet(self):
+        self.assert_nearest_sites(self.sites, self.edges, self.edge_sites)
+
+    def test_pystyrivin_reuna_tulee_vasemmalta(self):
+        # the edge between sites on the same x runs from x = -inf
+        sites = np.array([[50, 40], [50, 60], [60, 50]])
+        f = FortunesAlgorithm.from_array(sites, (100, 100))
+
+        edges, edge_sites = f.get_edges_array()
+
+        self.assert_nearest_sites(sites, edges, edge_sites)
+        self.assertIn([0, 50], f.get_mesh().cell_polygon(0).tolist())
+        self.assertIn(
+            [[0, 50], [50, 50]],
+            [sorted([edge[:2], edge[2:]]) for edge in edges[np.all(np.sort(edge_sites) == [0, 1], axis=1)].tolist()]
+        )
+
+    def test_pystyrivin_reuna_ei_jatku_oikealle(self):
+        sites = np.array([[16, 967], [16, 1300], [36, 1043]])
+
+        edges, edge_sites = FortunesAlgorithm.from_array(sites, (2000, 2000)).get_edges_array()
+
+        # the edge between the first two ends left of the canvas
+        self.assert_nearest_sites(sites, edges, edge_sites)
+        self.assertNotIn([0, 1], np.sort(edge_sites).tolist())
+
+    def test_jokaisella_pisteella_reunoja(self):
+        self.assertEqual(set(self.edge_sites.reshape(-1).tolist()), set(range(len(self.sites))))
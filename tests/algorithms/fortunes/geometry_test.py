@@ -0,0 +1,92 @@
+from fractions import Fraction
+from unittest import TestCase
+
+import numpy as np
+
+from mapgenerator.algorithms.fortunes import geometry
+
+class TestOrientation(TestCase):
+    def test_vastapaivaan(self):
+        self.assertEqual(geometry.orientation(0, 0, 4, 0, 0, 4), 1)
+
+    def test_myotapaivaan(self):
+        self.assertEqual(geometry.orientation(0, 0, 0, 4, 4, 0), -1)
+
+    def test_samalla_suoralla(self):
+        self.assertEqual(geometry.orientation(0, 0, 3, 3, 7, 7), 0)
+
+    def test_samalla_suoralla_isot_luvut(self):
+        # floats can't tell these apart, the exact fallback can
+        big = 2 ** 60
+        self.assertEqual(geometry.orientation(0, 0, big, big + 1, 2 * big, 2 * big + 2), 0)
+        self.assertEqual(geometry.orientation(0, 0, big, big + 1, 2 * big, 2 * big + 3), 1)
+        self.assertEqual(geometry.orientation(0, 0, big, big + 1, 2 * big, 2 * big + 1), -1)
+
+
+class TestCircumcircle(TestCase):
+    def test_ympyra(self):
+        x, y, r = geometry.circumcircle(-6, 3, -3, 2, 0, 3)
+
+        self.assertAlmostEqual(x, -3)
+        self.assertAlmostEqual(y, 7)
+        self.assertAlmostEqual(r, 5)
+
+    def test_pisteiden_jarjestys_ei_vaikuta(self):
+        first = geometry.circumcircle(1, 7, 9, 2, 4, 4)
+        second = geometry.circumcircle(4, 4, 1, 7, 9, 2)
+
+        for a, b in zip(first, second):
+            self.assertAlmostEqual(a, b)
+
+    def test_samalla_suoralla_ei_ympyraa(self):
+        self.assertIsNone(geometry.circumcircle(0, 0, 1, 2, 2, 4))
+
+    def test_sama_piste_kahdesti_ei_ympyraa(self):
+        self.assertIsNone(geometry.circumcircle(3, 3, 5, 1, 3, 3))
+
+    def test_lahes_suora_lasketaan_tarkasti(self):
+        big = 2 ** 60
+        x, y, r = geometry.circumcircle(0, 0, big, big + 1, 2 * big, 2 * big + 3)
+
+        # exact center from the same formula with fractions
+        det = Fraction(big * (2 * big + 3) - (big + 1) * 2 * big)
+        b_squared = big ** 2 + (big + 1) ** 2
+        c_squared = (2 * big) ** 2 + (2 * big + 3) ** 2
+        ux = ((2 * big + 3) * b_squared - (big + 1) * c_squared) / (2 * det)
+        uy = (big * c_squared - 2 * big * b_squared) / (2 * det)
+
+        self.assertEqual(x, float(ux))
+        self.assertEqual(y, float(uy))
+        self.assertAlmostEqual(r / float((ux ** 2 + uy ** 2) ** Fraction(1, 2)), 1.0)
+
+
+class TestBreakpoint(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        self.diretrix = 1000
+        self.pairs = [
+            (p, q) for p, q in zip(
+                rng.integers(0, 1000, size=(300, 2)).tolist(),
+                rng.integers(0, 1000, size=(300, 2)).tolist()
+            ) if p != q
+        ]
+
+    def x(self, focal: list[int], y: float) -> float:
+        """ Arc.x without the rounding """
+        fx, fy = focal
+        return 0.5 / (fx - self.diretrix) * (y - fy) ** 2 + 0.5 * (fx + self.diretrix)
+
+    def test_murtopiste_on_rantaviivalla(self):
+        for p, q in self.pairs:
+            y = geometry.breakpoint_y(*p, *q, self.diretrix)
+
+            # the arc of p is in front below the breakpoint, the one of q above
+            self.assertGreaterEqual(self.x(p, y - 1e-3), self.x(q, y - 1e-3))
+            self.assertGreaterEqual(self.x(q, y + 1e-3), self.x(p, y + 1e-3))
+
+    def test_murtopiste_sama_x(self):
+        self.assertAlmostEqual(geometry.breakpoint_y(10, 0, 10, 8, 20), 4)
+
+    def test_murtopiste_litteat_arcit(self):
+        self.assertEqual(geometry.breakpoint_y(20, 3, 10, 8, 20), 3)
+        self.assertEqual(geometry.breakpoint_y(20, 2, 20, 8, 20), 5)
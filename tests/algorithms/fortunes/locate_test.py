@@ -0,0 +1,96 @@
+from unittest import TestCase
+
+import numpy as np
+
+from mapgenerator.algorithms.fortunes.fortunes import FortunesAlgorithm
+from mapgenerator.algorithms.fortunes.locate import SiteIndex
+
+def nearest(sites: np.ndarray, points: np.ndarray) -> np.ndarray:
+    distances = ((points[:, np.newaxis, :] - sites[np.newaxis, :, :]) ** 2).sum(axis=2)
+
+    return distances.argmin(axis=1)
+
+
+class TestSiteIndex(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.sites = np.unique(rng.integers(0, 300, size=(500, 2)), axis=0)
+        rng.shuffle(self.sites)
+        self.index = SiteIndex(self.sites, (300, 300))
+        self.points = rng.random((5000, 2)) * 300
+
+    def test_lahin_piste(self):
+        self.assertTrue(np.array_equal(
+            self.index.locate(self.points),
+            nearest(self.sites, self.points)
+        ))
+
+    def test_pisteet_omissa_soluissaan(self):
+        self.assertTrue(np.array_equal(self.index.locate(self.sites), np.arange(len(self.sites))))
+
+    def test_kasaantuneet_pisteet(self):
+        # one tight cluster and a few far away sites
+        rng = np.random.default_rng(5)
+        sites = np.unique(np.vstack((
+            rng.integers(0, 10, size=(200, 2)),
+            [[990, 990], [0, 990], [990, 0]]
+        )), axis=0)
+        points = rng.random((3000, 2)) * 1000
+
+        index = SiteIndex(sites, (1000, 1000))
+
+        self.assertTrue(np.array_equal(index.locate(points), nearest(sites, points)))
+
+    def test_reunalla_pienempi_piste(self):
+        index = SiteIndex(np.array([[6, 5], [2, 5]]), (10, 10))
+
+        self.assertEqual(index.locate(np.array([[4, 1], [4, 9]])).tolist(), [0, 0])
+
+    def test_kankaan_ulkopuolella(self):
+        points = np.array([[-1, 5], [5, 301], [np.nan, 5], [300, 300]])
+
+        self.assertEqual(self.index.locate(points)[:3].tolist(), [-1, -1, -1])
+        self.assertNotEqual(self.index.locate(points)[3], -1)
+
+    def test_ei_pisteita(self):
+        index = SiteIndex(np.empty((0, 2), dtype=np.int64), (10, 10))
+
+        self.assertEqual(index.locate(np.array([[1, 1]])).tolist(), [-1])
+
+    def test_tallennus_ja_lataus(self):
+        loaded = SiteIndex.from_arrays(self.index.arrays())
+
+        self.assertEqual(loaded.size, (300, 300))
+        self.assertTrue(np.array_equal(loaded.locate(self.points), self.index.locate(self.points)))
+
+    def test_piste_kankaan_ulkopuolella(self):
+        rng = np.random.default_rng(4)
+        sites = np.unique(rng.integers(-200, 500, size=(300, 2)), axis=0)
+        points = rng.random((3000, 2)) * 300
+
+        index = SiteIndex(sites, (300, 300))
+
+        self.assertTrue(np.array_equal(index.locate(points), nearest(sites, points)))
+
+    def test_epapateva_koko(self):
+        with self.assertRaises(ValueError):
+            SiteIndex(np.array([[1, 5]]), (10, 0))
+
+
+class TestFortunesAlgorithmIndex(TestCase):
+    def test_indeksi_rakennetaan_kerran(self):
+        algorithm = FortunesAlgorithm.from_array(np.array([[2, 5], [8, 5]]), (10, 10))
+
+        index = algorithm.get_index()
+
+        self.assertIs(algorithm.get_index(), index)
+        self.assertEqual(index.locate(np.array([[1, 1], [9, 9]])).tolist(), [0, 1])
+
+    def test_piste_kankaan_ulkopuolella(self):
+        algorithm = FortunesAlgorithm.from_array(np.array([[2, 5], [8, 5], [15, 5]]), (10, 10))
+        edges, _ = algorithm.get_edges_array()
+
+        index = algorithm.get_index()
+
+        self.assertGreater(len(edges), 0)
+        self.assertEqual(index.locate(np.array([[1, 1], [9, 9], [10, 5]])).tolist(), [0, 1, 1])
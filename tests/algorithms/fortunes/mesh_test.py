@@ -0,0 +1,73 @@
+from unittest import TestCase
+
+from mapgenerator.algorithms.fortunes.mesh import HalfEdgeMesh
+
+class TestHalfEdgeMesh(TestCase):
+    def setUp(self):
+        # three cells around one vertex, like after a single circle event
+        self.mesh = HalfEdgeMesh()
+        for _ in range(3):
+            self.mesh.add_face(0, 0)
+
+        self.vertex = self.mesh.add_vertex(5, 5, (0, 2, 1))
+        self.left = self.mesh.add_edge(0, 1)
+        self.right = self.mesh.add_edge(1, 2)
+        self.new = self.mesh.add_edge(0, 2)
+
+        self.mesh.set_origin(self.left, self.vertex)
+        self.mesh.set_origin(self.right, self.vertex)
+        self.mesh.set_origin(self.new ^ 1, self.vertex)
+        self.mesh.link(self.left ^ 1, self.right)
+        self.mesh.link(self.new, self.left)
+        self.mesh.link(self.right ^ 1, self.new ^ 1)
+
+    def test_kaksoset(self):
+        self.assertEqual(self.mesh.face(self.left), 0)
+        self.assertEqual(self.mesh.face(self.left ^ 1), 1)
+
+    def test_solun_puolireunat_jarjestyksessa(self):
+        self.assertEqual(self.mesh.half_edges(1), [self.left ^ 1, self.right])
+        self.assertEqual(self.mesh.half_edges(0), [self.new, self.left])
+
+    def test_avoin_solu_alkaa_ilman_edeltajaa(self):
+        self.assertEqual(self.mesh.prev(self.mesh.half_edges(2)[0]), -1)
+
+    def test_solun_kulmat(self):
+        self.assertEqual(self.mesh.cell_polygon(1).tolist(), [[5, 5]])
+
+    def test_naapurit(self):
+        self.assertEqual(sorted(self.mesh.neighbours(1).tolist()), [0, 2])
+
+    def test_naapurilista(self):
+        offsets, neighbours = self.mesh.adjacency()
+
+        self.assertEqual(offsets.tolist(), [0, 2, 4, 6])
+        for site in range(3):
+            self.assertEqual(
+                sorted(neighbours[offsets[site]:offsets[site + 1]].tolist()),
+                sorted(self.mesh.neighbours(site).tolist())
+            )
+
+    def test_kolmiot(self):
+        self.assertEqual(self.mesh.delaunay_triangles().tolist(), [[0, 2, 1]])
+        self.assertEqual(self.mesh.vertices().tolist(), [[5, 5]])
+
+    def test_solu_ilman_reunoja(self):
+        self.mesh.add_face(0, 0)
+
+        self.assertEqual(self.mesh.half_edges(3), [])
+        self.assertEqual(len(self.mesh.cell_polygon(3)), 0)
+
+    def test_tyhjennys(self):
+        self.mesh.clear()
+
+        self.assertEqual(len(self.mesh), 0)
+        self.assertEqual(len(self.mesh.vertices()), 0)
+        self.assertEqual(len(self.mesh.sites()), 0)
+        self.assertFalse(self.mesh.closed)
+
+    def test_solujen_kulmat_taulukkona(self):
+        corners, offsets = self.mesh.cell_polygons_array()
+
+        self.assertEqual(offsets.tolist(), [0, 1, 2, 3])
+        self.assertEqual(corners.tolist(), [[5, 5]] * 3)
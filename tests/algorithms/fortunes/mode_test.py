@@ -0,0 +1,55 @@
+from unittest import TestCase
+
+from mapgenerator.algorithms.fortunes import base_structs, binarytree, event
+from mapgenerator.algorithms.fortunes.mode import SETTINGS, Mode
+
+class TestMode(TestCase):
+    def tearDown(self):
+        SETTINGS.set_mode(Mode.DEBUG)
+
+    def test_oletuksena_debug(self):
+        self.assertEqual(SETTINGS.get_mode(), Mode.DEBUG)
+
+    def test_aseta_release(self):
+        SETTINGS.set_mode(Mode.RELEASE)
+
+        self.assertEqual(SETTINGS.get_mode(), Mode.RELEASE)
+        self.assertFalse(SETTINGS.validate)
+
+    def test_epapateva_tila(self):
+        with self.assertRaises(TypeError):
+            SETTINGS.set_mode("release")
+
+    def test_release_ei_tarkista_tyyppeja(self):
+        SETTINGS.set_mode(Mode.RELEASE)
+
+        p = base_structs.Point("10", 20)
+
+        self.assertEqual(p.x, "10")
+
+    def test_debug_tarkistaa_tyypit(self):
+        SETTINGS.set_mode(Mode.RELEASE)
+        SETTINGS.set_mode(Mode.DEBUG)
+
+        with self.assertRaises(TypeError):
+            base_structs.Point("10", 20)
+
+
+class TestSlots(TestCase):
+    def test_rakenteilla_ei_ole_dictia(self):
+        point = base_structs.Point(1, 2)
+        arc = base_structs.Arc(point)
+        ray = base_structs.Ray(point, point)
+        leaf = binarytree.BinaryTreeLeaf(arc)
+        objects = [
+            point,
+            arc,
+            ray,
+            base_structs.Edge(point, point),
+            event.Event(1, event.EventType.SITE_EVENT, point),
+            leaf,
+            binarytree.BinaryTreeBark(ray, leaf, binarytree.BinaryTreeLeaf(arc)),
+        ]
+
+        for obj in objects:
+            self.assertFalse(hasattr(obj, "__dict__"), type(obj))
@@ -0,0 +1,76 @@
+from unittest import TestCase
+
+import numpy as np
+
+from mapgenerator.algorithms.fortunes.fortunes import FortunesAlgorithm
+from mapgenerator.algorithms.fortunes.relax import RelaxStep, centroids, lloyd_sites
+
+class TestCentroids(TestCase):
+    def test_yksi_piste_koko_kangas(self):
+        mesh = FortunesAlgorithm.from_array(np.array([[2, 3]]), (10, 10)).get_mesh()
+
+        centers, areas = centroids(mesh)
+
+        self.assertEqual(centers.tolist(), [[5, 5]])
+        self.assertEqual(areas.tolist(), [100])
+
+    def test_kaksi_pistetta_puolikkaat(self):
+        sites = np.array([[2, 5], [8, 5]])
+        mesh = FortunesAlgorithm.from_array(sites, (10, 10)).get_mesh()
+
+        centers, areas = centroids(mesh)
+
+        self.assertEqual(centers.tolist(), [[2.5, 5], [7.5, 5]])
+        self.assertEqual(areas.tolist(), [50, 50])
+
+    def test_pisteet_keskipisteisiin(self):
+        mesh = FortunesAlgorithm.from_array(np.array([[2, 3]]), (10, 10)).get_mesh()
+
+        self.assertEqual(lloyd_sites(mesh, (10, 10)).tolist(), [[5, 5]])
+
+
+class TestRelax(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(4)
+        self.sites = np.unique(rng.integers(0, 200, size=(100, 2)), axis=0)
+        self.algorithm = FortunesAlgorithm.from_array(self.sites, (200, 200))
+
+    def test_kierrokset_ja_ajat(self):
+        steps = self.algorithm.relax(3, tolerance=0)
+
+        self.assertLessEqual(len(steps), 3)
+        for step in steps:
+            self.assertIsInstance(step, RelaxStep)
+            self.assertGreaterEqual(step.seconds, 0)
+
+    def test_pysahtyy_kun_siirrot_pienia(self):
+        steps = self.algorithm.relax(10, tolerance=1e9)
+
+        self.assertEqual(len(steps), 1)
+        self.assertTrue(np.array_equal(self.algorithm.get_mesh().sites(), self.sites))
+
+    def test_pisteet_sailyvat_erillisina_kankaalla(self):
+        self.algorithm.relax(3, tolerance=0)
+
+        sites = self.algorithm.get_mesh().sites()
+        self.assertEqual(len(sites), len(self.sites))
+        self.assertEqual(len(np.unique(sites, axis=0)), len(sites))
+        self.assertTrue(np.all((sites >= 0) & (sites < 200)))
+
+    def test_nolla_kierrosta(self):
+        self.assertEqual(self.algorithm.relax(0), [])
+
+    def test_epapateva_kierrosmaara(self):
+        with self.assertRaises(ValueError):
+            self.algorithm.relax(-1)
+
+    def test_kaksi_pistetta_tasapainoon(self):
+        algorithm = FortunesAlgorithm.from_array(np.array([[1, 5], [3, 5]]), (10, 10))
+
+        steps = algorithm.relax(10)
+
+        self.assertLess(steps[-1].displacement, 0.5)
+        (x1, y1), (x2, y2) = sorted(algorithm.get_mesh().sites().tolist())
+        self.assertAlmostEqual(x1, 2.5, delta=0.5)
+        self.assertAlmostEqual(x2, 7.5, delta=0.5)
+        self.assertEqual((y1, y2), (5, 5))
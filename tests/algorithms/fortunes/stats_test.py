@@ -0,0 +1,97 @@
+from unittest import TestCase
+
+import numpy as np
+
+from mapgenerator.algorithms.fortunes.event import EventType
+from mapgenerator.algorithms.fortunes.fortunes import FortunesAlgorithm
+from mapgenerator.algorithms.fortunes.stats import SweepStats
+
+class TestSweepStats(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.sites = rng.integers(0, 1000, size=(200, 2))
+
+    def test_oletuksena_pois(self):
+        f = FortunesAlgorithm.from_array(self.sites)
+        f.get_edges_array()
+
+        self.assertIsNone(f.stats)
+
+    def test_tapahtumat_lasketaan(self):
+        f = FortunesAlgorithm.from_array(self.sites)
+        stats = f.instrument()
+        f.get_edges_array()
+
+        self.assertIs(f.stats, stats)
+        self.assertEqual(stats.site_events, len(self.sites))
+        self.assertGreater(stats.circle_events, 0)
+        self.assertGreater(stats.false_alarms, 0)
+        self.assertTrue(0 < stats.prune_rate < 1)
+        self.assertGreaterEqual(stats.max_queue, len(self.sites))
+        self.assertGreater(stats.max_beachline, 1)
+        self.assertGreater(stats.max_insert_depth, 0)
+        self.assertGreater(stats.site_seconds, 0)
+        self.assertGreater(stats.circle_seconds, 0)
+
+    def test_samat_reunat_kuin_ilman(self):
+        plain = FortunesAlgorithm.from_array(self.sites)
+        instrumented = FortunesAlgorithm.from_array(self.sites)
+        instrumented.instrument()
+
+        self.assertTrue(np.array_equal(
+            plain.get_edges_array()[0],
+            instrumented.get_edges_array()[0]
+        ))
+
+    def test_jalki_jokaisesta_tapahtumasta(self):
+        events = []
+        f = FortunesAlgorithm.from_array(self.sites)
+        stats = f.instrument(trace=events.append)
+        list(f.iter_edges())
+
+        self.assertEqual(len(events), stats.site_events + stats.circle_events)
+        self.assertEqual(
+            sum(event.type == EventType.SITE_EVENT for event in events),
+            len(self.sites)
+        )
+        self.assertEqual(
+            sum(event.type == EventType.CIRCLE_EVENT for event in events),
+            stats.circle_events
+        )
+
+    def test_vaarat_halytykset_karsitaan_jonosta(self):
+        circles = []
+
+        def trace(event):
+            if event.type == EventType.CIRCLE_EVENT:
+                circles.append((event.leaf.prev, event.leaf.next))
+
+        f = FortunesAlgorithm.from_array(self.sites)
+        f.instrument(trace=trace)
+        f.get_edges_array()
+
+        # every circle event that comes up still has its arc between
+        # two neighbours on the beachline
+        self.assertTrue(circles)
+        self.assertTrue(all(prev is not None and nxt is not None for prev, nxt in circles))
+
+    def test_epapateva_jalki(self):
+        with self.assertRaises(TypeError):
+            FortunesAlgorithm.from_array(self.sites).instrument(trace=5)
+
+    def test_laskut_jatkuvat_relaksoinnissa(self):
+        f = FortunesAlgorithm.from_array(self.sites, (1000, 1000))
+        stats = f.instrument()
+
+        steps = f.relax(2, tolerance=0)
+
+        self.assertEqual(stats.site_events, len(self.sites) * (len(steps) + 1))
+
+    def test_sanakirjana(self):
+        stats = SweepStats()
+        stats.site_events = 3
+
+        self.assertEqual(stats.as_dict()["site_events"], 3)
+        self.assertEqual(set(stats.as_dict()), set(SweepStats.__slots__) | {"prune_rate"})
+        self.assertEqual(stats.as_dict()["prune_rate"], 0.0)
+        self.assertIn("3 site events", str(stats))
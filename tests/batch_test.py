@@ -0,0 +1,105 @@
+import argparse
+import io
+import os
+import tempfile
+from contextlib import redirect_stderr
+from unittest import TestCase
+
+import numpy as np
+
+from mapgenerator import batch
+from mapgenerator import sites as site_generators
+from mapgenerator.algorithms.fortunes.locate import SiteIndex
+from mapgenerator.algorithms.fortunes.mode import SETTINGS, Mode
+
+class TestParse(TestCase):
+    def test_siemenvali(self):
+        self.assertEqual(batch.parse_seeds("3:7"), range(3, 7))
+
+    def test_yksi_siemen(self):
+        self.assertEqual(batch.parse_seeds("5"), range(5, 6))
+
+    def test_tyhja_siemenvali(self):
+        with self.assertRaises(argparse.ArgumentTypeError):
+            batch.parse_seeds("7:3")
+
+    def test_epapateva_siemen(self):
+        with self.assertRaises(argparse.ArgumentTypeError):
+            batch.parse_seeds("a:b")
+
+    def test_nolla_siemen(self):
+        self.assertEqual(batch.parse_seeds("0:2"), range(0, 2))
+
+    def test_epapateva_tyomaara(self):
+        for jobs in ["0", "-2"]:
+            with self.assertRaises(SystemExit), redirect_stderr(io.StringIO()):
+                batch.main(["--seeds", "0:1", "--sites", "10", "--jobs", jobs])
+
+    def test_koko(self):
+        self.assertEqual(batch.parse_size("300,200"), (300, 200))
+
+    def test_epapateva_koko(self):
+        with self.assertRaises(argparse.ArgumentTypeError):
+            batch.parse_size("300")
+
+    def test_koko_ei_positiivinen(self):
+        for text in ["0,0", "-5,100", "100,0"]:
+            with self.assertRaises(argparse.ArgumentTypeError):
+                batch.parse_size(text)
+
+
+class TestBatch(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.out = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def load(self, seed: int):
+        return np.load(os.path.join(self.out, f"map_{seed}.npz"))
+
+    def test_tila_ei_muutu(self):
+        batch.generate_map(2, sites=20, size=(100, 100), out_dir=self.out)
+
+        self.assertEqual(SETTINGS.get_mode(), Mode.DEBUG)
+
+    def test_kartta_on_toistettava(self):
+        batch.generate_map(4, sites=50, size=(100, 100), out_dir=self.out)
+        first = self.load(4)["edges"]
+        batch.generate_map(4, sites=50, size=(100, 100), out_dir=self.out)
+        second = self.load(4)["edges"]
+
+        self.assertTrue(np.array_equal(first, second))
+
+    def test_kartan_pisteet_kankaalla(self):
+        count = batch.generate_map(1, sites=50, size=(30, 20), out_dir=self.out)
+        sites = self.load(1)["sites"]
+
+        self.assertEqual(len(sites), count)
+        self.assertTrue(np.all(sites < (30, 20)))
+
+    def test_jokaiselle_siemenelle_oma_tiedosto(self):
+        total, elapsed = batch.run(range(0, 6), sites=30, size=(100, 100), out_dir=self.out, jobs=2)
+
+        self.assertEqual(sorted(os.listdir(self.out)), sorted(f"map_{i}.npz" for i in range(6)))
+        self.assertEqual(total, sum(len(self.load(i)["sites"]) for i in range(6)))
+        self.assertGreater(elapsed, 0)
+
+    def test_pisteiden_jakauma(self):
+        count = batch.generate_map(
+            2, sites=50, size=(100, 100), out_dir=self.out, distribution="poisson"
+        )
+
+        self.assertEqual(count, 50)
+        self.assertTrue(np.array_equal(
+            self.load(2)["sites"],
+            site_generators.poisson_disk(50, (100, 100), seed=2)
+        ))
+
+    def test_paikannus_tallennetaan(self):
+        batch.generate_map(3, sites=50, size=(100, 100), out_dir=self.out)
+        index = SiteIndex.from_arrays(self.load(3))
+        sites = self.load(3)["sites"]
+
+        self.assertTrue(np.array_equal(index.locate(sites), np.arange(len(sites))))
@@ -0,0 +1,149 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+
+from mapgenerator import cache
+from mapgenerator.algorithms.fortunes.fortunes import FortunesAlgorithm
+
+def cached_edges(directory: str, sites: np.ndarray) -> int:
+    return len(cache.DiagramCache(directory).edges_array(sites, (500, 500))[0])
+
+
+class TestDiagramCache(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = cache.DiagramCache(self.tmp.name)
+
+        rng = np.random.default_rng(4)
+        self.sites = np.unique(rng.integers(0, 500, size=(60, 2)), axis=0)
+        rng.shuffle(self.sites)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def entries(self) -> list[str]:
+        return sorted(name for name in os.listdir(self.tmp.name) if name.endswith(cache.SUFFIX))
+
+    def as_rows(self, edges: np.ndarray, edge_sites: np.ndarray) -> list[tuple]:
+        return sorted(
+            (*edge, *sorted(pair)) for edge, pair in zip(edges.tolist(), edge_sites.tolist())
+        )
+
+    def test_ohi_ja_osuma(self):
+        first = self.cache.diagram(self.sites, (500, 500))
+        second = self.cache.diagram(self.sites, (500, 500))
+
+        self.assertEqual(self.cache.stats.misses, 1)
+        self.assertEqual(self.cache.stats.hits, 1)
+        self.assertEqual(self.cache.stats.hit_rate, 0.5)
+        self.assertTrue(np.array_equal(first.edges, second.edges))
+        self.assertEqual(len(self.entries()), 1)
+
+    def test_jarjestys_ei_vaikuta_avaimeen(self):
+        self.cache.diagram(self.sites, (500, 500))
+        self.cache.diagram(self.sites[::-1], (500, 500))
+
+        self.assertEqual(self.cache.stats.hits, 1)
+        self.assertEqual(
+            cache.cache_key(self.sites, (500, 500)),
+            cache.cache_key(self.sites[::-1], (500, 500))
+        )
+
+    def test_koko_ja_versio_avaimessa(self):
+        key = cache.cache_key(self.sites, (500, 500))
+
+        self.assertNotEqual(key, cache.cache_key(self.sites, (501, 500)))
+        with patch.object(cache, "ALGORITHM_VERSION", -1):
+            self.assertNotEqual(key, cache.cache_key(self.sites, (500, 500)))
+
+    def test_samat_reunat_kuin_ilman(self):
+        expected = FortunesAlgorithm.from_array(self.sites, (500, 500)).get_edges_array()
+
+        for _ in range(2):
+            edges, edge_sites = self.cache.edges_array(self.sites, (500, 500))
+
+            self.assertEqual(self.as_rows(edges, edge_sites), self.as_rows(*expected))
+
+    def test_alueet(self):
+        areas = self.cache.areas(self.sites, (500, 500))
+        edges, _ = FortunesAlgorithm.from_array(self.sites, (500, 500)).get_edges_array()
+
+        self.assertEqual(
+            sorted((e.start.x, e.start.y, e.end.x, e.end.y) for e in areas),
+            sorted(map(tuple, edges.tolist()))
+        )
+
+    def test_vanhin_poistetaan(self):
+        sizes = [(500, 500), (501, 500), (502, 500)]
+        self.cache.diagram(self.sites, sizes[0])
+        self.cache.diagram(self.sites, sizes[1])
+        paths = [self.cache.path(self.sites, size) for size in sizes]
+
+        # the first one was used last
+        os.utime(paths[0], (2000, 2000))
+        os.utime(paths[1], (1000, 1000))
+
+        small = cache.DiagramCache(self.tmp.name, max_bytes=2 * os.path.getsize(paths[0]))
+        small.diagram(self.sites, sizes[2])
+
+        self.assertTrue(os.path.exists(paths[0]))
+        self.assertFalse(os.path.exists(paths[1]))
+        self.assertTrue(os.path.exists(paths[2]))
+        self.assertEqual(small.stats.evictions, 1)
+
+    def test_osuma_paivittaa_kayton(self):
+        self.cache.diagram(self.sites, (500, 500))
+        path = self.cache.path(self.sites, (500, 500))
+        os.utime(path, (1000, 1000))
+
+        self.cache.diagram(self.sites, (500, 500))
+
+        self.assertGreater(os.path.getmtime(path), 1000)
+
+    def test_uusin_sailyy_vaikka_liian_iso(self):
+        tiny = cache.DiagramCache(self.tmp.name, max_bytes=1)
+
+        tiny.diagram(self.sites, (500, 500))
+        tiny.diagram(self.sites, (501, 500))
+
+        self.assertEqual(self.entries(), [os.path.basename(tiny.path(self.sites, (501, 500)))])
+
+    def test_vanha_tiedostomuoto_on_ohi(self):
+        path = self.cache.path(self.sites, (500, 500))
+        with open(path, "wb") as file:
+            file.write(b"not a diagram")
+
+        self.cache.diagram(self.sites, (500, 500))
+
+        self.assertEqual(self.cache.stats.misses, 1)
+        self.assertEqual(len(self.cache.diagram(self.sites, (500, 500)).sites), len(self.sites))
+
+    def test_tyhjenna(self):
+        self.cache.diagram(self.sites, (500, 500))
+
+        self.cache.clear()
+
+        self.assertEqual(self.entries(), [])
+
+    def test_epapateva_koko(self):
+        with self.assertRaises(ValueError):
+            cache.DiagramCache(self.tmp.name, max_bytes=0)
+
+    def test_prosessit_jakavat_hakemiston(self):
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            counts = list(pool.map(cached_edges, [self.tmp.name] * 4, [self.sites] * 4))
+
+        self.assertEqual(len(set(counts)), 1)
+        self.assertEqual(os.listdir(self.tmp.name), self.entries())
+        self.assertEqual(len(self.entries()), 1)
+
+    def test_oletushakemisto(self):
+        with patch.dict(os.environ, {"XDG_CACHE_HOME": self.tmp.name}):
+            self.assertEqual(
+                cache.default_directory(),
+                os.path.join(self.tmp.name, "mapgenerator")
+            )
@@ -0,0 +1,80 @@
+import os
+import pickle
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from mapgenerator import diagram
+from mapgenerator.algorithms.fortunes.edges import merge_pieces
+from mapgenerator.algorithms.fortunes.fortunes import FortunesAlgorithm
+
+class TestDiagram(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "map.diagram")
+
+        self.sites = np.array([[0, 0], [10, 10], [0, 20], [20, 5]])
+        self.algorithm = FortunesAlgorithm.from_array(self.sites, (30, 30))
+        diagram.save(self.path, self.algorithm)
+        self.loaded = diagram.load(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_koko_ja_pisteet(self):
+        self.assertEqual(self.loaded.size, (30, 30))
+        self.assertEqual(len(self.loaded), 4)
+        self.assertTrue(np.array_equal(self.loaded.sites, self.sites))
+
+    def test_reunat_sailyvat(self):
+        edges, edge_sites = merge_pieces(*self.algorithm.get_edges_array())
+
+        self.assertTrue(np.array_equal(self.loaded.edges_array(), edges))
+        self.assertTrue(np.array_equal(self.loaded.edge_sites, edge_sites))
+
+    def test_karjet_jaettu(self):
+        self.assertEqual(len(np.unique(self.loaded.vertices, axis=0)), len(self.loaded.vertices))
+
+    def test_solun_reunat(self):
+        for site in range(len(self.loaded)):
+            edges = self.loaded.cell(site)
+
+            self.assertTrue(np.all(np.any(self.loaded.edge_sites[edges] == site, axis=1)))
+            self.assertEqual(len(edges), np.count_nonzero(self.loaded.edge_sites == site))
+
+    def test_taulukot_tiedostossa(self):
+        self.assertIsInstance(self.loaded.edges, np.memmap)
+        self.assertEqual(self.loaded.edges.dtype, np.dtype("<i4"))
+
+        with self.assertRaises(ValueError):
+            self.loaded.sites[0, 0] = 1
+
+    def test_pickle_vain_polku(self):
+        copy = pickle.loads(pickle.dumps(self.loaded))
+
+        self.assertEqual(copy.path, self.path)
+        self.assertTrue(np.array_equal(copy.edges, self.loaded.edges))
+
+    def test_yksi_piste_ei_reunoja(self):
+        diagram.save(self.path, FortunesAlgorithm.from_array(np.array([[3, 4]]), (10, 10)))
+        loaded = diagram.load(self.path)
+
+        self.assertEqual(loaded.edges.shape, (0, 2))
+        self.assertEqual(loaded.cell_offsets.tolist(), [0, 0])
+
+    def test_vaara_tiedosto(self):
+        with open(self.path, "wb") as file:
+            file.write(b"not a diagram" * 20)
+
+        with self.assertRaises(ValueError):
+            diagram.load(self.path)
+
+    def test_reunoille_pisteet(self):
+        with self.assertRaises(ValueError):
+            diagram.write(self.path, (10, 10), self.sites, np.zeros((2, 4)), np.zeros((1, 2)))
+
+    def test_pisteet_liian_suuret(self):
+        for site in [[2 ** 31, 0], [0, -2 ** 31 - 1]]:
+            with self.assertRaises(ValueError):
+                diagram.write(self.path, (10, 10), np.array([site]), np.zeros((0, 4)), np.zeros((0, 2)))
@@ -0,0 +1,113 @@
+from unittest import TestCase
+
+import numpy as np
+
+from mapgenerator.dynamic import DynamicDiagram
+
+class TestDynamicDiagram(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.sites = np.unique(rng.integers(0, 1000, size=(300, 2)), axis=0)
+        self.diagram = DynamicDiagram(self.sites, size=(1000, 1000))
+
+    def assert_symmetrinen(self):
+        for site in range(self.diagram._next_id):
+            if site not in self.diagram:
+                continue
+            for other in self.diagram.neighbours(site):
+                self.assertIn(site, self.diagram.neighbours(other))
+
+    def test_sama_piste_kahdesti(self):
+        with self.assertRaises(ValueError):
+            DynamicDiagram(np.array([[1, 1], [1, 1]]))
+
+    def test_lisays_palauttaa_seuraavan_tunnuksen(self):
+        site, touched = self.diagram.insert_site(500, 501)
+
+        self.assertEqual(site, len(self.sites))
+        self.assertIn(site, touched)
+        self.assertEqual(self.diagram.site(site), (500, 501))
+        self.assertEqual(len(self.diagram), len(self.sites) + 1)
+
+    def test_lisays_koskee_vain_naapureihin(self):
+        site, touched = self.diagram.insert_site(500, 501)
+
+        self.assertEqual(touched, set(self.diagram.neighbours(site)) | {site})
+
+    def test_lisays_olemassa_olevaan_pisteeseen(self):
+        x, y = self.sites[0].tolist()
+
+        with self.assertRaises(ValueError):
+            self.diagram.insert_site(x, y)
+
+    def test_lisays_kankaan_ulkopuolelle(self):
+        with self.assertRaises(ValueError):
+            self.diagram.insert_site(1000, 5)
+
+    def test_lisays_vaaralla_tyypilla(self):
+        with self.assertRaises(TypeError):
+            self.diagram.insert_site(1.5, 5)
+
+    def test_lisays_tyhjaan(self):
+        diagram = DynamicDiagram(np.empty((0, 2), dtype=np.int64), size=(10, 10))
+
+        site, touched = diagram.insert_site(3, 3)
+
+        self.assertEqual(touched, {site})
+
+    def test_poisto(self):
+        neighbours = self.diagram.neighbours(10)
+
+        touched = self.diagram.remove_site(10)
+
+        self.assertNotIn(10, self.diagram)
+        self.assertEqual(touched, set(neighbours) | {10})
+        for other in neighbours:
+            self.assertNotIn(10, self.diagram.neighbours(other))
+
+    def test_poisto_tuntematon(self):
+        with self.assertRaises(KeyError):
+            self.diagram.remove_site(10_000)
+
+    def test_siirto_sailyttaa_tunnuksen(self):
+        self.diagram.move_site(10, 3, 4)
+
+        self.assertEqual(self.diagram.site(10), (3, 4))
+
+    def test_naapuruus_pysyy_symmetrisena(self):
+        rng = np.random.default_rng(6)
+        for _ in range(20):
+            x, y = rng.integers(0, 1000, size=2).tolist()
+            if (x, y) not in map(tuple, self.sites.tolist()):
+                self.diagram.insert_site(x, y)
+        for site in range(0, 100, 7):
+            self.diagram.remove_site(site)
+
+        self.assert_symmetrinen()
+
+    def test_reunat_naapureiden_valilla(self):
+        edges, edge_sites = self.diagram.get_edges_array()
+
+        self.assertEqual(edges.shape, (len(edge_sites), 4))
+        for one, two in edge_sites.tolist():
+            self.assertIn(two, self.diagram.neighbours(one))
+
+    def test_lisays_pystyriviin_vastaa_uutta_pyyhkaisya(self):
+        sites = np.array([
+            [2, 853], [2, 496], [100, 1038], [102, 1214], [440, 1310],
+            [488, 379], [980, 1921], [1008, 1797], [1769, 1668], [1854, 1943]
+        ])
+        diagram = DynamicDiagram(sites, size=(2000, 2000))
+
+        # the new site shares the smallest x with two others
+        diagram.insert_site(2, 1868)
+
+        edges, edge_sites = diagram.get_edges_array()
+        swept, swept_sites = DynamicDiagram(
+            np.vstack((sites, [[2, 1868]])), size=(2000, 2000)
+        ).get_edges_array()
+
+        # the rays are cut further out in a whole sweep, which can round
+        # the clipped ends a pixel differently
+        self.assertEqual(edge_sites.tolist(), swept_sites.tolist())
+        self.assertTrue(np.all(np.abs(edges - swept) <= 1))
@@ -0,0 +1,85 @@
+import os
+import pstats
+import tempfile
+import tracemalloc
+from unittest import TestCase
+
+import numpy as np
+
+from mapgenerator.algorithms.fortunes.fortunes import FortunesAlgorithm
+from mapgenerator.profiling import SWEEP_PHASES, Profiler
+
+class TestProfiler(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(9)
+        self.sites = rng.integers(0, 500, size=(100, 2))
+
+    def sweep(self, profiler: Profiler):
+        with profiler.phase("sweep"):
+            FortunesAlgorithm.from_array(self.sites).get_edges_array()
+
+        profiler.stop()
+
+    def test_epapateva_profiili(self):
+        with self.assertRaises(ValueError):
+            Profiler("disk")
+
+    def test_cpu_vaiheet(self):
+        profiler = Profiler("cpu")
+        self.sweep(profiler)
+
+        report = profiler.report()
+
+        for phase in SWEEP_PHASES:
+            self.assertIn(phase, report)
+        self.assertRegex(report, r"site events +100 ")
+        self.assertIn("cumulative", report)
+        self.assertNotIn("peak", report)
+
+    def test_muisti_vaiheittain(self):
+        profiler = Profiler("mem")
+        self.sweep(profiler)
+
+        report = profiler.report()
+
+        self.assertIn("sweep: peak", report)
+        self.assertIn("fortunes.py", report)
+        self.assertNotIn("sweep phase", report)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_muisti_pyyhkaisyn_vaiheittain(self):
+        profiler = Profiler("mem")
+        self.sweep(profiler)
+
+        report = profiler.memory_report()
+
+        self.assertRegex(report, r"site events +[0-9.]+ [KM]iB +[0-9]+ blocks kept")
+        self.assertRegex(report, r"circle events +[0-9.]+ [KM]iB")
+
+    def test_molemmat(self):
+        profiler = Profiler("both")
+        self.sweep(profiler)
+
+        report = profiler.report()
+
+        self.assertIn("sweep phase", report)
+        self.assertIn("sweep: peak", report)
+
+    def test_raaka_profiili(self):
+        profiler = Profiler("cpu")
+        self.sweep(profiler)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "run.prof")
+            profiler.dump(path)
+
+            stats = pstats.Stats(path)
+
+        self.assertTrue(any(name == "find_arc" for _, _, name in stats.stats))
+
+    def test_muistia_ei_voi_tallentaa(self):
+        profiler = Profiler("mem")
+        self.sweep(profiler)
+
+        with self.assertRaises(ValueError):
+            profiler.dump("run.prof")
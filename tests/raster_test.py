@@ -0,0 +1,75 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from mapgenerator import raster
+from mapgenerator.algorithms.fortunes.fortunes import FortunesAlgorithm
+
+class TestRasterise(TestCase):
+    def setUp(self):
+        sites = np.array([[30, 40], [120, 50], [70, 130], [90, 80]])
+        self.algorithm = FortunesAlgorithm.from_array(sites, (160, 150))
+        self.mesh = self.algorithm.get_mesh()
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_kaksi_solua(self):
+        mesh = FortunesAlgorithm.from_array(np.array([[2, 5], [8, 5]]), (10, 10)).get_mesh()
+
+        labels = raster.rasterise(mesh, (10, 10))
+
+        self.assertEqual(labels.shape, (10, 10))
+        self.assertTrue(np.all(labels[:, :5] == 0))
+        self.assertTrue(np.all(labels[:, 5:] == 1))
+
+    def test_yksi_solu_koko_kangas(self):
+        mesh = FortunesAlgorithm.from_array(np.array([[2, 3]]), (7, 4)).get_mesh()
+
+        self.assertTrue(np.all(raster.rasterise(mesh, (7, 4)) == 0))
+
+    def test_pikselit_lahimman_pisteen_soluissa(self):
+        labels = raster.rasterise(self.mesh, (160, 150))
+        ys, xs = np.mgrid[0:150, 0:160]
+        nearest = self.algorithm.get_index().locate(
+            np.column_stack((xs.reshape(-1) + 0.5, ys.reshape(-1) + 0.5))
+        ).reshape(150, 160)
+
+        # the corners are rounded, so a few pixels by the edges may differ
+        self.assertLess(np.count_nonzero(labels != nearest), 150)
+        self.assertFalse(np.any(labels == raster.NO_CELL))
+
+    def test_kaistojen_korkeus_ei_vaikuta(self):
+        whole = raster.rasterise(self.mesh, (160, 150), strip_height=1000)
+
+        for strip_height in (1, 7, 64):
+            self.assertTrue(np.array_equal(
+                raster.rasterise(self.mesh, (160, 150), strip_height=strip_height),
+                whole
+            ))
+
+    def test_tiedostoon(self):
+        path = os.path.join(self.tmp.name, "labels.npy")
+
+        labels = raster.rasterise(self.mesh, (160, 150), path, strip_height=16)
+
+        self.assertIsInstance(labels, np.memmap)
+        self.assertTrue(np.array_equal(np.load(path), raster.rasterise(self.mesh, (160, 150))))
+
+    def test_rinnakkain(self):
+        path = os.path.join(self.tmp.name, "labels.npy")
+
+        labels = raster.rasterise(self.mesh, (160, 150), path, strip_height=16, jobs=2)
+
+        self.assertTrue(np.array_equal(labels, raster.rasterise(self.mesh, (160, 150))))
+
+    def test_epapateva_kaista(self):
+        with self.assertRaises(ValueError):
+            raster.rasterise(self.mesh, (160, 150), strip_height=0)
+
+    def test_epapateva_koko(self):
+        with self.assertRaises(ValueError):
+            raster.rasterise(self.mesh, (160, 0))
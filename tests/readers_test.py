@@ -0,0 +1,117 @@
+import io
+import os
+import sys
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+
+from mapgenerator import readers
+
+class TestReaders(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "sites")
+        self.sites = np.random.default_rng(2).integers(0, 1000, size=(500, 2))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, data: bytes):
+        with open(self.path, "wb") as file:
+            file.write(data)
+
+    def test_pilkut_ja_valit(self):
+        self.write(b"1,2\n3 4\n# comment\n  5,\t6\n7 8")
+
+        sites, repeated = readers.load_sites(self.path)
+
+        self.assertEqual(sites.tolist(), [[1, 2], [3, 4], [5, 6], [7, 8]])
+        self.assertEqual(repeated, 0)
+
+    def test_rivit_palojen_rajalla(self):
+        self.write("".join(f"{x},{y}\n" for x, y in self.sites.tolist()).encode())
+
+        chunks = list(readers.read_sites(self.path, chunk_bytes=64))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(np.array_equal(np.concatenate(chunks), self.sites))
+
+    def test_int32(self):
+        self.write(self.sites.astype("<i4").tobytes())
+
+        chunks = list(readers.read_sites(self.path, "int32", chunk_bytes=100))
+
+        self.assertTrue(np.array_equal(np.concatenate(chunks), self.sites))
+
+    def test_float64_pyoristetaan(self):
+        self.write(np.array([[1.4, 2.6], [3.0, 4.5]], dtype="<f8").tobytes())
+
+        sites, _ = readers.load_sites(self.path, "float64")
+
+        self.assertEqual(sites.tolist(), [[1, 3], [3, 4]])
+
+    def test_toistot_poistetaan(self):
+        self.write(b"5,5\n1,2\n5,5\n3,4\n1,2\n")
+
+        sites, repeated = readers.load_sites(self.path, chunk_bytes=16)
+
+        self.assertEqual(sites.tolist(), [[5, 5], [1, 2], [3, 4]])
+        self.assertEqual(repeated, 2)
+
+    def test_vakiosyote(self):
+        stdin = io.TextIOWrapper(io.BytesIO(b"1,2\n3,4\n"))
+
+        with patch.object(sys, "stdin", stdin):
+            sites, _ = readers.load_sites("-")
+
+        self.assertEqual(sites.tolist(), [[1, 2], [3, 4]])
+
+    def test_tyhja_tiedosto(self):
+        self.write(b"")
+
+        sites, repeated = readers.load_sites(self.path)
+
+        self.assertEqual(sites.shape, (0, 2))
+        self.assertEqual(repeated, 0)
+
+    def test_epapateva_luku(self):
+        self.write(b"1,2\n3,x\n")
+
+        with self.assertRaises(ValueError):
+            readers.load_sites(self.path)
+
+    def test_pariton_maara(self):
+        self.write(b"1,2\n3\n")
+
+        with self.assertRaises(ValueError):
+            readers.load_sites(self.path)
+
+    def test_kolme_saraketta(self):
+        self.write(b"1,2,3\n4,5,6\n")
+
+        with self.assertRaises(ValueError):
+            readers.load_sites(self.path)
+
+    def test_yksi_sarake(self):
+        self.write(b"1\n2\n3 4\n")
+
+        with self.assertRaises(ValueError):
+            readers.load_sites(self.path)
+
+    def test_kesken_loppuva_binaari(self):
+        self.write(np.arange(3, dtype="<i4").tobytes())
+
+        with self.assertRaises(ValueError):
+            readers.load_sites(self.path, "int32")
+
+    def test_negatiivinen_piste(self):
+        self.write(b"1,2\n-3,4\n")
+
+        with self.assertRaises(ValueError):
+            readers.load_sites(self.path)
+
+    def test_tuntematon_muoto(self):
+        with self.assertRaises(ValueError):
+            readers.load_sites(self.path, "json")
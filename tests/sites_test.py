@@ -0,0 +1,89 @@
+from unittest import TestCase
+
+import numpy as np
+
+from mapgenerator import sites
+
+class TestSites(TestCase):
+    def assert_kelvolliset(self, points: np.ndarray, size: tuple[int, int]):
+        self.assertEqual(points.dtype, np.int64)
+        self.assertEqual(points.shape[1], 2)
+        self.assertTrue(np.all((points >= 0) & (points < size)))
+        self.assertEqual(len(np.unique(points, axis=0)), len(points))
+
+    def test_jakaumat(self):
+        for distribution in sites.DISTRIBUTIONS:
+            points = sites.generate(distribution, 500, (400, 300), seed=1)
+
+            self.assertEqual(len(points), 500)
+            self.assert_kelvolliset(points, (400, 300))
+
+    def test_sama_siemen_sama_tulos(self):
+        for distribution in sites.DISTRIBUTIONS:
+            first = sites.generate(distribution, 200, (300, 300), seed=5)
+            second = sites.generate(distribution, 200, (300, 300), seed=5)
+
+            self.assertTrue(np.array_equal(first, second))
+
+    def test_eri_siemen_eri_tulos(self):
+        for distribution in sites.DISTRIBUTIONS:
+            first = sites.generate(distribution, 200, (300, 300), seed=5)
+            second = sites.generate(distribution, 200, (300, 300), seed=6)
+
+            self.assertFalse(np.array_equal(first, second))
+
+    def test_tuntematon_jakauma(self):
+        with self.assertRaises(ValueError):
+            sites.generate("gaussian", 10, (10, 10), seed=0)
+
+    def test_epapateva_maara(self):
+        with self.assertRaises(ValueError):
+            sites.uniform(-1, (10, 10), seed=0)
+
+    def test_liikaa_pisteita(self):
+        with self.assertRaises(ValueError):
+            sites.uniform(101, (10, 10), seed=0)
+
+    def test_nolla_pistetta(self):
+        for distribution in sites.DISTRIBUTIONS:
+            self.assertEqual(len(sites.generate(distribution, 0, (10, 10), seed=0)), 0)
+
+    def test_poisson_valimatka(self):
+        points = sites.poisson_disk(10_000, (500, 500), seed=2, radius=4.0).astype(float)
+
+        # the sites are floored, so they can be up to √2 closer
+        order = np.argsort(points[:, 0])
+        points = points[order]
+        closest = min(
+            np.hypot(*(points[k:] - points[:-k]).T).min()
+            for k in range(1, 30)
+        )
+        self.assertGreaterEqual(closest, 4.0 - np.sqrt(2))
+
+    def test_poisson_tayttaa_kankaan(self):
+        points = sites.poisson_disk(10**6, (200, 200), seed=2, radius=5.0)
+
+        maximal = sites.POISSON_DENSITY * 200 * 200 / 5.0 ** 2
+        self.assertGreater(len(points), 0.8 * maximal)
+
+    def test_ruudukko_ilman_varinaa(self):
+        points = sites.jittered_grid(100, (100, 100), seed=0, jitter=0)
+
+        self.assertEqual(sorted(set(points[:, 0].tolist())), list(range(0, 100, 10)))
+
+    def test_epapateva_varina(self):
+        with self.assertRaises(ValueError):
+            sites.jittered_grid(10, (10, 10), seed=0, jitter=2)
+
+    def test_toistot_pois_jarjestyksessa(self):
+        points = np.array([[3, 1], [0, 0], [3, 1], [2, 5], [0, 0]])
+
+        self.assertEqual(sites.unique_rows(points).tolist(), [[3, 1], [0, 0], [2, 5]])
+
+    def test_toistot_pois_laajalta_alueelta(self):
+        points = np.array([[0, 0], [2 ** 32, 0], [0, 2 ** 32], [2 ** 32, 0], [-2 ** 62, 2 ** 62]])
+
+        self.assertEqual(
+            sites.unique_rows(points).tolist(),
+            [[0, 0], [2 ** 32, 0], [0, 2 ** 32], [-2 ** 62, 2 ** 62]]
+        )
@@ -0,0 +1,100 @@
+from unittest import TestCase
+
+import numpy as np
+
+from mapgenerator import tiles
+
+class TestTiledWorld(TestCase):
+    def setUp(self):
+        self.world = tiles.TiledWorld(seed=7, tile_size=100, sites_per_tile=20)
+
+    def test_konstruktorille_epapateva_koko(self):
+        with self.assertRaises(ValueError):
+            tiles.TiledWorld(seed=7, tile_size=0, sites_per_tile=20)
+
+    def test_konstruktorille_epapateva_siemen(self):
+        with self.assertRaises(TypeError):
+            tiles.TiledWorld(seed="7", tile_size=100, sites_per_tile=20)
+
+    def test_pisteet_ovat_toistettavat(self):
+        first = self.world.tile_sites(3, -2)
+        second = tiles.TiledWorld(seed=7, tile_size=100, sites_per_tile=20).tile_sites(3, -2)
+
+        self.assertTrue(np.array_equal(first, second))
+
+    def test_pisteet_ovat_ruudun_sisalla(self):
+        sites = self.world.tile_sites(-1, 2)
+
+        self.assertTrue(np.all((sites[:, 0] >= -100) & (sites[:, 0] < 0)))
+        self.assertTrue(np.all((sites[:, 1] >= 200) & (sites[:, 1] < 300)))
+
+    def test_eri_ruuduilla_eri_pisteet(self):
+        first = self.world.tile_sites(0, 0) % 100
+        second = self.world.tile_sites(0, 1) % 100
+
+        self.assertFalse(np.array_equal(first, second))
+
+    def test_eri_siemenella_eri_pisteet(self):
+        other = tiles.TiledWorld(seed=8, tile_size=100, sites_per_tile=20)
+
+        self.assertFalse(np.array_equal(self.world.tile_sites(0, 0), other.tile_sites(0, 0)))
+
+    def test_ruudun_reunat_kuuluvat_omille_pisteille(self):
+        tile = self.world.tile(0, 0)
+        own = {tuple(site) for site in tile.sites.tolist()}
+
+        self.assertGreater(len(tile.edges), 0)
+        self.assertEqual(tile.edges.shape, tile.edge_sites.shape)
+        for row in tile.edge_sites.tolist():
+            self.assertTrue(tuple(row[:2]) in own or tuple(row[2:]) in own)
+
+    def shared_edges(self, tile: tiles.Tile, one: tiles.Tile, other: tiles.Tile) -> set:
+        """ The edges of tile between a site of one and a site of other,
+            with the sites they split """
+        sites = {tuple(site) for site in one.sites.tolist()}
+        neighbours = {tuple(site) for site in other.sites.tolist()}
+
+        edges = set()
+        for edge, pair in zip(tile.edges.tolist(), tile.edge_sites.tolist()):
+            split = {tuple(pair[:2]), tuple(pair[2:])}
+            if split & sites and split & neighbours:
+                edges.add((*pair, *edge))
+
+        return edges
+
+    def test_naapuriruutujen_yhteiset_reunat_ovat_samat(self):
+        # an odd size puts the halo corners of neighbours on odd and even x
+        world = tiles.TiledWorld(seed=1, tile_size=77, sites_per_tile=20)
+
+        for first, second in [((0, 0), (1, 0)), ((0, 0), (0, 1)), ((-1, -1), (-1, 0))]:
+            one = world.tile(*first)
+            other = world.tile(*second)
+
+            shared = self.shared_edges(one, one, other)
+            self.assertGreater(len(shared), 0)
+            self.assertEqual(shared, self.shared_edges(other, one, other))
+
+    def test_rinnakkain_sama_tulos(self):
+        coords = [(0, 0), (1, 0), (-1, 3)]
+
+        parallel = list(self.world.tiles(coords, jobs=2))
+
+        for tile, (tx, ty) in zip(parallel, coords):
+            serial = self.world.tile(tx, ty)
+            self.assertEqual(tile.coords, (tx, ty))
+            self.assertTrue(np.array_equal(tile.edges, serial.edges))
+            self.assertTrue(np.array_equal(tile.edge_sites, serial.edge_sites))
+
+    def test_ruudut_pelaajan_ymparilla(self):
+        around = self.world.tiles_around(250, -10, radius=1)
+
+        self.assertEqual(
+            sorted(tile.coords for tile in around),
+            sorted((tx, ty) for tx in range(1, 4) for ty in range(-2, 1))
+        )
+
+    def test_ruudut_pelaajan_ymparilla_valimuistista(self):
+        first = self.world.tiles_around(0, 0, radius=0)
+        second = self.world.tiles_around(50, 50, radius=0)
+
+        self.assertIs(first[0], second[0])